@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Compare session backends: output throughput and keystroke echo latency.
+
+The SSH backend needs sshd on localhost with key authentication; it is
+skipped if the connection fails.
+
+Usage:
+    python benchmarks/bench_backends.py [--backend ssh local] [--mb 32] [--keys 200]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from server.defaults import BACKENDS  # noqa: E402
+from ssh.backend import get_backend  # noqa: E402
+
+
+async def run_session(backend: str, command: str, on_output, on_close):
+    """Create and start a session running command.
+
+    Returns:
+        Started session, or None if it failed to start
+    """
+    session = get_backend(backend)(on_output=on_output, on_close=on_close, binary=True)
+    ok = await session.connect(tempfile.gettempdir(), command=command)
+    return session if ok else None
+
+
+async def measure_throughput(backend: str, path: str, size: int) -> dict:
+    """Time reading a file of known size through the session."""
+    received = 0
+    first = None
+    closed = asyncio.Event()
+
+    def on_output(data: bytes):
+        nonlocal received, first
+        if first is None:
+            first = time.perf_counter()
+        received += len(data)
+
+    session = await run_session(backend, f"cat {path}", on_output, closed.set)
+    if session is None:
+        return {"error": "failed to start"}
+    await closed.wait()
+    elapsed = time.perf_counter() - first
+    return {"bytes": received, "seconds": elapsed, "mb_per_s": received / 1e6 / elapsed, "expected": size}
+
+
+async def measure_latency(backend: str, keys: int) -> dict:
+    """Measure keystroke-to-echo round trips against cat on the PTY."""
+    echoed = asyncio.Event()
+    buffer = bytearray()
+    expected = b""
+
+    def on_output(data: bytes):
+        buffer.extend(data)
+        if expected and expected in buffer:
+            echoed.set()
+
+    session = await run_session(backend, "cat", on_output, None)
+    if session is None:
+        return {"error": "failed to start"}
+
+    # Let the login shell finish reading its profile before cat starts
+    await asyncio.sleep(1.5)
+    samples = []
+    for i in range(keys):
+        expected = b"%c" % (ord("a") + i % 26)
+        buffer.clear()
+        echoed.clear()
+        start = time.perf_counter()
+        await session.send_input(expected.decode())
+        await asyncio.wait_for(echoed.wait(), timeout=5)
+        samples.append((time.perf_counter() - start) * 1000)
+    await session.disconnect()
+
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p99_ms": samples[int(len(samples) * 0.99) - 1],
+        "max_ms": samples[-1],
+    }
+
+
+async def main():
+    """Run the benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--mb", type=float, default=32, help="Output size in MB (default: 32)")
+    parser.add_argument("--keys", type=int, default=200, help="Keystrokes for latency (default: 200)")
+    args = parser.parse_args()
+
+    size = int(args.mb * 1024 * 1024)
+    with tempfile.NamedTemporaryFile("wb", suffix=".txt", delete=False) as f:
+        line = b"0123456789abcdefghijklmnopqrstuvwxyz" * 3 + b"\n"
+        f.write(line * (size // len(line)))
+        path = f.name
+
+    try:
+        for backend in args.backend:
+            print(f"[{backend}]")
+            try:
+                result = await asyncio.wait_for(measure_throughput(backend, path, size), timeout=120)
+                if "error" in result:
+                    print(f"  throughput: {result['error']}")
+                    continue
+                print(f"  throughput: {result['mb_per_s']:.1f} MB/s ({result['bytes'] / 1e6:.1f} MB)")
+                result = await measure_latency(backend, args.keys)
+                print(f"  echo latency: p50 {result['p50_ms']:.2f} ms, "
+                      f"p99 {result['p99_ms']:.2f} ms, max {result['max_ms']:.2f} ms")
+            except Exception as e:
+                print(f"  skipped: {e}")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
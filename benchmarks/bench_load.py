@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""Load test: simulated clients and tabs against a local SSH server stand-in.
+
+A child process runs an asyncssh server that accepts any user without
+authentication. Each channel writes text at --rate bytes/s and echoes
+its input. N simulated Socket.IO clients with M tabs each drive
+TerminalHandler in this process, through an in-process stand-in for the
+Socket.IO server. Each tab types --kps keystrokes per second.
+
+Reports keystroke echo latency (p50/p99), output throughput, event-loop
+lag, CPU and RSS of the server process. --json saves the results so runs
+can be compared.
+
+Socket.IO transport and serialization are not included: emits are
+delivered to the simulated clients directly.
+
+Usage:
+    python benchmarks/bench_load.py [--clients 10] [--tabs 4] [--rate 20000]
+        [--kps 5] [--duration 20] [--ssh-cipher NAME] [--json results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncssh  # noqa: E402
+
+from events.socketio_handlers import TerminalHandler  # noqa: E402
+from ssh.pool import SSHConnectionPool  # noqa: E402
+
+# Output text never contains '#', so echoed "#<seq>#" markers are unambiguous
+LINE = b"the quick brown fox jumps over the lazy dog 0123456789 " * 2 + b"\r\n"
+
+
+# --- SSH server stand-in (runs in a child process) ---
+
+class _NoAuthServer(asyncssh.SSHServer):
+    """Accepts every user without authentication."""
+
+    def begin_auth(self, username: str) -> bool:
+        return False
+
+
+async def _serve_channel(process: asyncssh.SSHServerProcess, rate: int, chunk: int):
+    """Write output at a fixed rate and echo input until the channel closes."""
+
+    async def echo():
+        while True:
+            data = await process.stdin.read(4096)
+            if not data:
+                break
+            process.stdout.write(data)
+
+    async def produce():
+        if rate <= 0:
+            return
+        payload = (LINE * (chunk // len(LINE) + 1))[:chunk]
+        interval = chunk / rate
+        next_at = time.monotonic()
+        while True:
+            process.stdout.write(payload)
+            await process.stdout.drain()
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+    tasks = [asyncio.create_task(echo()), asyncio.create_task(produce())]
+    try:
+        await tasks[0]
+    except (asyncssh.BreakReceived, asyncssh.TerminalSizeChanged, OSError):
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        process.exit(0)
+
+
+async def _run_ssh_server(port: int, rate: int, chunk: int):
+    """Serve until killed, printing the port once listening."""
+    key = asyncssh.generate_private_key("ssh-ed25519")
+    server = await asyncssh.listen(
+        "127.0.0.1",
+        port,
+        server_factory=_NoAuthServer,
+        server_host_keys=[key],
+        process_factory=lambda process: _serve_channel(process, rate, chunk),
+        encoding=None,
+        line_editor=False,
+    )
+    print(server.sockets[0].getsockname()[1], flush=True)
+    await asyncio.Future()
+
+
+# --- Simulated Socket.IO server and clients ---
+
+class LoopbackServer:
+    """Stand-in for socketio.AsyncServer that calls handlers in process."""
+
+    def __init__(self):
+        self.handlers = {}
+        self.clients: Dict[str, "SimulatedClient"] = {}
+
+    def event(self, handler):
+        """Register a handler under its function name, like AsyncServer.event."""
+        self.handlers[handler.__name__] = handler
+        return handler
+
+    async def emit(self, event: str, data=None, to=None):
+        """Deliver an event to the client with sid to."""
+        client = self.clients.get(to)
+        if client:
+            client.on_event(event, data)
+
+
+class SimulatedClient:
+    """Browser tab with M terminal tabs that type and acknowledge output."""
+
+    def __init__(self, sio: LoopbackServer, index: int, tabs: int):
+        self.sio = sio
+        self.sid = f"sid-{index}"
+        self.tab_ids = [f"tab-{index}-{t}" for t in range(tabs)]
+        self.started = asyncio.Event()
+        self.pending_start = set(self.tab_ids)
+        self.received = 0
+        self.unacked: Dict[str, int] = {tab: 0 for tab in self.tab_ids}
+        self.tails: Dict[str, bytes] = {tab: b"" for tab in self.tab_ids}
+        self.sent: Dict[str, Dict[int, float]] = {tab: {} for tab in self.tab_ids}
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    async def connect(self):
+        """Connect and start every tab."""
+        self.sio.clients[self.sid] = self
+        await self.sio.handlers["connect"](self.sid, {})
+        for tab_id in self.tab_ids:
+            await self.sio.handlers["start_session"](self.sid, {
+                "workspace": "/tmp",
+                "tab_id": tab_id,
+                "cols": 120,
+                "rows": 40,
+                "binary": True,
+                "flow_control": True,
+            })
+
+    def on_event(self, event: str, data: dict):
+        """Handle an emitted event."""
+        tab_id = data.get("tab_id") if isinstance(data, dict) else None
+        if event == "session_started":
+            self.pending_start.discard(tab_id)
+            if not self.pending_start:
+                self.started.set()
+        elif event == "terminal_error":
+            self.errors += 1
+        elif event == "terminal_output":
+            output = data["data"]
+            self.received += len(output)
+            self.unacked[tab_id] += len(output)
+            self._find_echoes(tab_id, output)
+
+    def _find_echoes(self, tab_id: str, output: bytes):
+        """Match echoed markers (possibly split across frames) to keystrokes."""
+        sent = self.sent[tab_id]
+        if not sent or b"#" not in output and b"#" not in self.tails[tab_id]:
+            return
+        text = self.tails[tab_id] + output
+        now = time.perf_counter()
+        start = 0
+        while True:
+            begin = text.find(b"#", start)
+            end = text.find(b"#", begin + 1) if begin >= 0 else -1
+            if end < 0:
+                break
+            seq = int(text[begin + 1:end])
+            if seq in sent:
+                self.latencies.append(now - sent.pop(seq))
+            start = end + 1
+        self.tails[tab_id] = text[start:][-32:]
+
+    async def type_and_ack(self, kps: float, stop: asyncio.Event):
+        """Type markers at kps per tab and acknowledge output every 20 ms."""
+        seq = 0
+        interval = 1.0 / kps if kps > 0 else None
+        next_key = time.monotonic()
+        while not stop.is_set():
+            for tab_id, size in self.unacked.items():
+                if size:
+                    self.unacked[tab_id] = 0
+                    await self.sio.handlers["terminal_ack"](self.sid, {"tab_id": tab_id, "bytes": size})
+            if interval and time.monotonic() >= next_key:
+                next_key += interval
+                for tab_id in self.tab_ids:
+                    seq += 1
+                    self.sent[tab_id][seq] = time.perf_counter()
+                    await self.sio.handlers["terminal_input"](self.sid, {"tab_id": tab_id, "data": f"#{seq}#"})
+            await asyncio.sleep(0.02)
+
+    async def close(self):
+        """Stop every tab."""
+        for tab_id in self.tab_ids:
+            await self.sio.handlers["stop_session"](self.sid, {"tab_id": tab_id})
+        await self.sio.handlers["disconnect"](self.sid)
+
+
+# --- Measurement ---
+
+async def measure_lag(stop: asyncio.Event, samples: List[float]):
+    """Record how late a 10 ms sleep wakes up."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        before = loop.time()
+        await asyncio.sleep(0.01)
+        samples.append(loop.time() - before - 0.01)
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of unsorted samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(args) -> dict:
+    """Start the stand-in server, run the load and collect results."""
+    server = subprocess.Popen(
+        [sys.executable, __file__, "--serve-ssh", "--rate", str(args.rate), "--chunk", str(args.chunk)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        port = int(server.stdout.readline())
+        sio = LoopbackServer()
+        connect_options = {"host": "127.0.0.1", "port": port, "client_keys": None}
+        if args.ssh_cipher:
+            connect_options["encryption_algs"] = [args.ssh_cipher]
+        pool = SSHConnectionPool(connect_options=connect_options)
+        TerminalHandler(sio, pool=pool, output_options={"flush_interval": args.flush_ms / 1000})
+
+        clients = [SimulatedClient(sio, i, args.tabs) for i in range(args.clients)]
+        start = time.perf_counter()
+        await asyncio.gather(*(client.connect() for client in clients))
+        await asyncio.wait_for(asyncio.gather(*(client.started.wait() for client in clients)), timeout=60)
+        setup_time = time.perf_counter() - start
+
+        stop = asyncio.Event()
+        lag: List[float] = []
+        for client in clients:
+            client.received = 0
+        usage_before = resource.getrusage(resource.RUSAGE_SELF)
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(measure_lag(stop, lag))]
+        tasks += [asyncio.create_task(client.type_and_ack(args.kps, stop)) for client in clients]
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        usage_after = resource.getrusage(resource.RUSAGE_SELF)
+        rss = rss_bytes()
+
+        latencies = [s for client in clients for s in client.latencies]
+        received = sum(client.received for client in clients)
+        cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+        await asyncio.gather(*(client.close() for client in clients))
+        await pool.close()
+    finally:
+        server.kill()
+        server.wait()
+
+    return {
+        "config": {
+            "clients": args.clients,
+            "tabs": args.tabs,
+            "rate": args.rate,
+            "chunk": args.chunk,
+            "kps": args.kps,
+            "duration": args.duration,
+            "flush_ms": args.flush_ms,
+            "ssh_cipher": args.ssh_cipher,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "timestamp": time.time(),
+        "sessions": args.clients * args.tabs,
+        "setup_s": setup_time,
+        "errors": sum(client.errors for client in clients),
+        "echo_samples": len(latencies),
+        "echo_p50_ms": percentile(latencies, 0.5) * 1000,
+        "echo_p99_ms": percentile(latencies, 0.99) * 1000,
+        "throughput_mb_s": received / 1e6 / elapsed,
+        "loop_lag_p50_ms": percentile(lag, 0.5) * 1000,
+        "loop_lag_p99_ms": percentile(lag, 0.99) * 1000,
+        "loop_lag_max_ms": max(lag, default=0.0) * 1000,
+        "cpu_percent": cpu / elapsed * 100,
+        "rss_mb": rss / 1e6,
+    }
+
+
+def main():
+    """Parse arguments and run the benchmark or the SSH stand-in."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=10, help="Simulated browser clients (default: 10)")
+    parser.add_argument("--tabs", type=int, default=4, help="Tabs per client (default: 4)")
+    parser.add_argument("--rate", type=int, default=20000, help="Output bytes/s per tab (default: 20000)")
+    parser.add_argument("--chunk", type=int, default=1024, help="Output write size in bytes (default: 1024)")
+    parser.add_argument("--kps", type=float, default=5, help="Keystrokes/s per tab (default: 5)")
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds (default: 20)")
+    parser.add_argument("--flush-ms", type=float, default=5, help="Output coalescing window (default: 5)")
+    parser.add_argument("--ssh-cipher", help="Force an SSH cipher, e.g. aes128-gcm@openssh.com (default: negotiated)")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    parser.add_argument("--serve-ssh", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_ssh:
+        asyncio.run(_run_ssh_server(0, args.rate, args.chunk))
+        return
+
+    results = asyncio.run(run(args))
+    print(f"Sessions:   {results['sessions']} ({args.clients} clients x {args.tabs} tabs), "
+          f"started in {results['setup_s']:.2f}s, {results['errors']} errors")
+    print(f"Echo:       p50 {results['echo_p50_ms']:.2f} ms, p99 {results['echo_p99_ms']:.2f} ms "
+          f"({results['echo_samples']} keystrokes)")
+    print(f"Throughput: {results['throughput_mb_s']:.2f} MB/s to clients")
+    print(f"Loop lag:   p50 {results['loop_lag_p50_ms']:.2f} ms, p99 {results['loop_lag_p99_ms']:.2f} ms, "
+          f"max {results['loop_lag_max_ms']:.2f} ms")
+    print(f"Process:    {results['cpu_percent']:.0f}% CPU, {results['rss_mb']:.0f} MB RSS")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+        print(f"Saved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Compare server modes: startup, memory, page load time and per-tab memory.
+
+Each mode runs 'main.py start --backend local' as a child process with a
+temporary HOME (so the PID file and workspace index of a real server are
+left alone) and is measured from outside:
+
+- startup: time from process start until /api/health answers
+- idle RSS: server memory once started
+- cold load: / plus every local stylesheet and script it references
+- warm load: / alone, as a reload with cached hashed assets would fetch it
+- per tab: RSS growth of the server after --tabs page loads, each followed
+  by a terminal Socket.IO connection, divided by --tabs
+
+Headless mode serves no page, so its tabs are Socket.IO connections only.
+
+The Socket.IO connections use Engine.IO long-polling through urllib, so no
+client library is needed. A browser on the NiceGUI page also opens
+NiceGUI's own websocket; this benchmark does not, so per-tab memory in
+nicegui mode is a lower bound.
+
+Usage:
+    python benchmarks/bench_page.py [--modes nicegui static headless] [--tabs 50]
+        [--loads 20] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).parent.parent
+MODES: Dict[str, List[str]] = {
+    "nicegui": ["--page", "nicegui"],
+    "static": ["--page", "static"],
+    "headless": ["--headless"],
+}
+
+
+def free_port() -> int:
+    """Return a port that is free right now."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def fetch(url: str, headers: Dict[str, str] = None) -> bytes:
+    """GET a URL, accepting compressed bodies as a browser would.
+
+    Returns:
+        Body as transferred, not decompressed
+    """
+    request = urllib.request.Request(url, headers={"Accept-Encoding": "gzip, br", **(headers or {})})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.read()
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident set size of a process."""
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def open_socket(base: str) -> str:
+    """Connect a new terminal Socket.IO client over long-polling.
+
+    Returns:
+        Engine.IO session ID
+    """
+    handshake = fetch(f"{base}/socket.io/?EIO=4&transport=polling").decode()
+    sid = json.loads(handshake[handshake.index("{"):])["sid"]
+    url = f"{base}/socket.io/?EIO=4&transport=polling&sid={sid}"
+    request = urllib.request.Request(url, data=b"40", headers={"Content-Type": "text/plain;charset=UTF-8"})
+    urllib.request.urlopen(request, timeout=10).read()
+    fetch(url)  # CONNECT acknowledgement
+    return sid
+
+
+def measure(mode: str, args) -> dict:
+    """Start the server in one mode and measure it."""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as home:
+        env = {**os.environ, "HOME": home}
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, str(ROOT / "main.py"), "start", str(port), "--backend", "local", *MODES[mode]],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited with {server.returncode} (is nicegui installed?)")
+                try:
+                    fetch(base + "/api/health")
+                    break
+                except (urllib.error.URLError, ConnectionError):
+                    time.sleep(0.05)
+            startup = time.perf_counter() - start
+            time.sleep(1)
+            idle_rss = rss_bytes(server.pid)
+
+            has_page = mode != "headless"
+            page = fetch(base + "/", {"Accept-Encoding": "identity"}) if has_page else b""
+            assets = [url for url in re.findall(r'(?:href|src)="(/[^"]+)"', page.decode()) if not url.startswith("//")]
+            cold: List[float] = []
+            warm: List[float] = []
+            page_bytes = asset_bytes = 0
+            for _ in range(args.loads if has_page else 0):
+                began = time.perf_counter()
+                page_bytes = len(fetch(base + "/"))
+                warm.append(time.perf_counter() - began)
+                asset_bytes = sum(len(fetch(base + url)) for url in assets)
+                cold.append(time.perf_counter() - began)
+
+            before = rss_bytes(server.pid)
+            for _ in range(args.tabs):
+                if has_page:
+                    fetch(base + "/")
+                open_socket(base)
+            time.sleep(2)
+            after = rss_bytes(server.pid)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+
+    return {
+        "mode": mode,
+        "startup_s": startup,
+        "idle_rss_mb": idle_rss / 1e6,
+        "page_bytes": page_bytes,
+        "asset_bytes": asset_bytes,
+        "cold_load_ms": statistics.median(cold) * 1000 if cold else 0.0,
+        "warm_load_ms": statistics.median(warm) * 1000 if warm else 0.0,
+        "tabs": args.tabs,
+        "per_tab_kb": (after - before) / args.tabs / 1e3,
+    }
+
+
+def main():
+    """Parse arguments and run the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES), help="Modes to compare")
+    parser.add_argument("--tabs", type=int, default=50, help="Simulated browser tabs (default: 50)")
+    parser.add_argument("--loads", type=int, default=20, help="Page loads timed per mode (default: 20)")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for mode in args.modes:
+        try:
+            results.append(measure(mode, args))
+        except RuntimeError as e:
+            print(f"{mode}: {e}")
+
+    print(f"{'mode':<10}{'startup':>10}{'idle RSS':>11}{'page':>9}{'assets':>10}{'cold':>10}{'warm':>10}{'per tab':>11}")
+    for r in results:
+        print(
+            f"{r['mode']:<10}{r['startup_s']:>9.2f}s{r['idle_rss_mb']:>8.1f} MB{r['page_bytes'] / 1e3:>6.1f} KB"
+            f"{r['asset_bytes'] / 1e3:>7.1f} KB{r['cold_load_ms']:>8.1f}ms{r['warm_load_ms']:>8.1f}ms"
+            f"{r['per_tab_kb']:>8.1f} KB"
+        )
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
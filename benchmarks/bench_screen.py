@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Benchmark the headless screen model: feed throughput and snapshot cost.
+
+Usage:
+    python benchmarks/bench_screen.py [--mb 8] [--cols 120] [--rows 40]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from events.screen import DEFAULT_SNAPSHOT_LINES, ScreenModel  # noqa: E402
+
+FRAME_SIZE = 64 * 1024
+
+
+def synthetic_output(size: int) -> bytes:
+    """Build build-log style output with colors and multibyte text.
+
+    Args:
+        size: Approximate output size in bytes
+    """
+    lines = [
+        b"\x1b[32m[ok]\x1b[0m compiling module %d \xe2\x94\x80\xe2\x94\x80 done\r\n",
+        b"\x1b[1;33mwarning:\x1b[0m unused variable `x` in src/lib.rs:%d\r\n",
+        b"\xed\x95\x9c\xea\xb8\x80 \x1b[38;5;208mline %d\x1b[0m with 256-color text\r\n",
+    ]
+    out = bytearray()
+    i = 0
+    while len(out) < size:
+        out += lines[i % len(lines)] % i
+        i += 1
+    return bytes(out)
+
+
+async def measure_async(data: bytes, cols: int, rows: int, history: int) -> tuple:
+    """Feed through submit() and measure the worst event-loop stall.
+
+    Returns:
+        Tuple of (seconds until snapshot is ready, max loop stall seconds)
+    """
+    loop = asyncio.get_running_loop()
+    model = ScreenModel(cols, rows, history, max_backlog=len(data) + 1)
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        while not done:
+            before = loop.time()
+            await asyncio.sleep(0.001)
+            stall = max(stall, loop.time() - before - 0.001)
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    for offset in range(0, len(data), FRAME_SIZE):
+        model.submit(data[offset:offset + FRAME_SIZE])
+        await asyncio.sleep(0)
+    await model.snapshot_async()
+    elapsed = time.perf_counter() - start
+    done = True
+    await tick
+    return elapsed, stall
+
+
+def main():
+    """Run the benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=8, help="Output size in MB (default: 8)")
+    parser.add_argument("--cols", type=int, default=120)
+    parser.add_argument("--rows", type=int, default=40)
+    parser.add_argument("--history", type=int, default=DEFAULT_SNAPSHOT_LINES)
+    args = parser.parse_args()
+
+    if not ScreenModel.available:
+        print("pyte is not installed (pip install pyte)")
+        sys.exit(1)
+
+    data = synthetic_output(int(args.mb * 1024 * 1024))
+    model = ScreenModel(args.cols, args.rows, args.history)
+
+    start = time.perf_counter()
+    for offset in range(0, len(data), FRAME_SIZE):
+        model.feed(data[offset:offset + FRAME_SIZE])
+    feed_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    snapshot = model.snapshot().encode("utf-8")
+    snapshot_time = time.perf_counter() - start
+
+    print(f"Feed:     {len(data) / 1e6:.1f} MB in {feed_time:.2f}s = {len(data) / 1e6 / feed_time:.2f} MB/s")
+    print(f"Snapshot: {len(snapshot) / 1e3:.1f} KB in {snapshot_time * 1000:.1f} ms "
+          f"({args.cols}x{args.rows}, {args.history} history lines)")
+    print(f"Replay reduction: {len(data) / len(snapshot):.0f}x smaller than raw output")
+
+    elapsed, stall = asyncio.run(measure_async(data, args.cols, args.rows, args.history))
+    print(f"Async:    {len(data) / 1e6 / elapsed:.2f} MB/s via worker thread, "
+          f"max event-loop stall {stall * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
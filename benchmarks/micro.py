@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""Microbenchmarks for hot paths, compared against stored baselines.
+
+Each benchmark is calibrated to run for at least 0.1 s, repeated five
+times, and the fastest time per operation is reported. Results slower
+than the baseline by more than --threshold are flagged as regressions
+and make the exit status non-zero.
+
+Baselines in benchmarks/baselines.json come from one machine; after an
+intentional change or on new hardware, refresh them with --update.
+
+Usage:
+    python benchmarks/micro.py [--filter NAME] [--threshold 0.25] [--update]
+"""
+
+import argparse
+import asyncio
+import atexit
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from events.output_queue import OutputPipeline  # noqa: E402
+from ssh.backend import SessionBackend  # noqa: E402
+
+BASELINE_FILE = Path(__file__).parent / "baselines.json"
+MIN_TIME = 0.1
+REPEAT = 5
+CHUNK = (b"\x1b[32mok\x1b[0m building target \xe2\x94\x80\xe2\x94\x80 " * 100)[:4096]
+
+# name -> factory returning run(n), or None if the benchmark can't run here
+BENCHMARKS: Dict[str, Callable[[], Optional[Callable[[int], None]]]] = {}
+
+
+def benchmark(func):
+    """Register a benchmark factory under its function name."""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+# --- Session output path (SSHSession._read_output -> OutputPipeline) ---
+
+def _deliver(binary: bool) -> Callable[[int], None]:
+    loop = asyncio.new_event_loop()
+    session = SessionBackend(on_output=lambda output: None, binary=binary)
+
+    async def run_async(n):
+        for _ in range(n):
+            await session._deliver(CHUNK)
+
+    return lambda n: loop.run_until_complete(run_async(n))
+
+
+@benchmark
+def deliver_binary():
+    """One 4 KiB read passed on as bytes."""
+    return _deliver(binary=True)
+
+
+@benchmark
+def deliver_text():
+    """One 4 KiB read incrementally decoded to text."""
+    return _deliver(binary=False)
+
+
+@benchmark
+def pipeline_put_emit():
+    """One 4 KiB chunk queued, merged and emitted by OutputPipeline."""
+    loop = asyncio.new_event_loop()
+
+    async def emit(frame):
+        pass
+
+    async def run_async(n):
+        pipeline = OutputPipeline(emit, flush_interval=0)
+        pipeline.start()
+        for _ in range(n):
+            await pipeline.put(CHUNK)
+        await pipeline.close()
+
+    return lambda n: loop.run_until_complete(run_async(n))
+
+
+# --- Socket.IO input dispatch ---
+
+class _Server:
+    """Minimal socketio.AsyncServer stand-in that records handlers."""
+
+    def __init__(self):
+        self.handlers = {}
+
+    def event(self, handler):
+        self.handlers[handler.__name__] = handler
+        return handler
+
+    async def emit(self, *args, **kwargs):
+        pass
+
+
+class _Session:
+    """Connected session that discards input."""
+
+    is_connected = True
+
+    async def send_input(self, data):
+        pass
+
+
+@benchmark
+def terminal_input():
+    """One keystroke through TerminalHandler's terminal_input handler."""
+    from events.scrollback import ScrollbackBuffer
+    from events.session_registry import TerminalSession
+    from events.socketio_handlers import TerminalHandler
+
+    loop = asyncio.new_event_loop()
+    sio = _Server()
+    handler = TerminalHandler(sio)
+    entry = TerminalSession("client", "tab", "/tmp", ScrollbackBuffer())
+    entry.session = _Session()
+    handler.registry.add(entry)
+    handler.registry.attach(entry, "sid")
+    handler.clients["sid"] = "client"
+    dispatch = sio.handlers["terminal_input"]
+    data = {"tab_id": "tab", "data": "x"}
+
+    async def run_async(n):
+        for _ in range(n):
+            await dispatch("sid", data)
+
+    return lambda n: loop.run_until_complete(run_async(n))
+
+
+# --- Workspace discovery over 10k directories ---
+
+_tree: Optional[Path] = None
+
+
+def _workspace_tree() -> Path:
+    """Create (once) a home with 100 x 100 directories under Projects."""
+    global _tree
+    if _tree is None:
+        _tree = Path(tempfile.mkdtemp(prefix="bench-home-"))
+        atexit.register(shutil.rmtree, _tree, ignore_errors=True)
+        for org in range(100):
+            for repo in range(100):
+                path = _tree / "Projects" / f"org{org:02d}" / f"repo-{org}-{repo}"
+                path.mkdir(parents=True)
+                if repo % 3 == 0:
+                    (path / ".git").mkdir()
+        os.environ["HOME"] = str(_tree)
+    return _tree
+
+
+def _index(**kwargs):
+    from server.workspace_index import WorkspaceIndex
+
+    _workspace_tree()
+    return WorkspaceIndex(dirs=["Projects"], max_depth=2, check_interval=0, **kwargs)
+
+
+@benchmark
+def workspace_scan_10k():
+    """Cold scan of 10k directories (no previous records)."""
+    return lambda n: [_index().get() for _ in range(n)]
+
+
+@benchmark
+def workspace_rescan_10k():
+    """Incremental rescan of 10k unchanged directories."""
+    index = _index()
+    index.get()
+
+    def run(n):
+        for _ in range(n):
+            index.invalidate()
+            index.get()
+
+    return run
+
+
+@benchmark
+def workspace_cached():
+    """Cached index lookup, including the root mtime check."""
+    index = _index()
+    index.get()
+    return lambda n: [index.get() for _ in range(n)]
+
+
+@benchmark
+def workspace_search_10k():
+    """Fuzzy search over 10k workspaces."""
+    from server.workspace_search import WorkspaceSearch
+
+    index = _index()
+    search = WorkspaceSearch(index)
+    snapshot = index.get()
+    search.search(snapshot, "")
+    return lambda n: [search.search(snapshot, "rp42", 50) for _ in range(n)]
+
+
+# --- Page HTML ---
+
+@benchmark
+def terminal_render():
+    """Terminal.render() HTML and script generation (requires nicegui)."""
+    try:
+        from ui.components import terminal
+    except ImportError:
+        return None
+
+    class _UI:
+        """Collects generated HTML instead of adding it to a page."""
+
+        def add_head_html(self, html, *args, **kwargs):
+            self.size += len(html)
+
+        add_body_html = add_head_html
+
+        def html(self, html, *args, **kwargs):
+            self.size += len(html)
+            return self
+
+        def classes(self, *args, **kwargs):
+            return self
+
+        style = classes
+
+    stub = _UI()
+    stub.size = 0
+    terminal.ui = stub
+    component = terminal.Terminal()
+    return lambda n: [component.render() for _ in range(n)]
+
+
+# --- Runner ---
+
+def measure(run: Callable[[int], None]) -> float:
+    """Return the best time per operation in seconds."""
+    n = 1
+    while True:
+        start = time.perf_counter()
+        run(n)
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIME:
+            break
+        # Grow geometrically, jumping close to the target once timings are meaningful
+        n = n * 10 if elapsed < MIN_TIME / 100 else max(n + 1, int(n * MIN_TIME * 1.2 / elapsed))
+    best = elapsed / n
+    for _ in range(REPEAT - 1):
+        start = time.perf_counter()
+        run(n)
+        best = min(best, (time.perf_counter() - start) / n)
+    return best
+
+
+def format_time(seconds: float) -> str:
+    """Human-readable time per operation."""
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    if seconds >= 1e-6:
+        return f"{seconds * 1e6:.2f} us"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+def main():
+    """Run benchmarks, compare with baselines and report regressions."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Slowdown vs baseline flagged as a regression (default: 0.25)")
+    parser.add_argument("--update", action="store_true", help="Store these results as the new baselines")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    args = parser.parse_args()
+
+    baselines = {}
+    if args.baseline.exists():
+        baselines = json.loads(args.baseline.read_text()).get("results", {})
+
+    results = {}
+    regressions = []
+    print(f"{'benchmark':<24} {'time/op':>12} {'baseline':>12} {'change':>8}")
+    for name, factory in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        # Keep log lines of the code under test out of the table
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = factory()
+            result = measure(run) if run else None
+        if result is None:
+            print(f"{name:<24} {'skipped':>12}")
+            continue
+        results[name] = result
+        baseline = baselines.get(name)
+        if baseline:
+            change = result / baseline - 1
+            flag = "  REGRESSION" if change > args.threshold else ""
+            if flag:
+                regressions.append(name)
+            print(f"{name:<24} {format_time(result):>12} {format_time(baseline):>12} {change:>+7.0%}{flag}")
+        else:
+            print(f"{name:<24} {format_time(result):>12} {'-':>12}")
+
+    if args.update:
+        stored = dict(baselines, **results)
+        args.baseline.write_text(json.dumps({
+            "machine": {"python": platform.python_version(), "platform": platform.platform()},
+            "results": dict(sorted(stored.items())),
+        }, indent=2) + "\n")
+        print(f"Updated {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Server metrics in the Prometheus text exposition format."""
+
+import asyncio
+import os
+import resource
+import sys
+import time
+from bisect import bisect_left
+from typing import List, Optional, Sequence
+
+from starlette.responses import Response
+
+PREFIX = "claude_web"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_LAG_INTERVAL = 0.5  # seconds between event-loop lag probes
+
+CONNECT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FIRST_FRAME_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+INPUT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram updated in place.
+
+    Counts are kept per bucket in a preallocated list and only made
+    cumulative when rendered, so observe() is a bisect and two additions.
+    Like all metrics here, it is only updated from the event loop thread
+    and needs no lock.
+    """
+
+    __slots__ = ("name", "help", "buckets", "counts", "sum", "count")
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        """Initialize histogram.
+
+        Args:
+            name: Metric name without prefix
+            help: Help text
+            buckets: Sorted upper bounds, +Inf is implied
+        """
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record one sample."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, lines: List[str]):
+        """Append the histogram in exposition format."""
+        name = f"{PREFIX}_{self.name}"
+        lines.append(f"# HELP {name} {self.help}")
+        lines.append(f"# TYPE {name} histogram")
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {total}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum {self.sum}")
+        lines.append(f"{name}_count {self.count}")
+
+
+class Metrics:
+    """Counters and histograms for terminal sessions and the event loop.
+
+    Totals are plain integer attributes incremented by TerminalHandler.
+    Gauges (clients, sessions, queue depth, RSS) are read when the metrics
+    are rendered. Sessions are only reported in aggregate: /api/metrics is
+    unauthenticated, and per-session labels would publish the ids that
+    reattach sessions and grow without bound as clients come and go.
+    """
+
+    def __init__(self, lag_interval: float = DEFAULT_LAG_INTERVAL):
+        """Initialize metrics.
+
+        Args:
+            lag_interval: Seconds between event-loop lag probes
+        """
+        self.lag_interval = lag_interval
+        self.sessions_started = 0
+        self.sessions_failed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.frames_out = 0
+        self.loop_lag = 0.0
+        self.connect_seconds = Histogram(
+            "session_connect_seconds", "Time to start a session (SSH connect and PTY setup).", CONNECT_BUCKETS
+        )
+        self.first_frame_seconds = Histogram(
+            "session_first_frame_seconds", "Time from a session start request to its first output frame.",
+            FIRST_FRAME_BUCKETS,
+        )
+        self.input_seconds = Histogram(
+            "input_handling_seconds", "Time to handle one terminal_input event.", INPUT_BUCKETS
+        )
+        self.loop_lag_seconds = Histogram(
+            "event_loop_lag_seconds", "Delay of a timer callback beyond its scheduled time.", LAG_BUCKETS
+        )
+        # Keystroke-to-echo segments from latency probes
+        self.latency_network_seconds = Histogram(
+            "latency_network_seconds", "Probe round trip minus server and PTY time, reported by clients.",
+            LATENCY_BUCKETS,
+        )
+        self.latency_server_seconds = Histogram(
+            "latency_server_seconds", "Probe input received until written to the session.", LATENCY_BUCKETS
+        )
+        self.latency_pty_seconds = Histogram(
+            "latency_pty_seconds", "Probe input written until the next output frame is sent.", LATENCY_BUCKETS
+        )
+        self.latency_rtt_seconds = Histogram(
+            "latency_rtt_seconds", "Socket.IO ping round trip, reported by clients.", LATENCY_BUCKETS
+        )
+        self._lag_task: Optional[asyncio.Task] = None
+        self._started = time.time()
+
+    def start(self):
+        """Start the event-loop lag probe if it is not running.
+
+        Must be called from the event loop; safe to call repeatedly.
+        """
+        if self._lag_task is None or self._lag_task.done():
+            self._lag_task = asyncio.get_running_loop().create_task(self._probe_lag())
+
+    async def _probe_lag(self):
+        """Measure how late a periodic sleep wakes up."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            lag = max(0.0, loop.time() - expected)
+            self.loop_lag = lag
+            self.loop_lag_seconds.observe(lag)
+
+    def render(self, handler) -> str:
+        """Render all metrics of a TerminalHandler in exposition format.
+
+        Args:
+            handler: TerminalHandler whose clients and sessions are reported
+
+        Returns:
+            Exposition text
+        """
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help: str, value, samples=None):
+            name = f"{PREFIX}_{name}"
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            if samples is None:
+                lines.append(f"{name} {value}")
+            for labels, sample in samples or ():
+                lines.append(f"{name}{{{labels}}} {sample}")
+
+        entries = list(handler.registry)
+
+        metric("clients", "gauge", "Connected Socket.IO clients.", len(handler.clients))
+        metric("sessions", "gauge", "Running terminal sessions, attached or detached.", len(entries))
+        metric("sessions_attached", "gauge", "Sessions attached to a client.", sum(1 for e in entries if e.sid))
+        metric("sessions_started_total", "counter", "Sessions started.", self.sessions_started)
+        metric("sessions_failed_total", "counter", "Sessions that failed to start.", self.sessions_failed)
+        metric("input_bytes_total", "counter", "Terminal input received, in characters.", self.bytes_in)
+        metric("output_bytes_total", "counter", "Terminal output sent, in bytes or characters.", self.bytes_out)
+        metric("output_frames_total", "counter", "terminal_output frames sent.", self.frames_out)
+        depths = [e.pipeline.queue_depth if e.pipeline else 0 for e in entries]
+        metric("output_queue_depth_total", "gauge", "Output chunks queued across sessions.", sum(depths))
+        metric("output_queue_depth_max", "gauge", "Output chunks queued in the most backed-up session.",
+               max(depths, default=0))
+
+        self.connect_seconds.render(lines)
+        self.first_frame_seconds.render(lines)
+        self.input_seconds.render(lines)
+        self.loop_lag_seconds.render(lines)
+        self.latency_network_seconds.render(lines)
+        self.latency_server_seconds.render(lines)
+        self.latency_pty_seconds.render(lines)
+        self.latency_rtt_seconds.render(lines)
+        metric("event_loop_lag_last_seconds", "gauge", "Most recent event-loop lag probe.", self.loop_lag)
+
+        if handler.warm_pool.enabled:
+            stats = handler.warm_pool.stats()
+            metric("warm_sessions_ready", "gauge", "Warm sessions waiting to be claimed.", stats["ready"])
+            metric("warm_hits_total", "counter", "New tabs served by a warm session.", stats["hits"])
+            metric("warm_misses_total", "counter", "New tabs that found no warm session.", stats["misses"])
+
+        if handler.workers:
+            stats = handler.workers.stats()
+            worker_labels = [f'worker="{s["worker"]}"' for s in stats]
+            metric("worker_sessions", "gauge", "Sessions hosted per worker process.", None,
+                   [(label, s["sessions"]) for label, s in zip(worker_labels, stats)])
+            metric("worker_restarts_total", "counter", "Worker process restarts.", None,
+                   [(label, s["restarts"]) for label, s in zip(worker_labels, stats)])
+
+        metric("process_resident_memory_bytes", "gauge", "Resident memory size.", _rss_bytes())
+        metric("process_start_time_seconds", "gauge", "Start time since the epoch.", self._started)
+        return "\n".join(lines) + "\n"
+
+    def response(self, handler) -> Response:
+        """Serve the metrics of a TerminalHandler.
+
+        Args:
+            handler: TerminalHandler whose clients and sessions are reported
+
+        Returns:
+            Plain-text exposition response
+        """
+        self.start()
+        return Response(self.render(handler), media_type=CONTENT_TYPE)
+
+
+def _rss_bytes() -> int:
+    """Current resident set size, or the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
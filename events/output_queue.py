@@ -0,0 +1,172 @@
+"""Ordered, coalescing output pipeline between a session and Socket.IO."""
+
+import asyncio
+from typing import Awaitable, Callable, Optional, Union
+
+from server.defaults import DEFAULT_FLUSH_INTERVAL, DEFAULT_LOW_WATERMARK, DEFAULT_MAX_FRAME_SIZE
+
+DEFAULT_MAX_QUEUE = 256  # chunks
+
+
+class OutputPipeline:
+    """Bounded per-tab output queue drained by a single writer coroutine.
+
+    Chunks arriving within flush_interval of the first one are merged into
+    one frame (up to max_frame_size), so emits stay ordered and heavy output
+    produces few large packets instead of many tiny ones.
+
+    With a high watermark set, the writer stops emitting while the client has
+    not acknowledged that many bytes and resumes once acknowledgements bring
+    the count below the low watermark. The queue then fills, put() blocks and
+    the session stops reading its channel, so the remote process backs up.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[Union[str, bytes]], Awaitable[None]],
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_frame_size: int = DEFAULT_MAX_FRAME_SIZE,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        high_watermark: Optional[int] = None,
+        low_watermark: int = DEFAULT_LOW_WATERMARK,
+    ):
+        """Initialize output pipeline.
+
+        Args:
+            emit: Coroutine function sending one frame to the client
+            flush_interval: Seconds to wait for more chunks before flushing
+            max_frame_size: Maximum merged frame length
+            max_queue: Maximum queued chunks before put() blocks
+            high_watermark: Unacknowledged bytes that pause emitting
+                (None disables flow control)
+            low_watermark: Unacknowledged bytes that resume emitting
+        """
+        self.emit = emit
+        self.flush_interval = flush_interval
+        self.max_frame_size = max_frame_size
+        self.frames_emitted = 0
+        self.chunks_merged = 0
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.unacked = 0
+        self.pauses = 0
+        self._acked = asyncio.Event()
+        self._acked.set()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the writer coroutine."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, chunk: Union[str, bytes]):
+        """Queue a chunk, waiting while the queue is full.
+
+        Args:
+            chunk: Terminal output to send (text or raw bytes, not mixed)
+        """
+        if chunk:
+            await self._queue.put(chunk)
+
+    def ack(self, size: int):
+        """Record bytes the client has finished processing.
+
+        Args:
+            size: Number of bytes (or characters) acknowledged
+        """
+        # Clamp: text clients may count UTF-16 units, which over-acknowledges
+        self.unacked = max(0, self.unacked - size)
+        if self.unacked <= self.low_watermark:
+            self._acked.set()
+
+    def reset_flow(self, high_watermark: Optional[int]):
+        """Restart flow control for a new client, dropping pending acks.
+
+        Args:
+            high_watermark: New high watermark (None disables flow control)
+        """
+        self.high_watermark = high_watermark
+        self.unacked = 0
+        self._acked.set()
+
+    async def close(self, flush: bool = True):
+        """Stop the writer coroutine.
+
+        Args:
+            flush: Send queued output before stopping
+        """
+        if self._task is None:
+            return
+        if flush:
+            # Don't wait for acknowledgements of output flushed on close
+            self.high_watermark = None
+            self._acked.set()
+            await self._queue.put(None)
+            await self._task
+        else:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of chunks waiting to be sent."""
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        """Return pipeline counters."""
+        return {
+            "queue_depth": self.queue_depth,
+            "frames_emitted": self.frames_emitted,
+            "chunks_merged": self.chunks_merged,
+            "unacked": self.unacked,
+            "pauses": self.pauses,
+        }
+
+    async def _run(self):
+        """Merge queued chunks into frames and emit them in order."""
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            chunk = await self._queue.get()
+            if chunk is None:
+                break
+
+            parts = [chunk]
+            size = len(chunk)
+            deadline = loop.time() + self.flush_interval
+            while size < self.max_frame_size:
+                try:
+                    chunk = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        chunk = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if chunk is None:
+                    closing = True
+                    break
+                parts.append(chunk)
+                size += len(chunk)
+
+            if self.high_watermark is not None and self.unacked >= self.high_watermark:
+                self.pauses += 1
+                self._acked.clear()
+                await self._acked.wait()
+
+            # Empty str or bytes joiner, matching the chunk type
+            frame = parts[0][:0].join(parts)
+            self.frames_emitted += 1
+            self.chunks_merged += len(parts) - 1
+            self.unacked += len(frame)
+            try:
+                await self.emit(frame)
+            except Exception as e:
+                print(f"[Output] Emit failed: {e}")
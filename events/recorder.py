@@ -0,0 +1,421 @@
+"""Session recording in asciicast v2 format with a batched background writer."""
+
+import asyncio
+import codecs
+import gzip
+import json
+import re
+import secrets
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+from server.defaults import DEFAULT_MAX_FILE_BYTES, DEFAULT_MAX_TOTAL_BYTES, DEFAULT_RETENTION_DAYS
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency: pip install zstandard
+    zstandard = None
+
+DEFAULT_FLUSH_BYTES = 64 * 1024  # buffered per session before a write
+DEFAULT_FLUSH_INTERVAL = 1.0  # seconds before a partial batch is written
+READ_CHUNK = 64 * 1024
+
+_EXTENSIONS = {"none": ".cast", "gzip": ".cast.gz", "zstd": ".cast.zst"}
+_NAME = re.compile(r"^[\w.-]+\.cast(\.gz|\.zst)?$")
+
+# (seconds since the recording started, event type, data)
+Record = Tuple[float, str, Union[str, bytes]]
+
+
+class _CastFile:
+    """Recording file, optionally compressed as a stream.
+
+    Each write is flushed to a block boundary so the file can be played
+    back while the session is still running.
+    """
+
+    def __init__(self, path: Path, compression: str):
+        self.raw = open(path, "wb")
+        self.compression = compression
+        if compression == "gzip":
+            self.stream = gzip.GzipFile(fileobj=self.raw, mode="wb")
+        elif compression == "zstd":
+            self.stream = zstandard.ZstdCompressor().stream_writer(self.raw, closefd=False)
+        else:
+            self.stream = self.raw
+
+    def write(self, data: bytes):
+        self.stream.write(data)
+        if self.compression == "gzip":
+            self.stream.flush(zlib.Z_SYNC_FLUSH)
+        elif self.compression == "zstd":
+            self.stream.flush(zstandard.FLUSH_BLOCK)
+        self.raw.flush()
+
+    def close(self):
+        if self.stream is not self.raw:
+            self.stream.close()
+        self.raw.close()
+
+
+class Recording:
+    """asciicast recording of one session.
+
+    Events are appended to an in-memory batch on the event loop; the batch
+    is handed to the recorder's writer thread once it holds flush_bytes or
+    is flush_interval old. Decoding, JSON encoding, compression and file
+    I/O all happen on the writer thread.
+    """
+
+    def __init__(self, recorder: "Recorder", name: str, cols: int, rows: int, title: str):
+        """Initialize recording.
+
+        Args:
+            recorder: Recorder owning the writer thread and directory
+            name: File name without extension
+            cols: Initial terminal columns
+            rows: Initial terminal rows
+            title: Title stored in the header
+        """
+        self.recorder = recorder
+        self.name = name
+        self.title = title
+        self.timestamp = int(time.time())
+        self.started = time.monotonic()
+        self._batch: List[Record] = []
+        self._pending = 0
+        self._flush_handle = None
+        self._closed = False
+        # Writer thread state
+        self._file: Optional[_CastFile] = None
+        self._path: Optional[Path] = None
+        self._part = 0
+        self._part_bytes = 0
+        self._decoders = {}
+        # Size as of the last written event, for headers of later parts
+        self._size = (cols, rows)
+
+    def output(self, data: Union[str, bytes]):
+        """Record terminal output."""
+        self._add("o", data)
+
+    def input(self, data: str):
+        """Record terminal input, if the recorder includes input."""
+        if self.recorder.include_input:
+            self._add("i", data)
+
+    def resize(self, cols: int, rows: int):
+        """Record a terminal resize."""
+        self._add("r", f"{cols}x{rows}")
+
+    def flush(self):
+        """Hand the current batch to the writer thread."""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._batch:
+            batch, self._batch, self._pending = self._batch, [], 0
+            self.recorder._submit(self._write, batch)
+
+    def close(self):
+        """Write the remaining events and close the file."""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self.recorder._submit(self._finish)
+        self.recorder._active.discard(self)
+
+    def _add(self, kind: str, data: Union[str, bytes]):
+        """Append an event to the batch, flushing at the size threshold."""
+        if self._closed:
+            return
+        self._batch.append((time.monotonic() - self.started, kind, data))
+        self._pending += len(data)
+        if self._pending >= self.recorder.flush_bytes:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.recorder.flush_interval, self.flush)
+
+    def _write(self, batch: List[Record]):
+        """Encode and write a batch (writer thread)."""
+        if self._file is None or self._part_bytes >= self.recorder.max_file_bytes:
+            self._rotate()
+        lines = []
+        for elapsed, kind, data in batch:
+            if kind == "r":
+                cols, _, rows = data.partition("x")
+                self._size = (int(cols), int(rows))
+            elif isinstance(data, bytes):
+                decoder = self._decoders.get(kind)
+                if decoder is None:
+                    decoder = self._decoders[kind] = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                data = decoder.decode(data)
+            lines.append(json.dumps([round(elapsed, 6), kind, data], ensure_ascii=False))
+        payload = ("\n".join(lines) + "\n").encode("utf-8")
+        self._file.write(payload)
+        self._part_bytes += len(payload)
+
+    def _rotate(self):
+        """Close the current file and start the next part (writer thread)."""
+        self._close_file()
+        suffix = f".{self._part}" if self._part else ""
+        self._part += 1
+        self._path = self.recorder.directory / f"{self.name}{suffix}{_EXTENSIONS[self.recorder.compression]}"
+        self.recorder._open_paths.add(self._path)
+        self._file = _CastFile(self._path, self.recorder.compression)
+        header = {
+            "version": 2,
+            "width": self._size[0],
+            "height": self._size[1],
+            "timestamp": self.timestamp,
+            "title": self.title,
+            "env": {"TERM": "xterm-256color"},
+        }
+        if self._part > 1:
+            # Event times stay relative to the session start
+            header["part"] = self._part
+        payload = (json.dumps(header) + "\n").encode("utf-8")
+        self._file.write(payload)
+        self._part_bytes = len(payload)
+
+    def _finish(self):
+        """Close the file (writer thread)."""
+        self._close_file()
+
+    def _close_file(self):
+        """Close the current part and apply retention (writer thread)."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self.recorder._open_paths.discard(self._path)
+        self.recorder._prune()
+
+
+class Recorder:
+    """Records sessions to asciicast v2 files in a directory.
+
+    One writer thread serves all sessions, so writes never block the event
+    loop and each file's records stay in order. Files are rotated after
+    max_file_bytes of uncompressed data. Finished files older than
+    retention_days are deleted, and so are the oldest ones while the
+    directory holds more than max_total_bytes.
+
+    File names are a timestamp and a random id. The client and tab that
+    own a recording are only kept in memory (see owner()), because the
+    recording list is served without authentication and client ids
+    reattach sessions.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        include_input: bool = False,
+        compression: str = "none",
+        flush_bytes: int = DEFAULT_FLUSH_BYTES,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+        max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+        retention_days: float = DEFAULT_RETENTION_DAYS,
+    ):
+        """Initialize recorder.
+
+        Args:
+            directory: Directory for recordings (created if missing)
+            include_input: Also record terminal input
+            compression: "none", "gzip" or "zstd" (requires zstandard)
+            flush_bytes: Bytes buffered per session before a write
+            flush_interval: Seconds before a partial batch is written
+            max_file_bytes: Uncompressed bytes per file before rotating
+            max_total_bytes: Bytes of recordings kept on disk
+            retention_days: Days finished recordings are kept
+        """
+        if compression == "zstd" and zstandard is None:
+            print("[Recorder] zstd compression requires zstandard (pip install zstandard); using gzip")
+            compression = "gzip"
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.include_input = include_input
+        self.compression = compression
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self.retention_days = retention_days
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recorder")
+        self._active: Set[Recording] = set()
+        # Files being written; only touched by the writer thread
+        self._open_paths: Set[Path] = set()
+        # Recording name -> (client_id, tab_id) of recordings started by this process
+        self._owners: Dict[str, Tuple[str, str]] = {}
+
+    def start(self, client_id: str, tab_id: str, workspace: str, cols: int, rows: int) -> Recording:
+        """Start recording a session.
+
+        Args:
+            client_id: Browser client that owns the session
+            tab_id: Tab identifier
+            workspace: Working directory, used as the title
+            cols: Terminal columns
+            rows: Terminal rows
+
+        Returns:
+            Recording to feed with the session's events
+        """
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(8)}"
+        self._owners[name] = (client_id, tab_id)
+        recording = Recording(self, name, cols, rows, workspace)
+        self._active.add(recording)
+        return recording
+
+    def owner(self, name: str) -> Optional[Tuple[str, str]]:
+        """Look up who a recording belongs to.
+
+        Args:
+            name: File name as listed, or the recording name without
+                part number and extension
+
+        Returns:
+            (client_id, tab_id), or None for recordings this process did
+            not start
+        """
+        return self._owners.get(name.split(".", 1)[0])
+
+    def close(self):
+        """Finish all recordings and wait for the writer thread."""
+        for recording in list(self._active):
+            recording.close()
+        self._executor.shutdown(wait=True)
+
+    def list(self) -> List[dict]:
+        """List recordings, newest first."""
+        entries = []
+        for path in self.directory.iterdir():
+            if _NAME.match(path.name):
+                stat = path.stat()
+                entries.append({"name": path.name, "size": stat.st_size, "modified": stat.st_mtime})
+        entries.sort(key=lambda entry: entry["modified"], reverse=True)
+        return entries
+
+    def path(self, name: str) -> Optional[Path]:
+        """Resolve a recording name to a file in the directory.
+
+        Args:
+            name: File name as listed
+
+        Returns:
+            Path, or None if the name is invalid or missing
+        """
+        if not _NAME.match(name):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+    def _submit(self, func, *args):
+        """Run func on the writer thread, logging failures."""
+
+        def run():
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"[Recorder] Write failed: {e}")
+
+        self._executor.submit(run)
+
+    def _prune(self):
+        """Delete expired recordings, then the oldest over the size limit (writer thread)."""
+        cutoff = time.time() - self.retention_days * 86400
+        files = []
+        for path in self.directory.iterdir():
+            if not _NAME.match(path.name) or path in self._open_paths:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if stat.st_mtime < cutoff:
+                self._delete(path)
+            else:
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_total_bytes:
+                break
+            self._delete(path)
+            total -= size
+
+    def _delete(self, path: Path):
+        """Delete a recording file, forgetting its owner with the last part (writer thread)."""
+        path.unlink(missing_ok=True)
+        name = path.name.split(".", 1)[0]
+        if name in self._owners and not any(self.directory.glob(f"{name}.*")):
+            self._owners.pop(name, None)
+
+
+def _read_file(path: Path) -> Iterator[bytes]:
+    """Yield a file in chunks."""
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_CHUNK):
+            yield chunk
+
+
+def _read_decompressed(path: Path) -> Iterator[bytes]:
+    """Yield the decompressed contents of a gzip or zstd recording in chunks."""
+    if path.suffix == ".zst":
+        with open(path, "rb") as raw, zstandard.ZstdDecompressor().stream_reader(raw) as reader:
+            while chunk := reader.read(READ_CHUNK):
+                yield chunk
+        return
+    decompressor = zlib.decompressobj(wbits=31)
+    for chunk in _read_file(path):
+        yield decompressor.decompress(chunk)
+    yield decompressor.flush()
+
+
+async def recordings_response(recorder: Optional[Recorder]) -> JSONResponse:
+    """Serve the list of recordings.
+
+    Args:
+        recorder: Session recorder, None if recording is disabled
+
+    Returns:
+        JSON list of name, size and modification time
+    """
+    if recorder is None:
+        return JSONResponse({"error": "Recording is disabled"}, status_code=404)
+    return JSONResponse(recorder.list())
+
+
+async def recording_response(request: Request, recorder: Optional[Recorder], name: str) -> Response:
+    """Stream one recording without loading it into memory.
+
+    gzip files are sent as stored with Content-Encoding: gzip when the
+    client accepts it; otherwise, and for zstd, they are decompressed
+    while streaming.
+
+    Args:
+        request: Incoming request
+        recorder: Session recorder, None if recording is disabled
+        name: Recording file name
+
+    Returns:
+        Streaming asciicast response, 404 if not found
+    """
+    path = recorder.path(name) if recorder else None
+    if path is None:
+        return JSONResponse({"error": "Recording not found"}, status_code=404)
+    media_type = "application/x-asciicast"
+    if path.suffix == ".gz" and "gzip" in request.headers.get("accept-encoding", ""):
+        return StreamingResponse(_read_file(path), media_type=media_type, headers={"Content-Encoding": "gzip"})
+    if path.suffix in (".gz", ".zst"):
+        if path.suffix == ".zst" and zstandard is None:
+            return JSONResponse({"error": "zstd playback requires zstandard"}, status_code=501)
+        return StreamingResponse(_read_decompressed(path), media_type=media_type)
+    return StreamingResponse(_read_file(path), media_type=media_type)
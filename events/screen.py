@@ -0,0 +1,331 @@
+"""Headless VT screen model used to build compact reattach snapshots."""
+
+import asyncio
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Union
+
+from server.defaults import DEFAULT_SNAPSHOT_LINES
+
+try:
+    import pyte
+    from pyte import graphics
+except ImportError:  # Optional dependency: pip install pyte
+    pyte = None
+
+DEFAULT_MAX_BACKLOG = 1024 * 1024  # bytes queued for the emulator
+
+# Private modes pyte keeps in screen.mode as (mode << 5)
+_ALT_SCREEN_MODES = (47, 1047, 1049)
+_DECTCEM = 25
+_DECAWM = 7
+
+
+if pyte is not None:
+
+    class _HistoryScreen(pyte.Screen):
+        """Screen that keeps lines scrolled off the top.
+
+        pyte's HistoryScreen wraps every attribute access to support paging,
+        which makes feeding an order of magnitude slower; only the history
+        is needed here.
+        """
+
+        def __init__(self, columns: int, lines: int, history: int):
+            super().__init__(columns, lines)
+            self.history_top = deque(maxlen=history)
+            # cells[attrs][char] = Char; cells are immutable and shared
+            self._cells: Dict[tuple, Dict[str, tuple]] = {}
+
+        def index(self):
+            top, bottom = self.margins or pyte.screens.Margins(0, self.lines - 1)
+            if self.cursor.y == bottom and top == 0:
+                self.history_top.append(self.buffer[top])
+            super().index()
+
+        def draw(self, data: str):
+            # Fast path for printable ASCII with autowrap: one shared cell per
+            # character instead of a namedtuple _replace() per cell
+            if (
+                self.charset
+                or self.g0_charset is not pyte.charsets.LAT1_MAP
+                or not data.isascii()
+                or not data.isprintable()
+                or pyte.modes.IRM in self.mode
+                or pyte.modes.DECAWM not in self.mode
+            ):
+                super().draw(data)
+                return
+
+            cursor = self.cursor
+            columns = self.columns
+            cells = self._cells.get(cursor.attrs)
+            if cells is None:
+                if len(self._cells) >= 256:
+                    self._cells.clear()
+                cells = self._cells[cursor.attrs] = {}
+            attrs = cursor.attrs
+            i = 0
+            while i < len(data):
+                if cursor.x >= columns:
+                    self.dirty.add(cursor.y)
+                    self.carriage_return()
+                    self.linefeed()
+                chunk = data[i:i + columns - cursor.x]
+                line = self.buffer[cursor.y]
+                x = cursor.x
+                for char in chunk:
+                    cell = cells.get(char)
+                    if cell is None:
+                        cell = cells[char] = attrs._replace(data=char)
+                    line[x] = cell
+                    x += 1
+                cursor.x = x
+                i += len(chunk)
+            self.dirty.add(cursor.y)
+
+
+def _color_codes() -> Dict[str, Dict[str, str]]:
+    """Map pyte color names back to SGR parameters."""
+    fg = {name: str(code) for code, name in graphics.FG_ANSI.items()}
+    fg.update({name: str(code) for code, name in graphics.FG_AIXTERM.items()})
+    bg = {name: str(code) for code, name in graphics.BG_ANSI.items()}
+    bg.update({name: str(code) for code, name in graphics.BG_AIXTERM.items()})
+    return {"fg": fg, "bg": bg}
+
+
+class ScreenModel:
+    """Server-side terminal emulator fed with a session's output.
+
+    Feeding is incremental; snapshot() renders the visible screen, the last
+    history lines, cursor and private modes as escape sequences, so reattach
+    cost depends on screen size rather than on how much output was produced.
+
+    pyte parses at well under the rate a PTY can produce output, so from the
+    event loop use submit()/submit_resize()/snapshot_async(), which run the
+    emulator in a worker thread. If the backlog exceeds max_backlog the
+    emulator is reset and only the newest output is kept, which redraws
+    the screen for typical full-screen applications.
+    """
+
+    available = pyte is not None
+
+    def __init__(
+        self,
+        cols: int,
+        rows: int,
+        history_lines: int = DEFAULT_SNAPSHOT_LINES,
+        max_backlog: int = DEFAULT_MAX_BACKLOG,
+    ):
+        """Initialize screen model.
+
+        Args:
+            cols: Terminal columns
+            rows: Terminal rows
+            history_lines: Scrollback lines kept for snapshots
+            max_backlog: Output bytes queued before the backlog is truncated
+        """
+        if pyte is None:
+            raise RuntimeError("Screen model requires pyte (pip install pyte)")
+        self.screen = _HistoryScreen(cols, rows, history_lines)
+        self._byte_stream = pyte.ByteStream(self.screen)
+        self._text_stream = pyte.Stream(self.screen)
+        self._colors = _color_codes()
+        self.max_backlog = max_backlog
+        self.truncations = 0
+        # Pending ("feed", frame) and ("resize", (cols, rows)) operations
+        self._pending: List[Tuple[str, object]] = []
+        self._pending_bytes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, output: Union[str, bytes]):
+        """Queue output to be fed in a worker thread.
+
+        Args:
+            output: Output frame
+        """
+        self._pending.append(("feed", output))
+        self._pending_bytes += len(output)
+        if self._pending_bytes > self.max_backlog:
+            self._truncate_backlog()
+        self._schedule()
+
+    def submit_resize(self, cols: int, rows: int):
+        """Queue a resize, ordered with pending output.
+
+        Args:
+            cols: New column count
+            rows: New row count
+        """
+        self._pending.append(("resize", (cols, rows)))
+        self._schedule()
+
+    async def snapshot_async(self) -> str:
+        """Render a snapshot once all queued operations are applied.
+
+        Returns:
+            Snapshot as returned by snapshot()
+        """
+        while self._task is not None:
+            await asyncio.shield(self._task)
+        # Occupy the task slot so no feed runs concurrently with rendering
+        self._task = asyncio.ensure_future(asyncio.to_thread(self.snapshot))
+        try:
+            return await asyncio.shield(self._task)
+        finally:
+            self._task = None
+            if self._pending:
+                self._schedule()
+
+    def _schedule(self):
+        """Start the drain task if it is not running."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._drain())
+
+    async def _drain(self):
+        """Apply queued operations in a worker thread until none are left."""
+        try:
+            while self._pending:
+                pending, self._pending = self._pending, []
+                self._pending_bytes = 0
+                await asyncio.to_thread(self._apply, pending)
+        finally:
+            self._task = None
+
+    def _apply(self, pending: List[Tuple[str, object]]):
+        """Apply operations in order, merging consecutive frames."""
+        frames = []
+        for op, arg in pending:
+            if op == "feed":
+                frames.append(arg)
+                continue
+            if frames:
+                self.feed(frames[0][:0].join(frames))
+                frames = []
+            if op == "reset":
+                self.screen.reset()
+            elif op == "resize":
+                self.resize(*arg)
+        if frames:
+            self.feed(frames[0][:0].join(frames))
+
+    def _truncate_backlog(self):
+        """Keep only the newest output when the emulator falls behind."""
+        self.truncations += 1
+        kept: List[Tuple[str, object]] = []
+        size = 0
+        for op, arg in reversed(self._pending):
+            if op == "feed":
+                if size >= self.max_backlog // 2:
+                    continue
+                size += len(arg)
+            kept.append((op, arg))
+        kept.reverse()
+        self._pending = [("reset", None)] + kept
+        self._pending_bytes = size
+
+    def feed(self, output: Union[str, bytes]):
+        """Feed terminal output to the emulator.
+
+        Args:
+            output: Output frame (bytes are decoded incrementally)
+        """
+        if isinstance(output, bytes):
+            self._byte_stream.feed(output)
+        else:
+            self._text_stream.feed(output)
+
+    def resize(self, cols: int, rows: int):
+        """Resize the emulated screen.
+
+        Args:
+            cols: New column count
+            rows: New row count
+        """
+        self.screen.resize(rows, cols)
+
+    def snapshot(self) -> str:
+        """Render the current state as escape sequences.
+
+        Returns:
+            Output that redraws history, screen, modes and cursor on a
+            freshly reset terminal
+        """
+        screen = self.screen
+        private = {mode >> 5 for mode in screen.mode if mode >= 32}
+        parts = []
+
+        # Switch buffers first so the screen is drawn where the app expects it
+        for mode in _ALT_SCREEN_MODES:
+            if mode in private:
+                parts.append(f"\x1b[?{mode}h")
+
+        lines = [self._render_line(line, screen.columns) for line in screen.history_top]
+        lines += [self._render_line(screen.buffer[y], screen.columns) for y in range(screen.lines)]
+        parts.append("\r\n".join(lines))
+
+        for mode in sorted(private):
+            if mode not in _ALT_SCREEN_MODES and mode not in (_DECTCEM, _DECAWM):
+                parts.append(f"\x1b[?{mode}h")
+        if _DECAWM not in private:
+            parts.append("\x1b[?7l")
+        if _DECTCEM not in private:
+            parts.append("\x1b[?25l")
+
+        cursor = screen.cursor
+        parts.append(f"\x1b[{cursor.y + 1};{cursor.x + 1}H")
+        parts.append(f"\x1b[{self._sgr(cursor.attrs)}m")
+        if screen.title:
+            parts.append(f"\x1b]2;{screen.title}\x07")
+        return "".join(parts)
+
+    def _render_line(self, line, columns: int) -> str:
+        """Render one screen line with SGR attributes, trimming blanks."""
+        default = self.screen.default_char
+        last = -1
+        for x in range(columns):
+            char = line[x]
+            if char.data not in ("", " ") or char.bg != default.bg or char.reverse:
+                last = x
+
+        parts = []
+        current = "0"  # Every line starts and ends with default attributes
+        for x in range(last + 1):
+            char = line[x]
+            if not char.data:
+                continue  # Second cell of a wide character
+            sgr = self._sgr(char)
+            if sgr != current:
+                parts.append(f"\x1b[{sgr}m")
+                current = sgr
+            parts.append(char.data)
+        if current != "0":
+            parts.append("\x1b[0m")
+        return "".join(parts)
+
+    def _sgr(self, char) -> str:
+        """Build SGR parameters for a cell's attributes."""
+        params = ["0"]
+        if char.bold:
+            params.append("1")
+        if char.italics:
+            params.append("3")
+        if char.underscore:
+            params.append("4")
+        if char.blink:
+            params.append("5")
+        if char.reverse:
+            params.append("7")
+        if char.strikethrough:
+            params.append("9")
+        for kind, base in (("fg", "38"), ("bg", "48")):
+            color = getattr(char, kind)
+            if color == "default":
+                continue
+            code = self._colors[kind].get(color)
+            if code:
+                params.append(code)
+            elif len(color) == 6:
+                # 256-color and truecolor cells are stored as hex
+                r, g, b = (int(color[i:i + 2], 16) for i in (0, 2, 4))
+                params.append(f"{base};2;{r};{g};{b}")
+        return ";".join(params)
@@ -0,0 +1,56 @@
+"""Bounded ring buffer of recent terminal output."""
+
+from collections import deque
+from typing import Deque, Union
+
+from server.defaults import DEFAULT_SCROLLBACK_BYTES
+
+
+class ScrollbackBuffer:
+    """Keeps the most recent output frames up to a byte budget.
+
+    Oldest frames are evicted first; a single frame larger than the budget
+    is truncated to its tail.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_SCROLLBACK_BYTES):
+        """Initialize scrollback buffer.
+
+        Args:
+            max_bytes: Maximum buffered output size
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._frames: Deque[Union[str, bytes]] = deque()
+
+    def append(self, frame: Union[str, bytes]):
+        """Add a frame, evicting the oldest ones when over budget.
+
+        Args:
+            frame: Terminal output (text or raw bytes, not mixed)
+        """
+        if not frame or self.max_bytes <= 0:
+            return
+        if len(frame) >= self.max_bytes:
+            self._frames.clear()
+            frame = frame[-self.max_bytes:]
+            self.size = 0
+        self._frames.append(frame)
+        self.size += len(frame)
+        while self.size > self.max_bytes:
+            self.size -= len(self._frames.popleft())
+
+    def snapshot(self) -> Union[str, bytes]:
+        """Return buffered output as one frame.
+
+        Returns:
+            Joined output, or empty bytes if nothing is buffered
+        """
+        if not self._frames:
+            return b""
+        return self._frames[0][:0].join(self._frames)
+
+    def clear(self):
+        """Drop all buffered output."""
+        self._frames.clear()
+        self.size = 0
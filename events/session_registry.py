@@ -0,0 +1,174 @@
+"""Terminal sessions that outlive the Socket.IO connection that started them."""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from events.output_queue import OutputPipeline
+from events.recorder import Recording
+from events.screen import ScreenModel
+from events.scrollback import ScrollbackBuffer
+from server.defaults import DEFAULT_GRACE_PERIOD
+from ssh.backend import SessionBackend
+
+
+class TerminalSession:
+    """Terminal session with its output pipeline and scrollback.
+
+    Output goes to whichever Socket.IO connection is attached (sid), or only
+    into the scrollback while detached.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        tab_id: str,
+        workspace: str,
+        scrollback: ScrollbackBuffer,
+        screen: Optional[ScreenModel] = None,
+        binary: bool = False,
+    ):
+        """Initialize terminal session.
+
+        Args:
+            client_id: Browser client that owns the session
+            tab_id: Tab identifier, unique per client
+            workspace: Working directory of the session
+            scrollback: Buffer of recent output for reattach
+            screen: Headless screen model replacing raw scrollback replay
+            binary: Whether output frames are raw bytes
+        """
+        self.client_id = client_id
+        self.tab_id = tab_id
+        self.workspace = workspace
+        self.scrollback = scrollback
+        self.screen = screen
+        self.binary = binary
+        self.session: Optional[SessionBackend] = None
+        self.pipeline: Optional[OutputPipeline] = None
+        self.sid: Optional[str] = None
+        self.created_at = time.time()
+        self._started = time.monotonic()
+        # Seconds from start request to the first output frame
+        self.startup_time: Optional[float] = None
+        self.detached_at: Optional[float] = None
+        # Traffic counters, reported to the owner in the session list
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.frames_out = 0
+        # Pending latency probe: (client sequence number, perf_counter() when received)
+        self.probe: Optional[Tuple[int, float]] = None
+        # asciicast recording, if the server records sessions
+        self.recording: Optional[Recording] = None
+        # Held while emitting so a reattach replay is never interleaved
+        self.lock = asyncio.Lock()
+        self._reap_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        """Registry key (client_id, tab_id)."""
+        return (self.client_id, self.tab_id)
+
+    def record_frame(self) -> bool:
+        """Note that an output frame was sent.
+
+        Returns:
+            True for the session's first frame (startup_time was set)
+        """
+        if self.startup_time is not None:
+            return False
+        self.startup_time = time.monotonic() - self._started
+        return True
+
+    async def replay(self):
+        """Return output that restores the terminal on reattach.
+
+        Returns:
+            Screen snapshot if a screen model is kept, else raw scrollback
+        """
+        if self.screen is None:
+            return self.scrollback.snapshot()
+        snapshot = await self.screen.snapshot_async()
+        return snapshot.encode("utf-8") if self.binary else snapshot
+
+    def info(self) -> dict:
+        """Return session info for the client's session list."""
+        return {
+            "tab_id": self.tab_id,
+            "workspace": self.workspace,
+            "attached": self.sid is not None,
+            "created_at": self.created_at,
+            "scrollback_bytes": self.scrollback.size,
+            "startup_ms": None if self.startup_time is None else round(self.startup_time * 1000, 1),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "frames_out": self.frames_out,
+            "recording": self.recording.name if self.recording else None,
+        }
+
+
+class SessionRegistry:
+    """Sessions keyed by (client_id, tab_id), reaped after a grace period."""
+
+    def __init__(self, grace_period: float = DEFAULT_GRACE_PERIOD):
+        """Initialize session registry.
+
+        Args:
+            grace_period: Seconds a detached session is kept before reaping
+        """
+        self.grace_period = grace_period
+        self._sessions: Dict[Tuple[str, str], TerminalSession] = {}
+
+    def add(self, entry: TerminalSession):
+        """Register a session."""
+        self._sessions[entry.key] = entry
+
+    def get(self, client_id: str, tab_id: str) -> Optional[TerminalSession]:
+        """Look up a session by owner and tab."""
+        return self._sessions.get((client_id, tab_id))
+
+    def remove(self, entry: TerminalSession):
+        """Unregister a session and cancel its pending reap."""
+        if self._sessions.get(entry.key) is entry:
+            del self._sessions[entry.key]
+        self._cancel_reap(entry)
+
+    def for_client(self, client_id: str) -> List[TerminalSession]:
+        """List sessions owned by a client, oldest first."""
+        entries = [e for e in self._sessions.values() if e.client_id == client_id]
+        return sorted(entries, key=lambda e: e.created_at)
+
+    def attached_to(self, sid: str) -> List[TerminalSession]:
+        """List sessions attached to a Socket.IO connection."""
+        return [e for e in self._sessions.values() if e.sid == sid]
+
+    def __iter__(self):
+        return iter(list(self._sessions.values()))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def attach(self, entry: TerminalSession, sid: str):
+        """Attach a session to a connection, cancelling any pending reap."""
+        self._cancel_reap(entry)
+        entry.sid = sid
+        entry.detached_at = None
+
+    def detach(self, entry: TerminalSession, on_expire: Callable[[TerminalSession], None]):
+        """Detach a session and schedule on_expire after the grace period.
+
+        Args:
+            entry: Session to detach
+            on_expire: Called with the session if nobody reattaches in time
+        """
+        entry.sid = None
+        entry.detached_at = time.time()
+        self._cancel_reap(entry)
+        loop = asyncio.get_running_loop()
+        entry._reap_handle = loop.call_later(self.grace_period, on_expire, entry)
+
+    def _cancel_reap(self, entry: TerminalSession):
+        """Cancel a pending reap of a session."""
+        if entry._reap_handle:
+            entry._reap_handle.cancel()
+            entry._reap_handle = None
@@ -1,41 +1,142 @@
 """Socket.IO event handlers for terminal communication."""
 
 import asyncio
-from typing import Dict
+import math
+import secrets
+import time
+from typing import Callable, Coroutine, Dict, Optional, Set
 
 import socketio
 
-from ssh.session import SSHSession
+from events.metrics import Metrics
+from events.output_queue import OutputPipeline
+from events.recorder import Recorder
+from events.screen import DEFAULT_SNAPSHOT_LINES, ScreenModel
+from events.scrollback import DEFAULT_SCROLLBACK_BYTES, ScrollbackBuffer
+from events.session_registry import SessionRegistry, TerminalSession
+from events.warm_pool import WarmSessionPool
+from server.defaults import DEFAULT_HIGH_WATERMARK
+from ssh.backend import SessionBackend, get_backend
+from ssh.pool import SSHConnectionPool
+from ssh.worker import WorkerPool
+
+CLIENT_ID_BYTES = 24  # entropy of issued client ids
+
+
+def _milliseconds(data, key: str) -> Optional[float]:
+    """Read a client-reported duration in ms as seconds.
+
+    Args:
+        data: Event payload from the client
+        key: Payload key holding the duration
+
+    Returns:
+        Non-negative seconds, or None if the value is missing or invalid
+    """
+    value = data.get(key) if isinstance(data, dict) else None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        return None
+    return max(0.0, value) / 1000
 
 
 class TerminalHandler:
     """Handles Socket.IO events for terminal sessions."""
 
-    def __init__(self, sio: socketio.AsyncServer):
+    def __init__(
+        self,
+        sio: socketio.AsyncServer,
+        pool: Optional[SSHConnectionPool] = None,
+        output_options: Optional[dict] = None,
+        registry: Optional[SessionRegistry] = None,
+        scrollback_bytes: int = DEFAULT_SCROLLBACK_BYTES,
+        screen_model: bool = False,
+        snapshot_lines: int = DEFAULT_SNAPSHOT_LINES,
+        backend: str = "ssh",
+        warm_sessions: int = 0,
+        warm_options: Optional[dict] = None,
+        on_workspace_start: Optional[Callable[[str], None]] = None,
+        metrics: Optional[Metrics] = None,
+        recorder: Optional[Recorder] = None,
+        workers: Optional[WorkerPool] = None,
+    ):
         """Initialize handler with Socket.IO server.
 
         Args:
             sio: AsyncServer instance
+            pool: SSH connection pool shared by all tabs
+            output_options: Keyword arguments for each tab's OutputPipeline
+            registry: Registry keeping sessions alive across reconnects
+            scrollback_bytes: Output kept per session for reattach replay
+            screen_model: Keep a headless screen per session and send a
+                snapshot on reattach instead of replaying raw scrollback
+            snapshot_lines: Scrollback lines included in a snapshot
+            backend: Session backend, "ssh" (localhost) or "local" (PTY)
+            warm_sessions: Pre-started sessions kept for new tabs (0 disables)
+            warm_options: Keyword arguments for the WarmSessionPool
+            on_workspace_start: Called with the workspace of each started
+                session (e.g. to rank recently used workspaces)
+            metrics: Counters served by /api/metrics
+            recorder: Records each session to an asciicast file
+            workers: Worker processes hosting the sessions (None runs
+                them in this process)
         """
         self.sio = sio
-        # sessions[sid][tab_id] = SSHSession
-        self.sessions: Dict[str, Dict[str, SSHSession]] = {}
+        self.pool = pool or SSHConnectionPool()
+        self.output_options = output_options or {}
+        self.registry = registry if registry is not None else SessionRegistry()
+        self.scrollback_bytes = scrollback_bytes
+        self.screen_model = screen_model and ScreenModel.available
+        self.snapshot_lines = snapshot_lines
+        self.backend = backend
+        self.session_class = get_backend(backend)
+        self.on_workspace_start = on_workspace_start
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.recorder = recorder
+        self.workers = workers
+        self.warm_pool = WarmSessionPool(
+            lambda on_output, on_close: self._create_session(on_output, on_close, True),
+            warm_sessions,
+            **(warm_options or {}),
+        )
+        # clients[sid] = client_id, stable across reconnects of a browser tab
+        self.clients: Dict[str, str] = {}
+        # Client ids issued by this server; only these can reattach sessions
+        self.client_ids: Set[str] = set()
+        # Strong references to background tasks until they finish
+        self._tasks: Set[asyncio.Task] = set()
         self._register_handlers()
 
     def _register_handlers(self):
         """Register all Socket.IO event handlers."""
 
         @self.sio.event
-        async def connect(sid, environ):
-            """Handle client connection."""
-            print(f"[SocketIO] Client connected: {sid}")
-            self.sessions[sid] = {}
+        async def connect(sid, environ, auth=None):
+            """Handle client connection.
+
+            A client presenting an id this server issued gets its sessions
+            back. Any other id is replaced by a fresh one, sent with the
+            session list, so guessing an id attaches nothing.
+            """
+            client_id = (auth or {}).get("client_id")
+            reconnected = client_id in self.client_ids
+            if not reconnected:
+                client_id = secrets.token_urlsafe(CLIENT_ID_BYTES)
+                self.client_ids.add(client_id)
+            print(f"[SocketIO] Client connected: {sid}{' (reconnect)' if reconnected else ''}")
+            self.clients[sid] = client_id
+            self.metrics.start()
 
         @self.sio.event
         async def disconnect(sid):
-            """Handle client disconnection."""
+            """Handle client disconnection.
+
+            Sessions are detached, not stopped, so the client can reattach.
+            """
             print(f"[SocketIO] Client disconnected: {sid}")
-            await self._cleanup_all_sessions(sid)
+            self._detach_all_sessions(sid)
+            client_id = self.clients.pop(sid, None)
+            if client_id:
+                self._forget_client(client_id)
 
         @self.sio.event
         async def start_session(sid, data):
@@ -43,13 +144,17 @@ class TerminalHandler:
 
             Args:
                 sid: Client session ID
-                data: Dict with workspace, tab_id, and optional password
+                data: Dict with workspace, tab_id, optional password,
+                    optional binary flag to receive raw PTY bytes, and
+                    optional flow_control flag to acknowledge output
             """
             workspace = data.get("workspace", "")
             tab_id = data.get("tab_id", "default")
             password = data.get("password")
             cols = data.get("cols", 120)
             rows = data.get("rows", 40)
+            binary = bool(data.get("binary", False))
+            flow_control = bool(data.get("flow_control", False))
 
             if not workspace:
                 await self.sio.emit(
@@ -59,58 +164,205 @@ class TerminalHandler:
                 )
                 return
 
-            # Create output callback for this session
-            async def send_output(text: str):
-                await self.sio.emit("terminal_output", {"tab_id": tab_id, "data": text}, to=sid)
+            client_id = self.clients.get(sid, sid)
+            existing = self.registry.get(client_id, tab_id)
+            if existing:
+                await self._stop_session(existing)
+
+            if self.screen_model:
+                # The snapshot replaces raw replay, so keep no raw scrollback
+                screen = ScreenModel(cols, rows, self.snapshot_lines)
+                scrollback = ScrollbackBuffer(0)
+            else:
+                screen = None
+                scrollback = ScrollbackBuffer(self.scrollback_bytes)
+            entry = TerminalSession(client_id, tab_id, workspace, scrollback, screen=screen, binary=binary)
+            self.registry.add(entry)
+            self.registry.attach(entry, sid)
+            if self.recorder:
+                entry.recording = self.recorder.start(client_id, tab_id, workspace, cols, rows)
 
-            def output_callback(text: str):
-                asyncio.create_task(send_output(text))
+            # Ordered, coalescing output queue for this session
+            options = dict(self.output_options)
+            options["high_watermark"] = self._high_watermark(flow_control)
+            entry.pipeline = OutputPipeline(lambda output: self._send_output(entry, output), **options)
+            entry.pipeline.start()
 
             # Create close callback
             async def send_close():
-                await self.sio.emit("session_closed", {"tab_id": tab_id}, to=sid)
+                await entry.pipeline.close()
+                self._close_recording(entry)
+                if entry.sid:
+                    await self.sio.emit("session_closed", {"tab_id": tab_id}, to=entry.sid)
 
             def close_callback():
-                asyncio.create_task(send_close())
                 # Clean up session
-                if sid in self.sessions and tab_id in self.sessions[sid]:
-                    del self.sessions[sid][tab_id]
-
-            # Create and connect SSH session
-            session = SSHSession(on_output=output_callback, on_close=close_callback)
-            success = await session.connect(
-                workspace=workspace,
-                password=password,
-                cols=cols,
-                rows=rows,
-            )
+                self.registry.remove(entry)
+                self._forget_client(client_id)
+                self._spawn(send_close())
+
+            # Warm sessions are binary and use key authentication
+            warm = self.warm_pool.take(workspace, cols, rows) if binary and not password else None
+            if warm:
+                print(f"[WarmPool] Hit for {workspace} ({self.warm_pool.hits} hits, {self.warm_pool.misses} misses)")
+                # Redirect before awaiting so no output is lost or reordered
+                entry.session = warm.session
+                entry.session.on_output = entry.pipeline.put
+                entry.session.on_close = close_callback
+                if warm.output:
+                    await entry.pipeline.put(b"".join(warm.output))
+                if (cols, rows) != (warm.cols, warm.rows):
+                    await entry.session.resize(cols, rows)
+                success = entry.session.is_connected
+            else:
+                # Create and connect session
+                entry.session = self._create_session(entry.pipeline.put, close_callback, binary)
+                started = time.perf_counter()
+                success = await entry.session.connect(
+                    workspace=workspace,
+                    password=password,
+                    cols=cols,
+                    rows=rows,
+                )
+                self.metrics.connect_seconds.observe(time.perf_counter() - started)
 
             if success:
-                if sid not in self.sessions:
-                    self.sessions[sid] = {}
-                self.sessions[sid][tab_id] = session
+                self.metrics.sessions_started += 1
+                if self.on_workspace_start:
+                    self.on_workspace_start(workspace)
                 await self.sio.emit("session_started", {"tab_id": tab_id, "workspace": workspace}, to=sid)
             else:
+                self.metrics.sessions_failed += 1
+                self.registry.remove(entry)
+                await entry.pipeline.close()
+                self._close_recording(entry)
                 await self.sio.emit(
                     "terminal_error",
-                    {"tab_id": tab_id, "message": "Failed to connect SSH session"},
+                    {"tab_id": tab_id, "message": f"Failed to start {self.backend} session"},
                     to=sid,
                 )
 
+        @self.sio.event
+        async def warm_hint(sid, data):
+            """Start warming a workspace the user highlighted.
+
+            Args:
+                sid: Client session ID
+                data: Dict with workspace
+            """
+            self.warm_pool.hint(data.get("workspace", "") if data else "")
+
+        @self.sio.event
+        async def list_sessions(sid, data=None):
+            """List the client's sessions, including detached ones.
+
+            The list carries the client id, which the client presents on
+            its next connect to reattach.
+
+            Args:
+                sid: Client session ID
+                data: Unused
+            """
+            client_id = self.clients.get(sid, sid)
+            sessions = [entry.info() for entry in self.registry.for_client(client_id)]
+            await self.sio.emit("session_list", {"client_id": client_id, "sessions": sessions}, to=sid)
+
+        @self.sio.event
+        async def attach_session(sid, data):
+            """Reattach to a running session and replay its scrollback.
+
+            Args:
+                sid: Client session ID
+                data: Dict with tab_id and optional flow_control flag
+            """
+            tab_id = data.get("tab_id", "default")
+            flow_control = bool(data.get("flow_control", False))
+            entry = self.registry.get(self.clients.get(sid, sid), tab_id)
+            if not entry or not entry.session or not entry.session.is_connected:
+                await self.sio.emit(
+                    "terminal_error",
+                    {"tab_id": tab_id, "message": "Session not found"},
+                    to=sid,
+                )
+                await self.sio.emit("session_closed", {"tab_id": tab_id}, to=sid)
+                return
+
+            # Hold the emit lock so no live frame lands before the replay
+            async with entry.lock:
+                previous_sid = entry.sid
+                self.registry.attach(entry, sid)
+                entry.pipeline.reset_flow(self._high_watermark(flow_control))
+                if previous_sid and previous_sid != sid:
+                    await self.sio.emit("session_detached", {"tab_id": tab_id}, to=previous_sid)
+                await self.sio.emit(
+                    "session_attached",
+                    {"tab_id": tab_id, "workspace": entry.workspace},
+                    to=sid,
+                )
+                replay = await entry.replay()
+                if replay:
+                    await self.sio.emit("terminal_output", {"tab_id": tab_id, "data": replay}, to=sid)
+
         @self.sio.event
         async def terminal_input(sid, data):
             """Handle terminal input from client.
 
             Args:
                 sid: Client session ID
-                data: Dict with tab_id and input string
+                data: Dict with tab_id, input string and an optional probe
+                    sequence number to time until the next output frame
             """
-            tab_id = data.get("tab_id", "default")
-            if sid in self.sessions and tab_id in self.sessions[sid]:
-                session = self.sessions[sid][tab_id]
-                if session.is_connected:
-                    input_data = data.get("data", "")
-                    await session.send_input(input_data)
+            started = time.perf_counter()
+            entry = self._get_attached(sid, data.get("tab_id", "default"))
+            if entry and entry.session.is_connected:
+                input_data = data.get("data", "")
+                probe = data.get("probe")
+                if probe is not None:
+                    entry.probe = (probe, started)
+                await entry.session.send_input(input_data)
+                if entry.recording:
+                    entry.recording.input(input_data)
+                entry.bytes_in += len(input_data)
+                self.metrics.bytes_in += len(input_data)
+                self.metrics.input_seconds.observe(time.perf_counter() - started)
+
+        @self.sio.event
+        async def latency_ping(sid, data=None):
+            """Answer a client RTT ping (via the Socket.IO ack).
+
+            Args:
+                sid: Client session ID
+                data: Dict with the client's previous RTT in ms, if any
+            """
+            rtt = _milliseconds(data, "rtt_ms")
+            if rtt is not None:
+                self.metrics.latency_rtt_seconds.observe(rtt)
+            return True
+
+        @self.sio.event
+        async def latency_report(sid, data):
+            """Record the network share of a completed latency probe.
+
+            Args:
+                sid: Client session ID
+                data: Dict with network_ms (client round trip minus the
+                    server and PTY times sent with the output frame)
+            """
+            network = _milliseconds(data, "network_ms")
+            if network is not None:
+                self.metrics.latency_network_seconds.observe(network)
+
+        @self.sio.event
+        async def terminal_ack(sid, data):
+            """Handle acknowledgement of output processed by the client.
+
+            Args:
+                sid: Client session ID
+                data: Dict with tab_id and bytes processed
+            """
+            entry = self._get_attached(sid, data.get("tab_id", "default"))
+            if entry:
+                entry.pipeline.ack(int(data.get("bytes", 0)))
 
         @self.sio.event
         async def terminal_resize(sid, data):
@@ -120,13 +372,15 @@ class TerminalHandler:
                 sid: Client session ID
                 data: Dict with tab_id, cols and rows
             """
-            tab_id = data.get("tab_id", "default")
-            if sid in self.sessions and tab_id in self.sessions[sid]:
-                session = self.sessions[sid][tab_id]
-                if session.is_connected:
-                    cols = data.get("cols", 120)
-                    rows = data.get("rows", 40)
-                    await session.resize(cols, rows)
+            entry = self._get_attached(sid, data.get("tab_id", "default"))
+            if entry and entry.session.is_connected:
+                cols = data.get("cols", 120)
+                rows = data.get("rows", 40)
+                await entry.session.resize(cols, rows)
+                if entry.screen:
+                    entry.screen.submit_resize(cols, rows)
+                if entry.recording:
+                    entry.recording.resize(cols, rows)
 
         @self.sio.event
         async def stop_session(sid, data=None):
@@ -137,29 +391,170 @@ class TerminalHandler:
                 data: Dict with tab_id
             """
             tab_id = data.get("tab_id", "default") if data else "default"
-            await self._cleanup_session(sid, tab_id)
+            entry = self.registry.get(self.clients.get(sid, sid), tab_id)
+            if entry:
+                await self._stop_session(entry)
             await self.sio.emit("session_stopped", {"tab_id": tab_id}, to=sid)
 
-    async def _cleanup_session(self, sid: str, tab_id: str):
-        """Clean up SSH session for client.
+    async def shutdown(self):
+        """Stop warm sessions when the server shuts down.
+
+        Warm sessions belong to no client, so nothing else would close
+        their SSH channels or PTYs.
+        """
+        await self.warm_pool.close()
+
+    def _create_session(self, on_output, on_close, binary: bool) -> SessionBackend:
+        """Create a session with the configured backend.
+
+        Args:
+            on_output: Output callback
+            on_close: Close callback
+            binary: Pass raw PTY bytes to on_output
+        """
+        if self.workers:
+            return self.workers.create_session(on_output, on_close, binary)
+        if self.backend == "ssh":
+            return self.session_class(on_output=on_output, on_close=on_close, pool=self.pool, binary=binary)
+        return self.session_class(on_output=on_output, on_close=on_close, binary=binary)
+
+    def _high_watermark(self, flow_control: bool) -> Optional[int]:
+        """Return the high watermark for a client.
+
+        Args:
+            flow_control: Whether the client acknowledges output
+
+        Returns:
+            High watermark, or None so clients that never acknowledge
+            are not paused
+        """
+        if not flow_control:
+            return None
+        return self.output_options.get("high_watermark", DEFAULT_HIGH_WATERMARK)
+
+    def _get_attached(self, sid: str, tab_id: str) -> Optional[TerminalSession]:
+        """Look up a session attached to the given connection.
 
         Args:
             sid: Client session ID
             tab_id: Tab identifier
         """
-        if sid in self.sessions and tab_id in self.sessions[sid]:
-            session = self.sessions[sid].pop(tab_id)
+        entry = self.registry.get(self.clients.get(sid, sid), tab_id)
+        if entry and entry.sid == sid and entry.session:
+            return entry
+        return None
+
+    async def _send_output(self, entry: TerminalSession, output):
+        """Record a frame in scrollback and send it to the attached client.
+
+        Args:
+            entry: Session that produced the output
+            output: Merged output frame
+        """
+        if entry.record_frame():
+            self.metrics.first_frame_seconds.observe(entry.startup_time)
+            print(f"[Session] {entry.tab_id} first frame after {entry.startup_time * 1000:.0f} ms")
+        async with entry.lock:
+            entry.scrollback.append(output)
+            if entry.screen:
+                entry.screen.submit(output)
+            if entry.recording:
+                entry.recording.output(output)
+            if entry.sid:
+                message = {"tab_id": entry.tab_id, "data": output}
+                if entry.probe is not None:
+                    message["probe"] = self._close_probe(entry)
+                # Bytes are sent as Socket.IO binary attachments, not JSON strings
+                await self.sio.emit("terminal_output", message, to=entry.sid)
+                entry.bytes_out += len(output)
+                entry.frames_out += 1
+                self.metrics.bytes_out += len(output)
+                self.metrics.frames_out += 1
+
+    def _close_probe(self, entry: TerminalSession) -> dict:
+        """Time the server segments of a latency probe answered by this frame.
+
+        Args:
+            entry: Session with a pending probe
+
+        Returns:
+            Probe sequence number with server and PTY times in ms
+        """
+        seq, received = entry.probe
+        entry.probe = None
+        now = time.perf_counter()
+        written = entry.session.input_written_at if entry.session else now
+        # Input that never reached the session counts as server time
+        if written < received:
+            written = now
+        server, pty = written - received, now - written
+        self.metrics.latency_server_seconds.observe(server)
+        self.metrics.latency_pty_seconds.observe(pty)
+        return {"seq": seq, "server_ms": round(server * 1000, 3), "pty_ms": round(pty * 1000, 3)}
+
+    async def _stop_session(self, entry: TerminalSession):
+        """Stop a session and drop it from the registry.
+
+        Args:
+            entry: Session to stop
+        """
+        self.registry.remove(entry)
+        if entry.session:
             # Clear on_close to prevent duplicate session_closed event
-            session.on_close = None
-            await session.disconnect()
+            entry.session.on_close = None
+            await entry.session.disconnect()
+        if entry.pipeline:
+            await entry.pipeline.close(flush=False)
+        self._close_recording(entry)
+        entry.scrollback.clear()
+        self._forget_client(entry.client_id)
+
+    def _close_recording(self, entry: TerminalSession):
+        """Finish a session's recording, if any.
+
+        Args:
+            entry: Session whose recording ends
+        """
+        if entry.recording:
+            entry.recording.close()
+            entry.recording = None
 
-    async def _cleanup_all_sessions(self, sid: str):
-        """Clean up all SSH sessions for client.
+    def _forget_client(self, client_id: str):
+        """Revoke an issued client id once no connection or session uses it.
+
+        Args:
+            client_id: Issued client id
+        """
+        if client_id in self.clients.values() or self.registry.for_client(client_id):
+            return
+        self.client_ids.discard(client_id)
+
+    def _detach_all_sessions(self, sid: str):
+        """Detach all sessions of a disconnected client.
 
         Args:
             sid: Client session ID
         """
-        if sid in self.sessions:
-            for tab_id, session in list(self.sessions[sid].items()):
-                await session.disconnect()
-            del self.sessions[sid]
+        for entry in self.registry.attached_to(sid):
+            # Nobody acknowledges output while detached; keep the process running
+            entry.pipeline.reset_flow(None)
+            self.registry.detach(entry, self._reap_session)
+
+    def _reap_session(self, entry: TerminalSession):
+        """Stop a session nobody reattached to within the grace period.
+
+        Args:
+            entry: Expired session
+        """
+        print(f"[SocketIO] Reaping detached session: {entry.tab_id}")
+        self._spawn(self._stop_session(entry))
+
+    def _spawn(self, coro: Coroutine):
+        """Run a coroutine in a task that is kept referenced until done.
+
+        Args:
+            coro: Coroutine to run
+        """
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,292 @@
+"""Pool of pre-started sessions handed to new tabs without a cold start."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Set
+
+from server.defaults import DEFAULT_WARM_MAX_BYTES, DEFAULT_WARM_PER_WORKSPACE, DEFAULT_WARM_TTL
+from ssh.backend import SessionBackend
+
+
+class WarmSession:
+    """Started session waiting to be claimed, buffering its output."""
+
+    def __init__(self, workspace: str, cols: int, rows: int):
+        """Initialize warm session.
+
+        Args:
+            workspace: Working directory the session was started in
+            cols: Terminal columns it was started with
+            rows: Terminal rows it was started with
+        """
+        self.workspace = workspace
+        self.cols = cols
+        self.rows = rows
+        self.session: Optional[SessionBackend] = None
+        self.output: List[bytes] = []
+        self.size = 0
+        self.created_at = time.monotonic()
+        self._expire_handle: Optional[asyncio.TimerHandle] = None
+
+    def buffer(self, data: bytes):
+        """Keep output produced before the session is claimed."""
+        self.output.append(data)
+        self.size += len(data)
+
+
+class WarmSessionPool:
+    """Keeps started, idle sessions for recently used workspaces.
+
+    Up to per_workspace sessions are kept for each of the most recently used
+    (or hinted) workspaces, size in total. A tab that finds one takes it and
+    the workspace is refilled in the background; a miss starts a session as
+    usual and warms the workspace for next time. Unclaimed sessions are
+    stopped after ttl seconds, and the oldest are evicted while their
+    buffered output exceeds max_bytes.
+
+    Sessions are started in binary mode with key authentication only.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[..., SessionBackend],
+        size: int,
+        ttl: float = DEFAULT_WARM_TTL,
+        max_bytes: int = DEFAULT_WARM_MAX_BYTES,
+        per_workspace: int = DEFAULT_WARM_PER_WORKSPACE,
+    ):
+        """Initialize warm session pool.
+
+        Args:
+            factory: Creates a session, called as factory(on_output, on_close)
+            size: Maximum warm sessions in total (0 disables the pool)
+            ttl: Seconds an unclaimed session is kept
+            max_bytes: Output buffered across all warm sessions
+            per_workspace: Maximum warm sessions per workspace
+        """
+        self.factory = factory
+        self.size = size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.per_workspace = per_workspace
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        # Terminal size of the latest tab, used for new warm sessions
+        self.cols = 120
+        self.rows = 40
+        # Workspaces by recency of use, most recent last
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._ready: Dict[str, List[WarmSession]] = {}
+        self._starting: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._closed = False
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the pool keeps any sessions."""
+        return self.size > 0
+
+    def take(self, workspace: str, cols: int, rows: int) -> Optional[WarmSession]:
+        """Claim a warm session for a new tab and refill in the background.
+
+        The caller must redirect session.on_output and session.on_close
+        before awaiting anything, then deliver the buffered output.
+
+        Args:
+            workspace: Workspace of the new tab
+            cols: Terminal columns of the new tab
+            rows: Terminal rows of the new tab
+
+        Returns:
+            Warm session, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        self.cols, self.rows = cols, rows
+        self._touch(workspace)
+        warm = None
+        while self._ready.get(workspace):
+            candidate = self._ready[workspace].pop(0)
+            if candidate.session and candidate.session.is_connected:
+                warm = candidate
+                break
+            self._discard(candidate)
+        if not self._ready.get(workspace):
+            self._ready.pop(workspace, None)
+
+        if warm is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            if warm._expire_handle:
+                warm._expire_handle.cancel()
+        self._refill()
+        return warm
+
+    def hint(self, workspace: str):
+        """Start warming a workspace the user is likely to open.
+
+        Args:
+            workspace: Workspace highlighted in the client
+        """
+        if not self.enabled or not workspace or self._closed:
+            return
+        self._touch(workspace)
+        self._refill()
+
+    def stats(self) -> dict:
+        """Return pool counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "size": self.size,
+            "ready": sum(len(sessions) for sessions in self._ready.values()),
+            "starting": sum(self._starting.values()),
+            "buffered_bytes": self._buffered_bytes(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    async def close(self):
+        """Stop all warm sessions and pending warm-ups."""
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for sessions in list(self._ready.values()):
+            for warm in sessions:
+                await self._stop(warm)
+        self._ready.clear()
+
+    def _touch(self, workspace: str):
+        """Mark a workspace as most recently used."""
+        self._recent[workspace] = None
+        self._recent.move_to_end(workspace)
+        # Only the newest size workspaces can ever be warmed
+        while len(self._recent) > max(self.size, 1):
+            stale, _ = self._recent.popitem(last=False)
+            for warm in self._ready.pop(stale, ()):
+                self.evictions += 1
+                self._discard(warm)
+
+    def _refill(self):
+        """Start sessions so the most recent workspaces are warm."""
+        if self._closed:
+            return
+        total = sum(len(sessions) for sessions in self._ready.values()) + sum(self._starting.values())
+        for workspace in reversed(self._recent):
+            have = len(self._ready.get(workspace, ())) + self._starting.get(workspace, 0)
+            while have < self.per_workspace:
+                if total >= self.size and not self._evict_for(workspace):
+                    return
+                self._starting[workspace] = self._starting.get(workspace, 0) + 1
+                task = asyncio.create_task(self._start(workspace))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                have += 1
+                total += 1
+
+    def _evict_for(self, workspace: str) -> bool:
+        """Stop a warm session of a less recently used workspace.
+
+        Returns:
+            True if a session was evicted to make room
+        """
+        for other in self._recent:
+            if other == workspace:
+                return False
+            if self._ready.get(other):
+                warm = self._ready[other][0]
+                self._remove(warm)
+                self.evictions += 1
+                self._discard(warm)
+                return True
+        return False
+
+    async def _start(self, workspace: str):
+        """Start one warm session and add it to the pool."""
+        warm = WarmSession(workspace, self.cols, self.rows)
+        try:
+            warm.session = self.factory(lambda data: self._on_output(warm, data), lambda: self._on_close(warm))
+            ok = await warm.session.connect(workspace=workspace, cols=warm.cols, rows=warm.rows)
+        except asyncio.CancelledError:
+            if warm.session:
+                await warm.session.disconnect()
+            raise
+        finally:
+            self._starting[workspace] -= 1
+            if not self._starting[workspace]:
+                del self._starting[workspace]
+
+        if not ok or self._closed or workspace not in self._recent:
+            await self._stop(warm)
+            return
+        loop = asyncio.get_running_loop()
+        warm._expire_handle = loop.call_later(self.ttl, self._expire, warm)
+        self._ready.setdefault(workspace, []).append(warm)
+        self._enforce_memory()
+
+    def _on_output(self, warm: WarmSession, data: bytes):
+        """Buffer output of an unclaimed session within the memory cap."""
+        warm.buffer(data)
+        if warm.workspace in self._ready and self._buffered_bytes() > self.max_bytes:
+            self._enforce_memory()
+
+    def _on_close(self, warm: WarmSession):
+        """Drop a warm session whose process exited before it was claimed."""
+        if self._remove(warm) and warm._expire_handle:
+            warm._expire_handle.cancel()
+
+    def _expire(self, warm: WarmSession):
+        """Stop a session nobody claimed within the TTL."""
+        if self._remove(warm):
+            self.expirations += 1
+            self._discard(warm)
+
+    def _enforce_memory(self):
+        """Evict the oldest warm sessions while buffered output is over the cap."""
+        while self._buffered_bytes() > self.max_bytes:
+            oldest = min(
+                (warm for sessions in self._ready.values() for warm in sessions),
+                key=lambda warm: warm.created_at,
+            )
+            self._remove(oldest)
+            self.evictions += 1
+            self._discard(oldest)
+
+    def _remove(self, warm: WarmSession) -> bool:
+        """Take a session out of the ready lists.
+
+        Returns:
+            True if it was ready
+        """
+        sessions = self._ready.get(warm.workspace)
+        if not sessions or warm not in sessions:
+            return False
+        sessions.remove(warm)
+        if not sessions:
+            del self._ready[warm.workspace]
+        return True
+
+    def _buffered_bytes(self) -> int:
+        """Output bytes buffered by ready sessions."""
+        return sum(warm.size for sessions in self._ready.values() for warm in sessions)
+
+    def _discard(self, warm: WarmSession):
+        """Stop a session in the background."""
+        task = asyncio.create_task(self._stop(warm))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _stop(self, warm: WarmSession):
+        """Stop a warm session."""
+        if warm._expire_handle:
+            warm._expire_handle.cancel()
+        if warm.session:
+            warm.session.on_close = None
+            await warm.session.disconnect()
@@ -10,8 +10,34 @@ from pathlib import Path
 # Add current directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
+# Defaults only; heavy modules are imported in start_server
+from server.defaults import (
+    BACKENDS,
+    COMMON_DIRS,
+    COMPRESSIONS,
+    DEFAULT_FLUSH_INTERVAL,
+    DEFAULT_GRACE_PERIOD,
+    DEFAULT_HIGH_WATERMARK,
+    DEFAULT_IGNORE,
+    DEFAULT_LOW_WATERMARK,
+    DEFAULT_MAX_DEPTH,
+    DEFAULT_MAX_FILE_BYTES,
+    DEFAULT_MAX_FRAME_SIZE,
+    DEFAULT_MAX_TOTAL_BYTES,
+    DEFAULT_RETENTION_DAYS,
+    DEFAULT_SCROLLBACK_BYTES,
+    DEFAULT_SLOW_CALLBACK_MS,
+    DEFAULT_SNAPSHOT_LINES,
+    DEFAULT_WARM_MAX_BYTES,
+    DEFAULT_WARM_PER_WORKSPACE,
+    DEFAULT_WARM_TTL,
+    LOOPS,
+    PAGES,
+)
+
 DEFAULT_PORT = 6388
 PID_FILE = Path.home() / ".claude-web.pid"
+WORKSPACE_INDEX_FILE = Path.home() / ".claude-web-workspaces.json"
 
 
 def get_pid() -> int | None:
@@ -41,11 +67,48 @@ def remove_pid():
     PID_FILE.unlink(missing_ok=True)
 
 
-def start_server(port: int):
+def start_server(
+    port: int,
+    output_options: dict | None = None,
+    session_grace: float = DEFAULT_GRACE_PERIOD,
+    scrollback_bytes: int = DEFAULT_SCROLLBACK_BYTES,
+    screen_model: bool = False,
+    snapshot_lines: int = DEFAULT_SNAPSHOT_LINES,
+    backend: str = "ssh",
+    warm_sessions: int = 0,
+    warm_options: dict | None = None,
+    workspace_options: dict | None = None,
+    record_options: dict | None = None,
+    workers: int = 0,
+    loop: str = "auto",
+    loop_options: dict | None = None,
+    page: str = "nicegui",
+    headless: bool = False,
+):
     """Start the web server.
 
     Args:
         port: Port number to listen on
+        output_options: Keyword arguments for each tab's OutputPipeline
+        session_grace: Seconds a detached session is kept for reattach
+        scrollback_bytes: Output kept per session for reattach replay
+        screen_model: Send screen snapshots instead of raw scrollback on reattach
+        snapshot_lines: Scrollback lines included in a snapshot
+        backend: Session backend, "ssh" (localhost) or "local" (PTY)
+        warm_sessions: Pre-started sessions kept for new tabs (0 disables)
+        warm_options: Keyword arguments for the warm session pool
+        workspace_options: Keyword arguments for the workspace index
+        record_options: Keyword arguments for the session recorder
+            (None disables recording)
+        workers: Worker processes hosting sessions (0 runs them in the
+            server process)
+        loop: Event loop implementation, "auto", "asyncio" or "uvloop"
+        loop_options: Keyword arguments for configure_loop (executor size,
+            debug mode, slow-callback threshold)
+        page: "nicegui" for a NiceGUI page, or "static" for a plain HTML
+            document without per-tab NiceGUI clients
+        headless: Serve only Socket.IO and the JSON APIs (server/app.py)
+            under uvicorn, without NiceGUI or a page
     """
     # Check if already running
     existing_pid = get_pid()
@@ -55,12 +118,23 @@ def start_server(port: int):
         sys.exit(1)
 
     # Import here to avoid loading heavy modules for stop command
+    import asyncio
+
     import socketio
     import uvicorn
-    from nicegui import app, ui
 
+    from events.recorder import Recorder
+    from events.screen import ScreenModel
+    from events.session_registry import SessionRegistry
     from events.socketio_handlers import TerminalHandler
-    from ui.components.terminal import Terminal
+    from server.app import add_api_routes, create_app
+    from server.event_loop import configure_loop, resolve_loop
+    from server.workspace_index import WorkspaceIndex
+    from server.workspace_search import WorkspaceSearch
+    from ssh.worker import WorkerPool
+
+    if screen_model and not ScreenModel.available:
+        print("Screen model requires pyte (pip install pyte); replaying raw scrollback")
 
     # Create Socket.IO server
     sio = socketio.AsyncServer(
@@ -68,45 +142,102 @@ def start_server(port: int):
         cors_allowed_origins="*",
     )
 
-    # Initialize terminal handler
-    terminal_handler = TerminalHandler(sio)
-
-    # Mount Socket.IO to Nicegui's FastAPI app
-    sio_asgi = socketio.ASGIApp(sio)
-    app.mount("/socket.io", sio_asgi)
-
-    # API endpoint for workspaces
-    from fastapi import Response
-    import json
-
-    @app.get("/api/workspaces")
-    def get_workspaces_api():
-        """Return list of workspaces as JSON."""
-        from ui.components.workspace_selector import get_workspaces
-        workspaces = get_workspaces()
-        return Response(
-            content=json.dumps(workspaces),
-            media_type="application/json"
-        )
+    workspace_index = WorkspaceIndex(**(workspace_options or {}))
+    workspace_search = WorkspaceSearch(workspace_index)
+    recorder = Recorder(**record_options) if record_options else None
+    loop = resolve_loop(loop)
+    worker_pool = WorkerPool(workers, backend, loop=loop) if workers > 0 else None
 
-    # Main page
-    @ui.page("/")
-    def index():
-        """Main page with terminal."""
-        ui.dark_mode().enable()
+    # Initialize terminal handler
+    terminal_handler = TerminalHandler(
+        sio,
+        output_options=output_options,
+        registry=SessionRegistry(grace_period=session_grace),
+        scrollback_bytes=scrollback_bytes,
+        screen_model=screen_model,
+        snapshot_lines=snapshot_lines,
+        backend=backend,
+        warm_sessions=warm_sessions,
+        warm_options=warm_options,
+        on_workspace_start=workspace_search.record_use,
+        recorder=recorder,
+        workers=worker_pool,
+    )
 
-        # Remove default padding and ensure full height
-        ui.query('body').classes('p-0 m-0').style('overflow: hidden')
-        ui.query('.nicegui-content').classes('p-0').style('height: 100vh; overflow: hidden')
+    def on_startup():
+        # Executor size and debug settings need the running loop
+        configure_loop(asyncio.get_running_loop(), **(loop_options or {}))
 
-        # Terminal takes full screen
-        terminal = Terminal()
-        terminal.render()
+    if headless:
+        asgi_app = create_app(
+            sio, terminal_handler, workspace_index, workspace_search,
+            on_startup=on_startup, on_shutdown=terminal_handler.shutdown,
+        )
+    else:
+        # NiceGUI is most of the startup time and memory, so headless mode never imports it
+        from fastapi import Request
+        from nicegui import app, ui
+
+        from server.assets import default_assets
+        from server.page import StaticPage
+        from ui.components.terminal import Terminal
+
+        # Mount Socket.IO to Nicegui's FastAPI app
+        sio_asgi = socketio.ASGIApp(sio)
+        app.mount("/socket.io", sio_asgi)
+
+        add_api_routes(app, terminal_handler, workspace_index, workspace_search)
+
+        # Vendor assets, hashed and precompressed by 'main.py assets'
+        assets = default_assets()
+        if not assets.built:
+            print("[Assets] Not built; loading xterm and socket.io from CDNs (build with: python main.py assets)")
+
+        @app.get("/assets/{name}")
+        async def asset(request: Request, name: str):
+            """Serve a content-hashed asset with immutable caching."""
+            return assets.response(request, name)
+
+        @app.get("/sw.js")
+        async def service_worker():
+            """Serve the service worker that caches the hashed assets."""
+            return assets.service_worker_response()
+
+        app.on_startup(on_startup)
+        app.on_shutdown(terminal_handler.shutdown)
+
+        # Main page
+        if page == "static":
+            static_page = StaticPage(assets)
+            # Replace NiceGUI's own index route
+            app.router.routes[:] = [r for r in app.router.routes if getattr(r, "path", None) != "/"]
+
+            @app.get("/")
+            async def index(request: Request):
+                """Main page with terminal, without a NiceGUI client."""
+                return static_page.response(request)
+        else:
+            @ui.page("/")
+            def index():
+                """Main page with terminal."""
+                ui.dark_mode().enable()
+
+                # Remove default padding and ensure full height
+                ui.query('body').classes('p-0 m-0').style('overflow: hidden')
+                ui.query('.nicegui-content').classes('p-0').style('height: 100vh; overflow: hidden')
+
+                # Terminal takes full screen
+                terminal = Terminal(assets=assets)
+                terminal.render()
 
     # Save PID and setup cleanup
     save_pid()
 
     def cleanup(signum=None, frame=None):
+        if recorder:
+            recorder.close()
+        if worker_pool:
+            worker_pool.terminate()
         remove_pid()
         sys.exit(0)
 
@@ -115,17 +246,27 @@ def start_server(port: int):
 
     print(f"Starting Claude Web Terminal on http://localhost:{port}")
     print(f"PID: {os.getpid()}")
+    print("Headless: Socket.IO relay and /api only" if headless else f"Page: {page}")
+    print(f"Session backend: {backend}" + (f" in {workers} worker processes" if workers > 0 else ""))
+    if warm_sessions:
+        print(f"Warm session pool: {warm_sessions}")
+    if recorder:
+        print(f"Recording sessions to {recorder.directory} ({recorder.compression})")
     print("Press Ctrl+C to stop")
 
     try:
-        ui.run(
-            host="0.0.0.0",
-            port=port,
-            title="Claude Web Terminal",
-            favicon="🤖",
-            show=False,
-            reload=False,
-        )
+        if headless:
+            uvicorn.run(asgi_app, host="0.0.0.0", port=port, loop=loop, log_level="warning")
+        else:
+            ui.run(
+                host="0.0.0.0",
+                port=port,
+                title="Claude Web Terminal",
+                favicon="🤖",
+                show=False,
+                reload=False,
+                loop=loop,
+            )
     finally:
         remove_pid()
 
@@ -171,6 +312,200 @@ def main():
         default=DEFAULT_PORT,
         help=f"Port number (default: {DEFAULT_PORT})",
     )
+    start_parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="ssh",
+        help="Session backend: ssh to localhost or a local PTY (default: ssh)",
+    )
+    start_parser.add_argument(
+        "--page",
+        choices=PAGES,
+        default="nicegui",
+        help="Serve the terminal as a NiceGUI page, or as a static HTML document without "
+             "per-tab NiceGUI clients (default: nicegui)",
+    )
+    start_parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Serve only the Socket.IO relay and /api, without NiceGUI or a page",
+    )
+    start_parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Host sessions in this many worker processes, restarted if they crash "
+             "(default: 0, sessions run in the server process)",
+    )
+    start_parser.add_argument(
+        "--loop",
+        choices=LOOPS,
+        default="auto",
+        help="Event loop: uvloop if installed (auto), asyncio, or uvloop with fallback (default: auto)",
+    )
+    start_parser.add_argument(
+        "--executor-workers",
+        type=int,
+        help="Threads in the default executor for blocking filesystem work (default: Python's)",
+    )
+    start_parser.add_argument(
+        "--loop-debug",
+        action="store_true",
+        help="Enable asyncio debug mode and log callbacks that block the loop",
+    )
+    start_parser.add_argument(
+        "--slow-callback-ms",
+        type=float,
+        default=DEFAULT_SLOW_CALLBACK_MS,
+        help=f"Blocking time logged as a slow callback with --loop-debug (default: {DEFAULT_SLOW_CALLBACK_MS:g})",
+    )
+    start_parser.add_argument(
+        "--output-flush-ms",
+        type=float,
+        default=DEFAULT_FLUSH_INTERVAL * 1000,
+        help=f"Output coalescing window in ms (default: {DEFAULT_FLUSH_INTERVAL * 1000:g})",
+    )
+    start_parser.add_argument(
+        "--output-max-frame",
+        type=int,
+        default=DEFAULT_MAX_FRAME_SIZE,
+        help=f"Maximum output frame size (default: {DEFAULT_MAX_FRAME_SIZE})",
+    )
+    start_parser.add_argument(
+        "--flow-high-watermark",
+        type=int,
+        default=DEFAULT_HIGH_WATERMARK,
+        help=f"Unacknowledged output bytes that pause reading (default: {DEFAULT_HIGH_WATERMARK})",
+    )
+    start_parser.add_argument(
+        "--flow-low-watermark",
+        type=int,
+        default=DEFAULT_LOW_WATERMARK,
+        help=f"Unacknowledged output bytes that resume reading (default: {DEFAULT_LOW_WATERMARK})",
+    )
+    start_parser.add_argument(
+        "--session-grace",
+        type=float,
+        default=DEFAULT_GRACE_PERIOD,
+        help=f"Seconds a detached session is kept for reattach (default: {DEFAULT_GRACE_PERIOD:g})",
+    )
+    start_parser.add_argument(
+        "--scrollback-bytes",
+        type=int,
+        default=DEFAULT_SCROLLBACK_BYTES,
+        help=f"Output kept per session for reattach (default: {DEFAULT_SCROLLBACK_BYTES})",
+    )
+    start_parser.add_argument(
+        "--screen-model",
+        action="store_true",
+        help="Keep a headless screen per session and send snapshots on reattach (requires pyte)",
+    )
+    start_parser.add_argument(
+        "--snapshot-lines",
+        type=int,
+        default=DEFAULT_SNAPSHOT_LINES,
+        help=f"Scrollback lines included in a snapshot (default: {DEFAULT_SNAPSHOT_LINES})",
+    )
+
+    start_parser.add_argument(
+        "--warm-sessions",
+        type=int,
+        default=0,
+        help="Pre-started sessions kept for recently used workspaces (default: 0, disabled)",
+    )
+    start_parser.add_argument(
+        "--warm-per-workspace",
+        type=int,
+        default=DEFAULT_WARM_PER_WORKSPACE,
+        help=f"Maximum warm sessions per workspace (default: {DEFAULT_WARM_PER_WORKSPACE})",
+    )
+    start_parser.add_argument(
+        "--warm-ttl",
+        type=float,
+        default=DEFAULT_WARM_TTL,
+        help=f"Seconds an unclaimed warm session is kept (default: {DEFAULT_WARM_TTL:g})",
+    )
+    start_parser.add_argument(
+        "--warm-max-bytes",
+        type=int,
+        default=DEFAULT_WARM_MAX_BYTES,
+        help=f"Output buffered across unclaimed warm sessions (default: {DEFAULT_WARM_MAX_BYTES})",
+    )
+
+    start_parser.add_argument(
+        "--workspace-root",
+        action="append",
+        metavar="DIR",
+        help=f"Workspace root, absolute or relative to $HOME; repeatable (default: {' '.join(COMMON_DIRS)})",
+    )
+    start_parser.add_argument(
+        "--workspace-depth",
+        type=int,
+        default=DEFAULT_MAX_DEPTH,
+        help=f"Directory levels below a root listed as workspaces (default: {DEFAULT_MAX_DEPTH})",
+    )
+    start_parser.add_argument(
+        "--workspace-ignore",
+        action="append",
+        metavar="GLOB",
+        help=f"Directory name or root-relative path glob to skip; repeatable (default: {' '.join(DEFAULT_IGNORE)})",
+    )
+    start_parser.add_argument(
+        "--workspace-index",
+        type=Path,
+        default=WORKSPACE_INDEX_FILE,
+        help=f"File persisting the workspace index between restarts (default: {WORKSPACE_INDEX_FILE})",
+    )
+
+    start_parser.add_argument(
+        "--record-dir",
+        type=Path,
+        help="Record every session as an asciicast v2 file in this directory (default: off)",
+    )
+    start_parser.add_argument(
+        "--record-input",
+        action="store_true",
+        help="Include terminal input in recordings",
+    )
+    start_parser.add_argument(
+        "--record-compression",
+        choices=COMPRESSIONS,
+        default="none",
+        help="Compress recordings while writing; zstd requires zstandard (default: none)",
+    )
+    start_parser.add_argument(
+        "--record-max-file-bytes",
+        type=int,
+        default=DEFAULT_MAX_FILE_BYTES,
+        help=f"Uncompressed bytes per recording file before rotating (default: {DEFAULT_MAX_FILE_BYTES})",
+    )
+    start_parser.add_argument(
+        "--record-max-total-bytes",
+        type=int,
+        default=DEFAULT_MAX_TOTAL_BYTES,
+        help=f"Recordings kept on disk before the oldest are deleted (default: {DEFAULT_MAX_TOTAL_BYTES})",
+    )
+    start_parser.add_argument(
+        "--record-retention-days",
+        type=float,
+        default=DEFAULT_RETENTION_DAYS,
+        help=f"Days recordings are kept (default: {DEFAULT_RETENTION_DAYS:g})",
+    )
+
+    # Assets command
+    assets_parser = subparsers.add_parser(
+        "assets", help="Fetch xterm and socket.io and build hashed, precompressed copies"
+    )
+    assets_parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Build from files already in static/vendor without downloading",
+    )
+    assets_parser.add_argument(
+        "--refetch",
+        action="store_true",
+        help="Download vendor files again even if present",
+    )
 
     # Stop command
     subparsers.add_parser("stop", help="Stop the server")
@@ -180,8 +515,61 @@ def main():
 
     args = parser.parse_args()
 
+    if args.command == "start" and not 0 <= args.flow_low_watermark < args.flow_high_watermark:
+        start_parser.error(
+            f"--flow-low-watermark ({args.flow_low_watermark}) must be at least 0 and below "
+            f"--flow-high-watermark ({args.flow_high_watermark})"
+        )
+
     if args.command == "start":
-        start_server(args.port)
+        start_server(
+            args.port,
+            output_options={
+                "flush_interval": args.output_flush_ms / 1000,
+                "max_frame_size": args.output_max_frame,
+                "high_watermark": args.flow_high_watermark,
+                "low_watermark": args.flow_low_watermark,
+            },
+            session_grace=args.session_grace,
+            scrollback_bytes=args.scrollback_bytes,
+            screen_model=args.screen_model,
+            snapshot_lines=args.snapshot_lines,
+            backend=args.backend,
+            warm_sessions=args.warm_sessions,
+            warm_options={
+                "ttl": args.warm_ttl,
+                "max_bytes": args.warm_max_bytes,
+                "per_workspace": args.warm_per_workspace,
+            },
+            workspace_options={
+                "dirs": args.workspace_root or COMMON_DIRS,
+                "max_depth": args.workspace_depth,
+                "ignore": args.workspace_ignore or DEFAULT_IGNORE,
+                "index_file": args.workspace_index,
+            },
+            record_options={
+                "directory": args.record_dir,
+                "include_input": args.record_input,
+                "compression": args.record_compression,
+                "max_file_bytes": args.record_max_file_bytes,
+                "max_total_bytes": args.record_max_total_bytes,
+                "retention_days": args.record_retention_days,
+            } if args.record_dir else None,
+            workers=args.workers,
+            loop=args.loop,
+            loop_options={
+                "executor_workers": args.executor_workers,
+                "debug": args.loop_debug,
+                "slow_callback_ms": args.slow_callback_ms,
+            },
+            page=args.page,
+            headless=args.headless,
+        )
+    elif args.command == "assets":
+        from server.assets import build_command
+
+        if build_command(fetch=not args.offline, force=args.refetch) is None:
+            sys.exit(1)
     elif args.command == "stop":
         stop_server()
     elif args.command == "status":
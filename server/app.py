@@ -1,85 +1,121 @@
-"""FastAPI server with Socket.IO and Nicegui integration."""
+"""FastAPI server with Socket.IO, without NiceGUI.
 
-import os
-from pathlib import Path
-from typing import List
+'main.py start --headless' serves this app under uvicorn: the Socket.IO
+terminal relay and the JSON APIs, for custom frontends and sidecar
+deployments. add_api_routes() also adds the same APIs to NiceGUI's app in
+the full UI.
+"""
+
+from typing import Callable, Optional
 
 import socketio
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse
 
+from events.recorder import recording_response, recordings_response
 from events.socketio_handlers import TerminalHandler
+from server.workspace_index import WorkspaceIndex, workspace_response
+from server.workspace_search import WorkspaceSearch, search_response
+
+
+def add_api_routes(
+    app: FastAPI,
+    terminal_handler: TerminalHandler,
+    workspace_index: WorkspaceIndex,
+    workspace_search: WorkspaceSearch,
+):
+    """Add the JSON API routes to an app.
+
+    Args:
+        app: FastAPI app, or NiceGUI's app
+        terminal_handler: Handler whose metrics and recordings are served
+        workspace_index: Workspace index to serve
+        workspace_search: Search over the index
+    """
 
-# Create FastAPI app
-app = FastAPI(title="Claude Web Terminal")
-
-# Create Socket.IO server
-sio = socketio.AsyncServer(
-    async_mode="asgi",
-    cors_allowed_origins="*",
-)
-
-# Create Socket.IO ASGI app
-sio_app = socketio.ASGIApp(sio, other_asgi_app=app)
-
-# Initialize terminal handler
-terminal_handler = TerminalHandler(sio)
-
+    @app.get("/api/health")
+    async def health_check():
+        """Health check endpoint."""
+        return JSONResponse({"status": "ok"})
+
+    @app.get("/api/workspaces")
+    async def list_workspaces(request: Request) -> Response:
+        """List available workspaces from the cached index.
+
+        Scanning runs in worker threads, so it never blocks terminal I/O.
+
+        Returns:
+            JSON response, 304 if the client's copy is current
+        """
+        return await workspace_response(request, workspace_index)
+
+    @app.get("/api/workspaces/search")
+    async def search_workspaces(request: Request) -> JSONResponse:
+        """Fuzzy-search workspaces, ranked by match quality and recent use.
+
+        Returns:
+            JSON with the query, total matches and the top ?limit= results
+        """
+        return await search_response(request, workspace_search)
+
+    @app.get("/api/metrics")
+    async def metrics() -> Response:
+        """Session and event-loop metrics in Prometheus text format."""
+        return terminal_handler.metrics.response(terminal_handler)
+
+    @app.get("/api/recordings")
+    async def list_recordings() -> JSONResponse:
+        """List session recordings (404 unless the handler records)."""
+        return await recordings_response(terminal_handler.recorder)
+
+    @app.get("/api/recordings/{name}")
+    async def get_recording(request: Request, name: str) -> Response:
+        """Stream one asciicast recording."""
+        return await recording_response(request, terminal_handler.recorder, name)
+
+
+def create_app(
+    sio: socketio.AsyncServer,
+    terminal_handler: TerminalHandler,
+    workspace_index: WorkspaceIndex,
+    workspace_search: WorkspaceSearch,
+    on_startup: Optional[Callable] = None,
+    on_shutdown: Optional[Callable] = None,
+) -> socketio.ASGIApp:
+    """Create the ASGI app serving Socket.IO and the JSON APIs.
+
+    Args:
+        sio: AsyncServer the terminal handler is registered on
+        terminal_handler: Terminal handler
+        workspace_index: Workspace index to serve
+        workspace_search: Search over the index
+        on_startup: Called when the server starts, on its event loop
+        on_shutdown: Called when the server stops
 
-@app.get("/api/health")
-async def health_check():
-    """Health check endpoint."""
-    return JSONResponse({"status": "ok"})
+    Returns:
+        Socket.IO ASGI app wrapping FastAPI
+    """
+    app = FastAPI(title="Claude Web Terminal")
+    add_api_routes(app, terminal_handler, workspace_index, workspace_search)
+    return socketio.ASGIApp(sio, other_asgi_app=app, on_startup=on_startup, on_shutdown=on_shutdown)
 
 
-@app.get("/api/workspaces")
-async def list_workspaces() -> List[dict]:
-    """List available workspaces (directories in $HOME).
+def get_asgi_app(workspace_options: Optional[dict] = None) -> socketio.ASGIApp:
+    """Get an ASGI application with default settings for uvicorn.
 
-    Returns:
-        List of workspace info dicts
-    """
-    home = Path.home()
-    workspaces = []
-
-    # Add home directory itself
-    workspaces.append({
-        "name": "~",
-        "path": str(home),
-        "is_git": (home / ".git").exists(),
-    })
-
-    # Common workspace directories
-    common_dirs = ["Workspace", "workspace", "Projects", "projects", "dev", "code"]
-
-    for dir_name in common_dirs:
-        dir_path = home / dir_name
-        if dir_path.is_dir():
-            # Add the directory itself
-            workspaces.append({
-                "name": f"~/{dir_name}",
-                "path": str(dir_path),
-                "is_git": (dir_path / ".git").exists(),
-            })
-            # Add subdirectories
-            try:
-                for sub in sorted(dir_path.iterdir()):
-                    if sub.is_dir() and not sub.name.startswith("."):
-                        workspaces.append({
-                            "name": f"~/{dir_name}/{sub.name}",
-                            "path": str(sub),
-                            "is_git": (sub / ".git").exists(),
-                        })
-            except PermissionError:
-                pass
-
-    return workspaces
-
-
-def get_asgi_app():
-    """Get the ASGI application for uvicorn.
+    Args:
+        workspace_options: Keyword arguments for the WorkspaceIndex, as
+            main.py builds them from the --workspace-* options (default:
+            the index defaults, COMMON_DIRS)
 
     Returns:
         Socket.IO ASGI app wrapping FastAPI
     """
-    return sio_app
+    sio = socketio.AsyncServer(
+        async_mode="asgi",
+        cors_allowed_origins="*",
+    )
+    workspace_index = WorkspaceIndex(**(workspace_options or {}))
+    workspace_search = WorkspaceSearch(workspace_index)
+    terminal_handler = TerminalHandler(sio, on_workspace_start=workspace_search.record_use)
+    return create_app(sio, terminal_handler, workspace_index, workspace_search)
@@ -0,0 +1,273 @@
+"""Self-hosted frontend assets with content-hashed URLs and precompressed variants."""
+
+import functools
+import gzip
+import hashlib
+import json
+import mimetypes
+import urllib.request
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, Response
+
+try:
+    import brotli
+except ImportError:  # Optional dependency: pip install brotli
+    brotli = None
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+APP_DIR = STATIC_DIR / "app"  # first-party client app, hashed in memory at startup
+VENDOR_DIR = STATIC_DIR / "vendor"  # unhashed sources, fetched or copied in
+BUILD_DIR = STATIC_DIR / "build"  # hashed files, .br/.gz variants and manifest.json
+URL_PREFIX = "/assets"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Logical name -> pinned upstream URL, also used when assets are not built
+VENDOR_ASSETS = {
+    "xterm.css": "https://cdn.jsdelivr.net/npm/xterm@5.3.0/css/xterm.css",
+    "xterm.js": "https://cdn.jsdelivr.net/npm/xterm@5.3.0/lib/xterm.min.js",
+    "xterm-addon-fit.js": "https://cdn.jsdelivr.net/npm/xterm-addon-fit@0.8.0/lib/xterm-addon-fit.min.js",
+    "socket.io.js": "https://cdn.socket.io/4.7.2/socket.io.min.js",
+    # Renderer addons, loaded by the client only when selected in settings
+    "xterm-addon-webgl.js": "https://cdn.jsdelivr.net/npm/xterm-addon-webgl@0.16.0/lib/xterm-addon-webgl.js",
+    "xterm-addon-canvas.js": "https://cdn.jsdelivr.net/npm/xterm-addon-canvas@0.5.0/lib/xterm-addon-canvas.js",
+}
+APP_ASSETS = ("terminal.css", "terminal.js")
+
+SERVICE_WORKER = """\
+const CACHE = 'ct-assets-%(version)s';
+const ASSETS = %(urls)s;
+
+self.addEventListener('install', (event) => {
+    event.waitUntil(caches.open(CACHE).then((cache) => cache.addAll(ASSETS)).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil(caches.keys().then((keys) => Promise.all(
+        keys.filter((key) => key.startsWith('ct-assets-') && key !== CACHE).map((key) => caches.delete(key))
+    )).then(() => self.clients.claim()));
+});
+
+// Hashed URLs never change, so a cached copy is always current
+self.addEventListener('fetch', (event) => {
+    const url = new URL(event.request.url);
+    if (event.request.method !== 'GET' || url.origin !== location.origin || !url.pathname.startsWith('%(prefix)s/')) return;
+    event.respondWith(caches.open(CACHE).then((cache) => cache.match(event.request).then((hit) => hit || fetch(event.request).then((response) => {
+        if (response.ok) cache.put(event.request, response.clone());
+        return response;
+    }))));
+});
+"""
+
+
+def fetch_assets(vendor_dir: Path = VENDOR_DIR, force: bool = False) -> Dict[str, Path]:
+    """Download the pinned vendor files that are not present yet.
+
+    Args:
+        vendor_dir: Directory receiving the unhashed files
+        force: Download files that already exist again
+
+    Returns:
+        Mapping of logical name to downloaded path
+    """
+    vendor_dir.mkdir(parents=True, exist_ok=True)
+    fetched = {}
+    for name, url in VENDOR_ASSETS.items():
+        path = vendor_dir / name
+        if path.exists() and not force:
+            continue
+        print(f"[Assets] Fetching {url}")
+        with urllib.request.urlopen(url, timeout=30) as response:
+            data = response.read()
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        fetched[name] = path
+    return fetched
+
+
+def build_assets(vendor_dir: Path = VENDOR_DIR, build_dir: Path = BUILD_DIR) -> Dict[str, str]:
+    """Write content-hashed copies with brotli and gzip variants.
+
+    Variants are only kept when smaller than the original. Files from a
+    previous build that are no longer referenced are removed.
+
+    Args:
+        vendor_dir: Directory holding the unhashed files
+        build_dir: Output directory
+
+    Returns:
+        Manifest mapping logical name to hashed file name
+
+    Raises:
+        FileNotFoundError: If a vendor file is missing
+    """
+    missing = [name for name in VENDOR_ASSETS if not (vendor_dir / name).exists()]
+    if missing:
+        raise FileNotFoundError(f"Missing in {vendor_dir}: {', '.join(missing)}")
+    if brotli is None:
+        print("[Assets] brotli is not installed (pip install brotli); writing gzip variants only")
+
+    build_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    keep = {"manifest.json"}
+    for name in VENDOR_ASSETS:
+        data = (vendor_dir / name).read_bytes()
+        hashed, _ = _hashed_name(name, data)
+        for suffix, body in _compress(data).items():
+            variant = hashed + suffix
+            path = build_dir / variant
+            if not path.exists():
+                path.write_bytes(body)
+            keep.add(variant)
+        manifest[name] = hashed
+
+    for path in build_dir.iterdir():
+        if path.name not in keep:
+            path.unlink()
+    tmp = build_dir / "manifest.json.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2))
+    tmp.replace(build_dir / "manifest.json")
+    return manifest
+
+
+def _hashed_name(name: str, data: bytes) -> Tuple[str, str]:
+    """Return the content-hashed file name and the hash."""
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    stem, dot, ext = name.rpartition(".")
+    return f"{stem}.{digest}{dot}{ext}", digest
+
+
+def _compress(data: bytes) -> Dict[str, bytes]:
+    """Return the file suffixes and bodies to serve, keeping smaller variants only."""
+    variants = {"": data, ".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    return {suffix: body for suffix, body in variants.items() if not suffix or len(body) < len(data)}
+
+
+class Assets:
+    """Frontend assets and the URLs pages load them from.
+
+    Vendor assets come from the build manifest. Without a build, url()
+    falls back to the pinned CDN URLs so the terminal still works on
+    hosts with internet access. The client app in APP_DIR is always
+    served locally; it is hashed and compressed in memory on load.
+    """
+
+    def __init__(self, build_dir: Path = BUILD_DIR, app_dir: Path = APP_DIR):
+        """Load the build manifest and the client app.
+
+        Args:
+            build_dir: Directory written by build_assets
+            app_dir: Directory holding APP_ASSETS
+        """
+        self.build_dir = build_dir
+        try:
+            self.manifest: Dict[str, str] = json.loads((build_dir / "manifest.json").read_text())
+        except (OSError, ValueError):
+            self.manifest = {}
+        self._files = set(self.manifest.values())
+        # hashed name -> (ETag, {suffix: body})
+        self._memory: Dict[str, Tuple[str, Dict[str, bytes]]] = {}
+        for name in APP_ASSETS:
+            data = (app_dir / name).read_bytes()
+            hashed, digest = _hashed_name(name, data)
+            self._memory[hashed] = (f'"{digest}"', _compress(data))
+            self.manifest[name] = hashed
+        self.version = hashlib.sha256(json.dumps(self.manifest, sort_keys=True).encode()).hexdigest()[:12]
+
+    @property
+    def built(self) -> bool:
+        """Whether every vendor asset is served locally."""
+        return all(name in self.manifest for name in VENDOR_ASSETS)
+
+    def url(self, name: str) -> str:
+        """URL of an asset by logical name.
+
+        Args:
+            name: Key of VENDOR_ASSETS or APP_ASSETS
+
+        Returns:
+            Hashed local URL, or the CDN URL if the asset is not built
+        """
+        hashed = self.manifest.get(name)
+        return f"{URL_PREFIX}/{hashed}" if hashed else VENDOR_ASSETS[name]
+
+    def response(self, request: Request, name: str) -> Response:
+        """Serve a hashed asset, precompressed if the client accepts it.
+
+        Args:
+            request: Incoming request
+            name: Hashed file name
+
+        Returns:
+            Response cached as immutable, 304 if the client's ETag
+            matches, 404 for unknown names
+        """
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        headers = {"Cache-Control": IMMUTABLE, "Vary": "Accept-Encoding"}
+        accept = request.headers.get("accept-encoding", "")
+        if name in self._memory:
+            etag, variants = self._memory[name]
+            headers["ETag"] = etag
+            if etag in request.headers.get("if-none-match", ""):
+                return Response(status_code=304, headers=headers)
+            for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+                if encoding in accept and suffix in variants:
+                    headers["Content-Encoding"] = encoding
+                    return Response(variants[suffix], media_type=media_type, headers=headers)
+            return Response(variants[""], media_type=media_type, headers=headers)
+        if name not in self._files:
+            return JSONResponse({"error": "Asset not found"}, status_code=404)
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            path = self.build_dir / (name + suffix)
+            if encoding in accept and path.exists():
+                headers["Content-Encoding"] = encoding
+                return FileResponse(path, media_type=media_type, headers=headers)
+        return FileResponse(self.build_dir / name, media_type=media_type, headers=headers)
+
+    def service_worker_response(self) -> Response:
+        """Serve the service worker that precaches the hashed assets.
+
+        The cache name changes with the manifest, so a new build replaces
+        the old cache on the next visit.
+
+        Returns:
+            JavaScript response, revalidated on every load
+        """
+        urls = [f"{URL_PREFIX}/{hashed}" for hashed in self.manifest.values()]
+        body = SERVICE_WORKER % {"version": self.version, "urls": json.dumps(urls), "prefix": URL_PREFIX}
+        return Response(body, media_type="text/javascript", headers={"Cache-Control": "no-cache"})
+
+
+@functools.lru_cache(maxsize=None)
+def default_assets() -> Assets:
+    """Assets from the default build directory, loaded once."""
+    return Assets()
+
+
+def build_command(fetch: bool = True, force: bool = False) -> Optional[Dict[str, str]]:
+    """Fetch and build the assets, reporting the result.
+
+    Args:
+        fetch: Download missing vendor files first
+        force: Download all vendor files again
+
+    Returns:
+        Manifest, or None if the build failed
+    """
+    try:
+        if fetch:
+            fetch_assets(force=force)
+        manifest = build_assets()
+    except OSError as e:  # includes URLError and missing files
+        print(f"[Assets] Build failed: {e}")
+        print(f"[Assets] Copy {', '.join(VENDOR_ASSETS)} into {VENDOR_DIR} and run with --offline")
+        return None
+    for name, hashed in manifest.items():
+        variants = [suffix for suffix in (".br", ".gz") if (BUILD_DIR / (hashed + suffix)).exists()]
+        print(f"[Assets] {name} -> {URL_PREFIX}/{hashed} {' '.join(variants)}")
+    return manifest
@@ -0,0 +1,42 @@
+"""Defaults and choices shared by the CLI and the modules they configure.
+
+main.py builds its argument parser from these for every subcommand, so
+this module imports nothing: 'main.py stop' and 'status' must not load
+asyncio, starlette or the session modules. The owning modules import
+their defaults from here.
+"""
+
+# events/output_queue.py
+DEFAULT_FLUSH_INTERVAL = 0.005  # seconds
+DEFAULT_MAX_FRAME_SIZE = 64 * 1024
+DEFAULT_HIGH_WATERMARK = 1024 * 1024  # unacknowledged bytes
+DEFAULT_LOW_WATERMARK = 256 * 1024
+
+# events/recorder.py
+COMPRESSIONS = ("none", "gzip", "zstd")
+DEFAULT_MAX_FILE_BYTES = 64 * 1024 * 1024  # uncompressed bytes per file before rotating
+DEFAULT_MAX_TOTAL_BYTES = 1024 * 1024 * 1024  # recordings kept on disk
+DEFAULT_RETENTION_DAYS = 30.0
+
+# events/screen.py, events/scrollback.py, events/session_registry.py
+DEFAULT_SNAPSHOT_LINES = 1000
+DEFAULT_SCROLLBACK_BYTES = 1024 * 1024
+DEFAULT_GRACE_PERIOD = 300.0  # seconds a detached session is kept
+
+# events/warm_pool.py
+DEFAULT_WARM_TTL = 600.0  # seconds an unclaimed session is kept
+DEFAULT_WARM_MAX_BYTES = 4 * 1024 * 1024  # buffered startup output, all sessions
+DEFAULT_WARM_PER_WORKSPACE = 1
+
+# server/event_loop.py, server/page.py
+LOOPS = ("auto", "asyncio", "uvloop")
+DEFAULT_SLOW_CALLBACK_MS = 100.0  # asyncio's own default in debug mode
+PAGES = ("nicegui", "static")
+
+# server/workspace_index.py
+COMMON_DIRS = ["Workspace", "Projects", "dev", "code"]
+DEFAULT_MAX_DEPTH = 1  # levels below a root listed as workspaces
+DEFAULT_IGNORE = ["node_modules"]
+
+# ssh/backend.py
+BACKENDS = ("ssh", "local")
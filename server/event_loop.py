@@ -0,0 +1,55 @@
+"""Event loop selection and tuning for the server process."""
+
+import asyncio
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from server.defaults import DEFAULT_SLOW_CALLBACK_MS
+
+
+def resolve_loop(name: str) -> str:
+    """Pick the loop implementation to run, falling back when unavailable.
+
+    Args:
+        name: "auto" (uvloop if installed), "asyncio" or "uvloop"
+
+    Returns:
+        "uvloop" or "asyncio"
+    """
+    available = importlib.util.find_spec("uvloop") is not None
+    if name == "uvloop" and not available:
+        print("[Loop] uvloop is not installed (pip install uvloop); using asyncio")
+    if name == "asyncio" or not available:
+        return "asyncio"
+    return "uvloop"
+
+
+def configure_loop(
+    loop: asyncio.AbstractEventLoop,
+    executor_workers: Optional[int] = None,
+    debug: bool = False,
+    slow_callback_ms: float = DEFAULT_SLOW_CALLBACK_MS,
+):
+    """Apply thread-pool and debug settings to the running loop.
+
+    Args:
+        loop: Running event loop
+        executor_workers: Size of the default executor used by
+            asyncio.to_thread and run_in_executor (None keeps Python's default)
+        debug: Enable asyncio debug mode, which logs callbacks and tasks
+            that block the loop for longer than slow_callback_ms
+        slow_callback_ms: Threshold for slow-callback warnings
+    """
+    if executor_workers:
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="blocking"))
+    if debug:
+        loop.set_debug(True)
+        loop.slow_callback_duration = slow_callback_ms / 1000
+    details = []
+    if executor_workers:
+        details.append(f"{executor_workers} executor threads")
+    if debug:
+        details.append(f"debug, slow callbacks > {slow_callback_ms:g} ms")
+    suffix = f" ({', '.join(details)})" if details else ""
+    print(f"[Loop] Running on {type(loop).__module__}.{type(loop).__name__}{suffix}")
@@ -0,0 +1,168 @@
+"""Terminal page markup, shared by the NiceGUI page and the static page.
+
+The static page (start --page static) is a plain HTML document served by
+FastAPI. Browser tabs get no NiceGUI client, Vue runtime or second
+websocket; only /socket.io and /api/* are dynamic.
+"""
+
+import gzip
+import hashlib
+import json
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from server.assets import Assets
+TITLE = "Claude Web Terminal"
+FAVICON = "🤖"
+
+MARKUP = """
+    <div class="terminal-container" id="terminal-container">
+        <div class="sidebar" id="sidebar">
+            <div class="sidebar-header">
+                <h3>Sessions</h3>
+                <button class="toggle-btn settings-btn" title="Settings" onclick="CT.toggleSettings()">⚙</button>
+                <button class="toggle-btn" onclick="CT.toggleSidebar()">◀</button>
+            </div>
+            <div class="settings-panel" id="settings-panel">
+                <label>Renderer
+                    <select id="setting-renderer" onchange="CT.updateSetting('renderer', this.value)">
+                        <option value="dom">DOM</option>
+                        <option value="canvas">Canvas</option>
+                        <option value="webgl">WebGL</option>
+                    </select>
+                </label>
+                <label><input type="checkbox" id="setting-batch"
+                              onchange="CT.updateSetting('batchOutput', this.checked)"> Batch output per frame</label>
+                <label><input type="checkbox" id="setting-perf"
+                              onchange="CT.updateSetting('perfOverlay', this.checked)"> FPS and main-thread readout</label>
+            </div>
+            <div class="workspace-select">
+                <input type="text" class="workspace-input" id="workspace-input"
+                       placeholder="🔍 Search workspace..."
+                       onfocus="CT.showWorkspaceDropdown()"
+                       oninput="CT.filterWorkspaces(this.value)"
+                       onkeydown="CT.handleWorkspaceKeydown(event)">
+                <div class="workspace-dropdown" id="workspace-dropdown"></div>
+            </div>
+            <div class="session-list" id="session-list"></div>
+        </div>
+        <div class="terminal-main" id="terminal-main">
+            <div class="empty-state" id="empty-state">
+                <div class="icon">📺</div>
+                <div>Select a workspace to start</div>
+            </div>
+        </div>
+    </div>
+    <div class="shortcut-help">
+        <kbd>⌃⇧F</kbd> Focus
+        <kbd>⌃⇧L</kbd> Latency
+        <kbd>⌘D</kbd> Split
+        <kbd>⌘W</kbd> Close
+        <kbd>⌘⌥↑↓←→</kbd> Navigate
+    </div>
+"""
+
+DOCUMENT = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<link rel="icon" href="data:image/svg+xml,<svg xmlns=%22http://www.w3.org/2000/svg%22 viewBox=%220 0 100 100%22><text y=%22.9em%22 font-size=%2290%22>{favicon}</text></svg>">
+{head}
+<style>html, body {{ margin: 0; height: 100%; overflow: hidden; background: #1e1e1e; color-scheme: dark; }}</style>
+</head>
+<body>
+{markup}
+{body}
+</body>
+</html>
+"""
+
+
+def head_html(assets: Assets) -> str:
+    """Stylesheet links for the terminal page.
+
+    Args:
+        assets: Assets providing the URLs
+
+    Returns:
+        HTML for the document head
+    """
+    return (
+        f'<link rel="stylesheet" href="{assets.url("xterm.css")}" />\n'
+        f'<link rel="stylesheet" href="{assets.url("terminal.css")}" />'
+    )
+
+
+def body_html(assets: Assets, socket_url: str = "") -> str:
+    """Config object, scripts and service worker registration.
+
+    Args:
+        assets: Assets providing the URLs
+        socket_url: Socket.IO server URL, empty for the page's origin
+
+    Returns:
+        HTML for the end of the document body
+    """
+    # Escaped so the JSON cannot close the script element
+    config = {
+        "socketUrl": socket_url,
+        "renderers": {
+            "webgl": assets.url("xterm-addon-webgl.js"),
+            "canvas": assets.url("xterm-addon-canvas.js"),
+        },
+    }
+    config = json.dumps(config).replace("<", "\\u003c")
+    return f'''<script>window.CT_CONFIG = {config};</script>
+<script src="{assets.url("xterm.js")}"></script>
+<script src="{assets.url("xterm-addon-fit.js")}"></script>
+<script src="{assets.url("socket.io.js")}"></script>
+<script src="{assets.url("terminal.js")}"></script>
+<script>
+// Serves the hashed assets from cache on reloads
+if ('serviceWorker' in navigator) navigator.serviceWorker.register('/sw.js').catch(() => {{}});
+</script>'''
+
+
+class StaticPage:
+    """The terminal page as a prebuilt HTML document.
+
+    The document only changes with the assets, so it is rendered and
+    compressed once and revalidated with an ETag.
+    """
+
+    def __init__(self, assets: Assets, socket_url: str = ""):
+        """Render the document.
+
+        Args:
+            assets: Assets providing the URLs
+            socket_url: Socket.IO server URL, empty for the page's origin
+        """
+        self.body = DOCUMENT.format(
+            title=TITLE,
+            favicon=FAVICON,
+            head=head_html(assets),
+            markup=MARKUP.strip("\n"),
+            body=body_html(assets, socket_url),
+        ).encode()
+        self.gzip_body = gzip.compress(self.body, mtime=0)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:16]}"'
+
+    def response(self, request: Request) -> Response:
+        """Serve the document, answering conditional requests with 304.
+
+        Args:
+            request: Incoming request
+
+        Returns:
+            304, or the HTML gzip-compressed if the client accepts it
+        """
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if self.etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzip_body, media_type="text/html", headers=headers)
+        return Response(content=self.body, media_type="text/html", headers=headers)
@@ -0,0 +1,392 @@
+"""Cached workspace index served with ETag and gzip support."""
+
+import asyncio
+import concurrent.futures
+import fnmatch
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from server.defaults import COMMON_DIRS, DEFAULT_IGNORE, DEFAULT_MAX_DEPTH
+
+DEFAULT_CHECK_INTERVAL = 2.0  # seconds between directory mtime checks
+DEFAULT_MAX_AGE = 60.0  # seconds before nested directories are rechecked
+DEFAULT_SCAN_WORKERS = 4
+INDEX_VERSION = 1
+
+# Bounded pool for directory scans, shared by all indexes
+_scan_executor = ThreadPoolExecutor(max_workers=DEFAULT_SCAN_WORKERS, thread_name_prefix="workspace-scan")
+
+# records[path] = [mtime_ns, is_git, [[child name, child real path], ...] or None]
+DirRecord = list
+# (root name, path, path relative to the root, depth below the root)
+WalkItem = Tuple[str, str, str, int]
+
+
+def visit_dir(path: str, want_children: bool, previous: Optional[DirRecord]) -> Optional[DirRecord]:
+    """Describe one directory, reusing its previous record if unchanged.
+
+    Creating or removing an entry (including .git) changes a directory's
+    mtime, so an unchanged mtime means the previous listing is current and
+    costs one stat instead of a scandir.
+
+    Args:
+        path: Directory to describe
+        want_children: Whether its subdirectories are needed
+        previous: Record from the last build, if any
+
+    Returns:
+        Directory record, or None if the directory cannot be read
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    if previous and previous[0] == mtime and (previous[2] is not None or not want_children):
+        return previous
+    if not want_children:
+        return [mtime, os.path.exists(os.path.join(path, ".git")), None]
+
+    is_git = False
+    children = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name == ".git":
+                    is_git = True
+                    continue
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if not entry.is_dir():
+                        continue
+                    real = os.path.realpath(entry.path) if entry.is_symlink() else entry.path
+                except OSError:
+                    continue
+                children.append([entry.name, real])
+    except OSError:
+        return None
+    return [mtime, is_git, children]
+
+
+class IndexSnapshot:
+    """One build of the index with its encoded response bodies."""
+
+    def __init__(self, workspaces: List[dict]):
+        """Encode the workspace list once for all requests.
+
+        Args:
+            workspaces: Workspace info dicts
+        """
+        self.workspaces = workspaces
+        self.body = json.dumps(workspaces).encode("utf-8")
+        self.gzip_body = gzip.compress(self.body, compresslevel=6, mtime=0)
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+
+
+class WorkspaceIndex:
+    """Workspace list built once and rebuilt when a watched directory changes.
+
+    Directories up to max_depth below each root are listed; descent stops at
+    git repositories and at names or relative paths matching an ignore glob.
+
+    Adding, removing or renaming a workspace directly in a root changes the
+    root's mtime, so validating the cache costs one stat per root. Checks
+    are rate-limited to check_interval; deeper changes (such as git init in
+    a workspace) are picked up when the tree is rechecked after max_age.
+    Rebuilds are incremental: every directory is stat'ed, but only changed
+    ones are listed again. With index_file the per-directory records
+    persist across restarts.
+
+    Directories are scanned in parallel on a bounded thread pool; from the
+    event loop use get_async() or stream(), which never block it.
+    """
+
+    def __init__(
+        self,
+        dirs: Sequence[str] = COMMON_DIRS,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        ignore: Sequence[str] = DEFAULT_IGNORE,
+        index_file: Optional[Path] = None,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+        max_age: float = DEFAULT_MAX_AGE,
+    ):
+        """Initialize workspace index.
+
+        Args:
+            dirs: Workspace root directories, absolute or relative to $HOME
+            max_depth: Levels below a root listed as workspaces
+            ignore: Glob patterns for directory names or paths relative to
+                their root that are neither listed nor descended into
+            index_file: JSON file persisting directory records
+            check_interval: Minimum seconds between root mtime checks
+            max_age: Seconds after which nested directories are rechecked
+        """
+        self.dirs = list(dirs)
+        self.max_depth = max(1, max_depth)
+        self.ignore = list(ignore)
+        self.index_file = index_file
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self.builds = 0
+        self.build_time = 0.0
+        self.dirs_listed = 0
+        self._records: Dict[str, DirRecord] = self._load()
+        self._snapshot: Optional[IndexSnapshot] = None
+        self._mtimes: Tuple[Optional[int], ...] = ()
+        self._checked_at = 0.0
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> IndexSnapshot:
+        """Return the current index, rebuilding it if a root changed."""
+        with self._lock:
+            snapshot = self._current()
+            if snapshot is not None:
+                return snapshot
+            start = time.perf_counter()
+            mtimes = self._root_mtimes()
+            walk = _Walk(self)
+            pending = {walk.submit(item): item for item in walk.roots()}
+            while pending:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    for child in walk.expand(pending.pop(future), future.result()):
+                        pending[walk.submit(child)] = child
+            snapshot = self._install(walk, mtimes, start)
+        self._save()
+        return snapshot
+
+    async def get_async(self) -> IndexSnapshot:
+        """Return the current index without blocking the event loop."""
+        return await asyncio.to_thread(self.get)
+
+    async def stream(self) -> AsyncIterator[List[dict]]:
+        """Yield workspaces as directory scans finish.
+
+        A current index is yielded in one piece; otherwise the index is
+        rebuilt and workspaces are yielded in batches as soon as they are
+        known, with the home directory last.
+        """
+        snapshot = await asyncio.to_thread(self._check)
+        if snapshot is not None:
+            yield snapshot.workspaces
+            return
+
+        start = time.perf_counter()
+        mtimes = await asyncio.to_thread(self._root_mtimes)
+        walk = _Walk(self)
+        roots = await asyncio.to_thread(walk.roots)
+        pending = {asyncio.wrap_future(walk.submit(item)): item for item in roots}
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            found = len(walk.workspaces)
+            for future in done:
+                for child in walk.expand(pending.pop(future), future.result()):
+                    pending[asyncio.wrap_future(walk.submit(child))] = child
+            if len(walk.workspaces) > found:
+                yield walk.workspaces[found:]
+        with self._lock:
+            snapshot = self._install(walk, mtimes, start)
+        yield snapshot.workspaces[-1:]
+        await asyncio.to_thread(self._save)
+
+    def invalidate(self):
+        """Force a rebuild on the next request."""
+        with self._lock:
+            self._snapshot = None
+
+    def _check(self) -> Optional[IndexSnapshot]:
+        """Return the cached index if it is still current."""
+        with self._lock:
+            return self._current()
+
+    def _current(self) -> Optional[IndexSnapshot]:
+        """Validate the cache against root mtimes (caller holds the lock)."""
+        now = time.monotonic()
+        if self._snapshot is None:
+            return None
+        if now - self._checked_at < self.check_interval:
+            return self._snapshot
+        self._checked_at = now
+        if self._root_mtimes() != self._mtimes:
+            return None
+        if now - self._built_at > self.max_age:
+            return None
+        return self._snapshot
+
+    def _install(self, walk: "_Walk", mtimes: Tuple[Optional[int], ...], start: float) -> IndexSnapshot:
+        """Store a finished walk and log how long it took."""
+        workspaces = sorted(walk.workspaces, key=lambda x: x["name"].lower())
+        workspaces.append(self._home_entry())
+        self._snapshot = IndexSnapshot(workspaces)
+        self._records = walk.records
+        self._mtimes = mtimes
+        self._checked_at = self._built_at = time.monotonic()
+        self.build_time = time.perf_counter() - start
+        self.dirs_listed = walk.listed
+        self.builds += 1
+        print(f"[Workspaces] Indexed {len(workspaces)} workspaces in {self.build_time * 1000:.1f} ms "
+              f"({len(walk.records)} directories, {walk.listed} listed)")
+        return self._snapshot
+
+    def _roots(self) -> List[Tuple[str, str]]:
+        """Configured roots as (name, absolute path)."""
+        home = Path.home()
+        return [(dir_name, str(home / dir_name)) for dir_name in self.dirs]
+
+    def _ignored(self, name: str, relative: str) -> bool:
+        """Whether a directory matches an ignore glob."""
+        return any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relative, pattern) for pattern in self.ignore)
+
+    @staticmethod
+    def _home_entry() -> dict:
+        """Workspace entry for the home directory."""
+        home = Path.home()
+        return {
+            "name": "~ (Home)",
+            "path": str(home),
+            "is_git": (home / ".git").exists(),
+        }
+
+    def _root_mtimes(self) -> Tuple[Optional[int], ...]:
+        """Stat home and each root; missing roots count as None."""
+        mtimes = []
+        for root in [str(Path.home())] + [path for _, path in self._roots()]:
+            try:
+                mtimes.append(os.stat(root).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _load(self) -> Dict[str, DirRecord]:
+        """Read persisted directory records, ignoring a missing or stale file."""
+        if self.index_file is None:
+            return {}
+        try:
+            data = json.loads(self.index_file.read_text())
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return {}
+        return data.get("records", {})
+
+    def _save(self):
+        """Persist directory records atomically.
+
+        Runs outside the lock, so each save writes its own temporary file;
+        concurrent saves never write to or replace each other's file.
+        """
+        if self.index_file is None:
+            return
+        data = json.dumps({"version": INDEX_VERSION, "records": self._records})
+        tmp = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self.index_file.parent, prefix=self.index_file.name + ".", suffix=".tmp", delete=False
+            ) as f:
+                tmp = f.name
+                f.write(data)
+            os.replace(tmp, self.index_file)
+        except OSError as e:
+            print(f"[Workspaces] Could not save index: {e}")
+            if tmp:
+                Path(tmp).unlink(missing_ok=True)
+
+
+class _Walk:
+    """State of one breadth-first walk over the workspace roots.
+
+    Directories are visited on the scan pool as soon as their parent has
+    been expanded; expand() runs on the coordinating thread only.
+    """
+
+    def __init__(self, index: WorkspaceIndex):
+        self.index = index
+        self.previous = index._records
+        self.records: Dict[str, DirRecord] = {}
+        self.workspaces: List[dict] = []
+        self.listed = 0
+        self._seen = set()
+
+    def roots(self) -> List[WalkItem]:
+        """Existing roots, one per real path (merges case variants)."""
+        items = []
+        for name, path in self.index._roots():
+            if not os.path.isdir(path):
+                continue
+            real = os.path.realpath(path)
+            if real not in self._seen:
+                self._seen.add(real)
+                items.append((name, path, "", 0))
+        return items
+
+    def submit(self, item: WalkItem) -> concurrent.futures.Future:
+        """Visit a directory on the scan pool."""
+        return _scan_executor.submit(visit_dir, item[1], item[3] < self.index.max_depth, self.previous.get(item[1]))
+
+    def expand(self, item: WalkItem, record: Optional[DirRecord]) -> List[WalkItem]:
+        """Record a visited directory and return the children to visit."""
+        name, path, relative, depth = item
+        if record is None:
+            return []
+        self.records[path] = record
+        if record is not self.previous.get(path):
+            self.listed += 1
+        mtime, is_git, children = record
+        if depth > 0:
+            display_name = f"{name}/{relative}"
+            if is_git:
+                display_name += " (git)"
+            self.workspaces.append({"name": display_name, "path": path, "is_git": is_git})
+        # Stop descending at repositories and at the depth limit
+        if children is None or (depth > 0 and is_git):
+            return []
+        items = []
+        for child, real in children:
+            child_relative = f"{relative}/{child}" if relative else child
+            if real in self._seen or self.index._ignored(child, child_relative):
+                continue
+            self._seen.add(real)
+            items.append((name, os.path.join(path, child), child_relative, depth + 1))
+        return items
+
+
+async def workspace_response(request: Request, index: WorkspaceIndex) -> Response:
+    """Serve the index as JSON, answering conditional requests with 304.
+
+    With ?stream=1 the response is newline-delimited JSON instead: one
+    array of workspaces per line, sent as directory scans finish.
+
+    Args:
+        request: Incoming request
+        index: Workspace index to serve
+
+    Returns:
+        304, or the JSON body gzip-compressed if the client accepts it
+    """
+    if request.query_params.get("stream"):
+        async def lines():
+            async for part in index.stream():
+                yield json.dumps(part) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    snapshot = await index.get_async()
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if snapshot.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snapshot.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
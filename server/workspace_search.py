@@ -0,0 +1,228 @@
+"""Fuzzy workspace search over a precomputed trigram index."""
+
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from server.workspace_index import IndexSnapshot, WorkspaceIndex
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+RECENT_SIZE = 100  # workspaces remembered for ranking
+RECENT_BONUS = 40  # score added for the most recently used workspace
+
+# Scoring weights, in the spirit of fzf's
+SCORE_MATCH = 16
+BONUS_CONSECUTIVE = 8
+BONUS_BOUNDARY = 10
+BONUS_BASENAME = 12
+PENALTY_GAP = 1
+BOUNDARY_CHARS = "/-_. "
+
+
+def _char_mask(text: str) -> int:
+    """Bitmask of the characters in text, for cheap subsequence rejection."""
+    mask = 0
+    for char in text:
+        mask |= 1 << (ord(char) % 63)
+    return mask
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Distinct three-character substrings of text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def fuzzy_score(query: str, text: str, basename_start: int = 0) -> Optional[int]:
+    """Score text as a subsequence match for query.
+
+    The leftmost match end is found first, then the match is tightened
+    backwards so the shortest window is scored. Matches at word starts,
+    consecutive characters and matches in the last path segment rank higher.
+
+    Args:
+        query: Lowercase query
+        text: Lowercase candidate
+        basename_start: Index where the last path segment of text begins
+
+    Returns:
+        Score, or None if query is not a subsequence of text
+    """
+    if not query:
+        return 0
+    # Forward: leftmost position where the whole query has matched
+    qi = 0
+    end = -1
+    for ti, char in enumerate(text):
+        if char == query[qi]:
+            qi += 1
+            if qi == len(query):
+                end = ti
+                break
+    if end < 0:
+        return None
+    # Backward: tighten to the latest possible start
+    qi = len(query) - 1
+    positions = []
+    for ti in range(end, -1, -1):
+        if text[ti] == query[qi]:
+            positions.append(ti)
+            qi -= 1
+            if qi < 0:
+                break
+    positions.reverse()
+
+    score = 0
+    previous = -2
+    for pos in positions:
+        score += SCORE_MATCH
+        if pos == previous + 1:
+            score += BONUS_CONSECUTIVE
+        elif previous >= 0:
+            score -= PENALTY_GAP * (pos - previous - 1)
+        if pos == 0 or text[pos - 1] in BOUNDARY_CHARS:
+            score += BONUS_BOUNDARY
+        if pos >= basename_start:
+            score += BONUS_BASENAME
+        previous = pos
+    # Prefer shorter candidates among equal matches
+    return score - len(text) // 8
+
+
+class WorkspaceSearch:
+    """Ranks workspaces from a WorkspaceIndex for a query.
+
+    Names are lowercased, masked and trigram-indexed once per index build.
+    A query of three or more characters first looks up substring matches
+    through the trigram index; only if there are fewer than the requested
+    number are all workspaces scanned for subsequence matches (after a
+    character-mask check). Recently used workspaces get a bonus.
+    """
+
+    def __init__(self, index: WorkspaceIndex):
+        """Initialize workspace search.
+
+        Args:
+            index: Workspace index to search
+        """
+        self.index = index
+        self._snapshot: Optional[IndexSnapshot] = None
+        self._names: List[str] = []
+        self._basenames: List[int] = []
+        self._masks: List[int] = []
+        self._trigrams: Dict[str, List[int]] = {}
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record_use(self, path: str):
+        """Note that a session was started in a workspace.
+
+        Args:
+            path: Workspace path
+        """
+        with self._lock:
+            self._recent[path] = None
+            self._recent.move_to_end(path)
+            while len(self._recent) > RECENT_SIZE:
+                self._recent.popitem(last=False)
+
+    async def search_async(self, query: str, limit: int = DEFAULT_LIMIT) -> dict:
+        """Search without blocking the event loop.
+
+        Args:
+            query: Search text
+            limit: Maximum results
+
+        Returns:
+            Dict with query, total matches and the ranked results
+        """
+        snapshot = await self.index.get_async()
+        return await asyncio.to_thread(self.search, snapshot, query, limit)
+
+    def search(self, snapshot: IndexSnapshot, query: str, limit: int = DEFAULT_LIMIT) -> dict:
+        """Rank the workspaces of an index build for a query.
+
+        Args:
+            snapshot: Index build to search
+            query: Search text
+            limit: Maximum results
+
+        Returns:
+            Dict with query, total matches and the ranked results
+        """
+        with self._lock:
+            if snapshot is not self._snapshot:
+                self._build(snapshot)
+            recency = {path: rank for rank, path in enumerate(reversed(self._recent))}
+            names, basenames, masks, trigrams = self._names, self._basenames, self._masks, self._trigrams
+        workspaces = snapshot.workspaces
+        query = query.lower().strip()
+
+        candidates = None
+        if len(query) >= 3:
+            candidates = self._substring_candidates(query, names, trigrams)
+            if len(candidates) < limit:
+                candidates = None
+        if candidates is None:
+            mask = _char_mask(query)
+            candidates = [i for i, m in enumerate(masks) if m & mask == mask]
+
+        scored = []
+        for i in candidates:
+            score = fuzzy_score(query, names[i], basenames[i])
+            if score is None:
+                continue
+            rank = recency.get(workspaces[i]["path"])
+            if rank is not None:
+                score += RECENT_BONUS * (RECENT_SIZE - rank) // RECENT_SIZE
+            scored.append((-score, i))
+        # Ties (every match, for an empty query) keep index order
+        scored.sort()
+        results = [dict(workspaces[i], score=-negative) for negative, i in scored[:limit]]
+        return {"query": query, "total": len(scored), "results": results}
+
+    def _build(self, snapshot: IndexSnapshot):
+        """Precompute lowercase names, masks and trigrams for a build."""
+        self._snapshot = snapshot
+        self._names = [ws["name"].lower().replace(" (git)", "") for ws in snapshot.workspaces]
+        self._basenames = [name.rfind("/") + 1 for name in self._names]
+        self._masks = [_char_mask(name) for name in self._names]
+        self._trigrams = {}
+        for i, name in enumerate(self._names):
+            for gram in _trigrams(name):
+                self._trigrams.setdefault(gram, []).append(i)
+
+    @staticmethod
+    def _substring_candidates(query: str, names: List[str], trigrams: Dict[str, List[int]]) -> List[int]:
+        """Workspaces containing query as a substring, via the trigram index."""
+        postings = [trigrams.get(gram, []) for gram in _trigrams(query)]
+        postings.sort(key=len)
+        ids = set(postings[0])
+        for posting in postings[1:]:
+            ids.intersection_update(posting)
+            if not ids:
+                break
+        return sorted(i for i in ids if query in names[i])
+
+
+async def search_response(request: Request, search: WorkspaceSearch) -> JSONResponse:
+    """Serve ranked search results for ?q=&limit=.
+
+    Args:
+        request: Incoming request
+        search: Workspace search to query
+
+    Returns:
+        JSON with query, total and results
+    """
+    query = request.query_params.get("q", "")
+    try:
+        limit = int(request.query_params.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    limit = min(max(limit, 1), MAX_LIMIT)
+    return JSONResponse(await search.search_async(query, limit))
@@ -0,0 +1,130 @@
+"""Terminal session backend interface shared by SSH and local PTY sessions."""
+
+import codecs
+import inspect
+from typing import Awaitable, Callable, Optional, Union
+
+DEFAULT_COMMAND = "claude"
+
+
+class SessionBackend:
+    """Base class for a PTY session driving one terminal tab.
+
+    Subclasses implement connect/send_input/resize/disconnect and call
+    _deliver() with raw PTY bytes and on_close when the session ends.
+    """
+
+    def __init__(
+        self,
+        on_output: Callable[[Union[str, bytes]], Union[None, Awaitable[None]]],
+        on_close: Optional[Callable[[], None]] = None,
+        binary: bool = False,
+    ):
+        """Initialize session backend.
+
+        Args:
+            on_output: Callback function to handle terminal output; if it
+                returns an awaitable, reading waits for it (backpressure)
+            on_close: Callback function when session closes
+            binary: Pass raw PTY bytes to on_output instead of decoded text
+        """
+        self.on_output = on_output
+        self.on_close = on_close
+        self.binary = binary
+        # Stateful decoder keeps multibyte characters split across reads intact
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        # perf_counter() when input was last written, for latency probes
+        self.input_written_at = 0.0
+
+    async def connect(
+        self,
+        workspace: str,
+        password: Optional[str] = None,
+        term_type: str = "xterm-256color",
+        cols: int = 120,
+        rows: int = 40,
+        command: str = DEFAULT_COMMAND,
+    ) -> bool:
+        """Start the session.
+
+        Args:
+            workspace: Working directory to start in
+            password: Optional password, for backends that authenticate
+            term_type: Terminal type for PTY
+            cols: Terminal columns
+            rows: Terminal rows
+            command: Program to run in the workspace
+
+        Returns:
+            True if the session started
+        """
+        raise NotImplementedError
+
+    async def send_input(self, data: str):
+        """Send input to the session.
+
+        Args:
+            data: Input string to send
+        """
+        raise NotImplementedError
+
+    async def resize(self, cols: int, rows: int):
+        """Resize terminal.
+
+        Args:
+            cols: New column count
+            rows: New row count
+        """
+        raise NotImplementedError
+
+    async def disconnect(self):
+        """Stop the session."""
+        raise NotImplementedError
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if the session is active."""
+        raise NotImplementedError
+
+    async def _deliver(self, data: bytes):
+        """Pass PTY bytes on as bytes or incrementally decoded text.
+
+        Args:
+            data: Raw PTY output
+        """
+        if self.binary:
+            await self._emit(data)
+        else:
+            text = self._decoder.decode(data)
+            if text:
+                await self._emit(text)
+
+    async def _emit(self, output: Union[str, bytes]):
+        """Pass output to the callback, awaiting it if it is async.
+
+        Args:
+            output: Terminal output (messages are encoded in binary mode)
+        """
+        if self.binary and isinstance(output, str):
+            output = output.encode("utf-8")
+        result = self.on_output(output)
+        if inspect.isawaitable(result):
+            await result
+
+
+def get_backend(name: str) -> type:
+    """Return the session class for a backend name.
+
+    Args:
+        name: One of BACKENDS
+
+    Returns:
+        SessionBackend subclass
+    """
+    if name == "ssh":
+        from ssh.session import SSHSession
+        return SSHSession
+    if name == "local":
+        from ssh.local import LocalPTYSession
+        return LocalPTYSession
+    raise ValueError(f"Unknown session backend: {name}")
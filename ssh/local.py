@@ -0,0 +1,249 @@
+"""Local pseudo-terminal session backend (no SSH round trip)."""
+
+import asyncio
+import fcntl
+import os
+import pwd
+import signal
+import struct
+import termios
+import time
+from typing import Awaitable, Callable, Optional, Union
+
+from ssh.backend import DEFAULT_COMMAND, SessionBackend
+
+READ_SIZE = 64 * 1024
+
+
+def _set_controlling_tty():
+    """Make the child's stdin PTY its controlling terminal (runs after fork)."""
+    fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+
+
+class LocalPTYSession(SessionBackend):
+    """Runs the command under the user's login shell on a local PTY.
+
+    Skips the key exchange, per-byte encryption and sshd process of the SSH
+    backend; the server must run as the user whose sessions it hosts.
+    """
+
+    def __init__(
+        self,
+        on_output: Callable[[Union[str, bytes]], Union[None, Awaitable[None]]],
+        on_close: Optional[Callable[[], None]] = None,
+        binary: bool = False,
+    ):
+        """Initialize local PTY session.
+
+        Args:
+            on_output: Callback function to handle terminal output; if it
+                returns an awaitable, reading waits for it (backpressure)
+            on_close: Callback function when session closes
+            binary: Pass raw PTY bytes to on_output instead of decoded text
+        """
+        super().__init__(on_output, on_close, binary)
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._fd: Optional[int] = None
+        self._running = False
+        self._reader: Optional[asyncio.Task] = None
+
+    async def connect(
+        self,
+        workspace: str,
+        password: Optional[str] = None,
+        term_type: str = "xterm-256color",
+        cols: int = 120,
+        rows: int = 40,
+        command: str = DEFAULT_COMMAND,
+    ) -> bool:
+        """Spawn the command on a new local PTY.
+
+        Args:
+            workspace: Working directory to start in
+            password: Ignored; the local backend does not authenticate
+            term_type: Terminal type for PTY
+            cols: Terminal columns
+            rows: Terminal rows
+            command: Program to run in the workspace
+
+        Returns:
+            True if the process started
+        """
+        try:
+            home = os.path.expanduser("~")
+
+            # Resolve workspace path
+            if not os.path.isabs(workspace):
+                workspace = os.path.join(home, workspace)
+
+            master, slave = os.openpty()
+            self._set_size(master, cols, rows)
+
+            # Login shell so PATH and profile match an SSH login
+            shell = os.environ.get("SHELL") or pwd.getpwuid(os.getuid()).pw_shell or "/bin/sh"
+            env = dict(os.environ, TERM=term_type)
+            try:
+                self.process = await asyncio.create_subprocess_exec(
+                    shell, "-l", "-c", f"exec {command}",
+                    stdin=slave,
+                    stdout=slave,
+                    stderr=slave,
+                    cwd=workspace,
+                    env=env,
+                    start_new_session=True,
+                    preexec_fn=_set_controlling_tty,
+                )
+            except Exception:
+                os.close(master)
+                raise
+            finally:
+                os.close(slave)
+
+            os.set_blocking(master, False)
+            self._fd = master
+            self._running = True
+
+            # Start reading output
+            self._reader = asyncio.create_task(self._read_output())
+            return True
+
+        except Exception as e:
+            await self._emit(f"\r\n[PTY Error] {e}\r\n")
+            return False
+
+    async def _read_output(self):
+        """Read output from the PTY and send to callback."""
+        try:
+            while self._running and self._fd is not None:
+                data = await self._read_chunk()
+                if not data:
+                    break
+                await self._deliver(data)
+        except Exception as e:
+            if self._running:
+                await self._emit(f"\r\n[Read Error] {e}\r\n")
+        finally:
+            self._running = False
+            await self._close_pty()
+            # Notify session closed
+            if self.on_close:
+                self.on_close()
+
+    async def _read_chunk(self) -> bytes:
+        """Wait until the PTY is readable and read once.
+
+        Reading only when asked keeps backpressure: while the callback
+        blocks, the kernel PTY buffer fills and the child blocks on write.
+
+        Returns:
+            Output bytes, or empty bytes once the child side is closed
+        """
+        loop = asyncio.get_running_loop()
+        fd = self._fd
+        future = loop.create_future()
+
+        def on_readable():
+            loop.remove_reader(fd)
+            try:
+                data = os.read(fd, READ_SIZE)
+            except BlockingIOError:
+                loop.add_reader(fd, on_readable)
+                return
+            except OSError:
+                data = b""  # EIO once every slave fd is closed
+            if not future.done():
+                future.set_result(data)
+
+        loop.add_reader(fd, on_readable)
+        try:
+            return await future
+        finally:
+            loop.remove_reader(fd)
+
+    async def send_input(self, data: str):
+        """Write input to the PTY.
+
+        Args:
+            data: Input string to send
+        """
+        if self._fd is None or not self._running:
+            return
+        payload = memoryview(data.encode("utf-8"))
+        loop = asyncio.get_running_loop()
+        try:
+            while payload:
+                try:
+                    written = os.write(self._fd, payload)
+                    payload = payload[written:]
+                except BlockingIOError:
+                    # PTY input buffer full (large paste); wait until writable
+                    writable = loop.create_future()
+                    loop.add_writer(self._fd, writable.set_result, None)
+                    try:
+                        await writable
+                    finally:
+                        loop.remove_writer(self._fd)
+            self.input_written_at = time.perf_counter()
+        except Exception as e:
+            await self._emit(f"\r\n[Write Error] {e}\r\n")
+
+    async def resize(self, cols: int, rows: int):
+        """Resize terminal; the kernel sends SIGWINCH to the child.
+
+        Args:
+            cols: New column count
+            rows: New row count
+        """
+        if self._fd is not None and self._running:
+            try:
+                self._set_size(self._fd, cols, rows)
+            except OSError:
+                pass  # Ignore resize errors
+
+    async def disconnect(self):
+        """Hang up the PTY and stop the child process."""
+        self._running = False
+        if self.process and self.process.returncode is None:
+            try:
+                os.killpg(self.process.pid, signal.SIGHUP)
+            except (ProcessLookupError, PermissionError):
+                pass
+        if self._reader:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reader = None
+        await self._close_pty()
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if the PTY session is active."""
+        return self._running and self._fd is not None
+
+    async def _close_pty(self):
+        """Close the master fd and reap the child process."""
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+        if self.process:
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=2.0)
+            except asyncio.TimeoutError:
+                try:
+                    os.killpg(self.process.pid, signal.SIGKILL)
+                except (ProcessLookupError, PermissionError):
+                    pass
+                await self.process.wait()
+            self.process = None
+
+    @staticmethod
+    def _set_size(fd: int, cols: int, rows: int):
+        """Set the PTY window size."""
+        # Sizes come from the client; clamp so packing cannot fail
+        cols, rows = (max(1, min(int(value), 0xFFFF)) for value in (cols, rows))
+        fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", rows, cols, 0, 0))
@@ -0,0 +1,192 @@
+"""Pooled asyncssh connections shared by all terminal tabs of a user."""
+
+import asyncio
+import hashlib
+import hmac
+import secrets
+from typing import Dict, List, Optional, Tuple
+
+import asyncssh
+
+# OpenSSH's default MaxSessions is 10 channels per connection
+DEFAULT_MAX_CHANNELS = 10
+DEFAULT_IDLE_TIMEOUT = 300.0
+
+# (host, username, credential identity)
+PoolKey = Tuple[str, str, str]
+
+
+class PooledConnection:
+    """Authenticated SSH connection with a count of open PTY channels."""
+
+    def __init__(self, key: PoolKey, conn: asyncssh.SSHClientConnection):
+        """Initialize pooled connection.
+
+        Args:
+            key: Pool key (host, username, credential) the connection belongs to
+            conn: Authenticated asyncssh connection
+        """
+        self.key = key
+        self.conn = conn
+        self.channels = 0
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def is_alive(self) -> bool:
+        """Check if the underlying connection is still open."""
+        return not self.conn.is_closed()
+
+
+class SSHConnectionPool:
+    """Reference-counted pool of SSH connections keyed by host, user and credential.
+
+    New tabs open an extra PTY channel on an already-authenticated
+    connection instead of paying for a full key exchange and auth. A tab
+    only shares a connection opened with the same credential, so naming
+    a user is never enough to skip authentication.
+    """
+
+    def __init__(
+        self,
+        max_channels: int = DEFAULT_MAX_CHANNELS,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        connect_options: Optional[dict] = None,
+    ):
+        """Initialize connection pool.
+
+        Args:
+            max_channels: Maximum PTY channels opened on one connection
+            idle_timeout: Seconds an unused connection is kept open
+            connect_options: Extra keyword arguments for asyncssh.connect,
+                overriding the session's (e.g. port)
+        """
+        self.max_channels = max_channels
+        self.idle_timeout = idle_timeout
+        self.connect_options = connect_options or {}
+        self._connections: Dict[PoolKey, List[PooledConnection]] = {}
+        self._locks: Dict[PoolKey, asyncio.Lock] = {}
+        # Keys password digests, so pool keys reveal nothing outside this process
+        self._secret = secrets.token_bytes(32)
+
+    async def acquire(self, connect_kwargs: dict) -> PooledConnection:
+        """Reserve a channel slot on a pooled connection.
+
+        Args:
+            connect_kwargs: Keyword arguments for asyncssh.connect
+
+        Returns:
+            Pooled connection with one channel reserved for the caller
+        """
+        key = self._key(connect_kwargs)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        # Serialize per key so concurrent tabs share one handshake
+        async with lock:
+            pooled = self._find_available(key)
+            if pooled is None:
+                conn = await asyncssh.connect(**{**connect_kwargs, **self.connect_options})
+                pooled = PooledConnection(key, conn)
+                self._connections.setdefault(key, []).append(pooled)
+            self._reserve(pooled)
+            return pooled
+
+    def release(self, pooled: PooledConnection):
+        """Release a channel slot acquired with acquire().
+
+        Args:
+            pooled: Connection returned by acquire()
+        """
+        pooled.channels = max(0, pooled.channels - 1)
+        if pooled.channels > 0:
+            return
+        if not pooled.is_alive:
+            self._discard(pooled)
+            return
+        loop = asyncio.get_running_loop()
+        pooled._idle_handle = loop.call_later(self.idle_timeout, self._close_idle, pooled)
+
+    async def create_process(
+        self, connect_kwargs: dict, **process_kwargs
+    ) -> Tuple[PooledConnection, asyncssh.SSHClientProcess]:
+        """Open a process channel on a pooled connection.
+
+        Retries once on a fresh connection if the pooled one died.
+
+        Args:
+            connect_kwargs: Keyword arguments for asyncssh.connect
+            **process_kwargs: Keyword arguments for create_process
+
+        Returns:
+            Tuple of (pooled connection, started process)
+        """
+        for attempt in range(2):
+            pooled = await self.acquire(connect_kwargs)
+            try:
+                process = await pooled.conn.create_process(**process_kwargs)
+                return pooled, process
+            except (asyncssh.ConnectionLost, asyncssh.DisconnectError, BrokenPipeError):
+                self.release(pooled)
+                self._discard(pooled)
+                if attempt:
+                    raise
+            except Exception:
+                self.release(pooled)
+                raise
+        raise RuntimeError("unreachable")
+
+    async def close(self):
+        """Close all pooled connections."""
+        for conns in list(self._connections.values()):
+            for pooled in list(conns):
+                self._discard(pooled)
+                pooled.conn.close()
+                try:
+                    await pooled.conn.wait_closed()
+                except Exception:
+                    pass
+
+    def _key(self, connect_kwargs: dict) -> PoolKey:
+        """Pool key for connect arguments, identifying the credential used."""
+        password = connect_kwargs.get("password")
+        if password:
+            digest = hmac.new(self._secret, password.encode("utf-8"), hashlib.sha256).hexdigest()
+            credential = f"password:{digest}"
+        elif connect_kwargs.get("client_keys"):
+            credential = "keys:" + ",".join(map(str, connect_kwargs["client_keys"]))
+        else:
+            credential = "agent"
+        return (connect_kwargs["host"], connect_kwargs["username"], credential)
+
+    def _find_available(self, key: PoolKey) -> Optional[PooledConnection]:
+        """Find a live connection with a free channel slot."""
+        for pooled in list(self._connections.get(key, [])):
+            if not pooled.is_alive:
+                self._discard(pooled)
+            elif pooled.channels < self.max_channels:
+                return pooled
+        return None
+
+    def _reserve(self, pooled: PooledConnection):
+        """Reserve a channel slot and cancel any pending idle close."""
+        pooled.channels += 1
+        if pooled._idle_handle:
+            pooled._idle_handle.cancel()
+            pooled._idle_handle = None
+
+    def _close_idle(self, pooled: PooledConnection):
+        """Close a connection that stayed unused for idle_timeout."""
+        pooled._idle_handle = None
+        if pooled.channels == 0:
+            self._discard(pooled)
+            pooled.conn.close()
+
+    def _discard(self, pooled: PooledConnection):
+        """Remove a connection from the pool without closing it."""
+        if pooled._idle_handle:
+            pooled._idle_handle.cancel()
+            pooled._idle_handle = None
+        conns = self._connections.get(pooled.key, [])
+        if pooled in conns:
+            conns.remove(pooled)
+        if not conns:
+            self._connections.pop(pooled.key, None)
@@ -1,28 +1,47 @@
 """SSH session management using asyncssh."""
 
 import asyncio
+import getpass
 import os
-from typing import Callable, Optional
+import shlex
+import time
+from typing import Awaitable, Callable, Optional, Union
 
 import asyncssh
 
+from ssh.backend import DEFAULT_COMMAND, SessionBackend
+from ssh.pool import PooledConnection, SSHConnectionPool
 
-class SSHSession:
+# Shared by sessions that are not given an explicit pool
+default_pool = SSHConnectionPool()
+
+
+class SSHSession(SessionBackend):
     """Manages SSH connection to localhost with PTY support."""
 
-    def __init__(self, on_output: Callable[[str], None], on_close: Optional[Callable[[], None]] = None):
+    def __init__(
+        self,
+        on_output: Callable[[Union[str, bytes]], Union[None, Awaitable[None]]],
+        on_close: Optional[Callable[[], None]] = None,
+        pool: Optional[SSHConnectionPool] = None,
+        binary: bool = False,
+    ):
         """Initialize SSH session.
 
         Args:
-            on_output: Callback function to handle terminal output
+            on_output: Callback function to handle terminal output; if it
+                returns an awaitable, reading waits for it (backpressure)
             on_close: Callback function when session closes
+            pool: Connection pool to open the PTY channel on
+            binary: Pass raw PTY bytes to on_output instead of decoded text
         """
-        self.on_output = on_output
-        self.on_close = on_close
-        self.conn: Optional[asyncssh.SSHClientConnection] = None
+        super().__init__(on_output, on_close, binary)
+        self.pool = pool or default_pool
+        self.conn: Optional[PooledConnection] = None
         self.process: Optional[asyncssh.SSHClientProcess] = None
         self._running = False
         self._output_started = False  # Flag to filter initial output
+        self._reader: Optional[asyncio.Task] = None
 
     async def connect(
         self,
@@ -31,6 +50,7 @@ class SSHSession:
         term_type: str = "xterm-256color",
         cols: int = 120,
         rows: int = 40,
+        command: str = DEFAULT_COMMAND,
     ) -> bool:
         """Connect to localhost via SSH and start a PTY session.
 
@@ -40,12 +60,13 @@ class SSHSession:
             term_type: Terminal type for PTY
             cols: Terminal columns
             rows: Terminal rows
+            command: Program to run in the workspace
 
         Returns:
             True if connection successful
         """
         try:
-            username = os.environ.get("USER", os.getlogin())
+            username = getpass.getuser()
             home = os.path.expanduser("~")
 
             # Resolve workspace path
@@ -72,10 +93,18 @@ class SSHSession:
                 if client_keys:
                     connect_kwargs["client_keys"] = client_keys
 
-            self.conn = await asyncssh.connect(**connect_kwargs)
+            # Run the command as the channel's command instead of typing it
+            # into an interactive shell, so there is no prompt to wait for.
+            # A login shell keeps PATH and profile as in an interactive login;
+            # exec makes the channel close when claude exits.
+            remote_command = 'exec "$SHELL" -l -c {}'.format(
+                shlex.quote(f"cd {shlex.quote(workspace)} && exec {command}")
+            )
 
-            # Start interactive shell with PTY
-            self.process = await self.conn.create_process(
+            # Open PTY channel on a pooled, already-authenticated connection
+            self.conn, self.process = await self.pool.create_process(
+                connect_kwargs,
+                command=remote_command,
                 term_type=term_type,
                 term_size=(cols, rows),
                 encoding=None,  # Binary mode for proper terminal handling
@@ -86,17 +115,12 @@ class SSHSession:
             self._workspace = workspace
 
             # Start reading output
-            asyncio.create_task(self._read_output())
-
-            # Wait for shell to initialize, then cd and run claude
-            # Using exec so that when claude exits, the shell exits too
-            await asyncio.sleep(0.5)
-            await self.send_input(f'cd "{workspace}" && clear && exec claude\n')
+            self._reader = asyncio.create_task(self._read_output())
 
             return True
 
         except Exception as e:
-            self.on_output(f"\r\n[SSH Error] {e}\r\n")
+            await self._emit(f"\r\n[SSH Error] {e}\r\n")
             return False
 
     async def _read_output(self):
@@ -106,19 +130,16 @@ class SSHSession:
                 data = await self.process.stdout.read(4096)
                 if not data:
                     break
-                # Decode output
-                try:
-                    text = data.decode("utf-8", errors="replace")
-                except:
-                    text = str(data)
 
                 # Always output - filtering removed for reliability
-                self.on_output(text)
+                await self._deliver(data)
         except Exception as e:
             if self._running:
-                self.on_output(f"\r\n[Read Error] {e}\r\n")
+                await self._emit(f"\r\n[Read Error] {e}\r\n")
         finally:
             self._running = False
+            # The channel is gone whether the program exited or was closed
+            self._release()
             # Notify session closed
             if self.on_close:
                 self.on_close()
@@ -132,8 +153,9 @@ class SSHSession:
         if self.process and self._running:
             try:
                 self.process.stdin.write(data.encode("utf-8"))
+                self.input_written_at = time.perf_counter()
             except Exception as e:
-                self.on_output(f"\r\n[Write Error] {e}\r\n")
+                await self._emit(f"\r\n[Write Error] {e}\r\n")
 
     async def resize(self, cols: int, rows: int):
         """Resize terminal.
@@ -158,12 +180,21 @@ class SSHSession:
             except Exception:
                 pass
             self.process = None
-        if self.conn:
+        # The reader may be blocked delivering output the client never acked
+        if self._reader:
+            self._reader.cancel()
             try:
-                self.conn.close()
-                await self.conn.wait_closed()
-            except Exception:
+                await self._reader
+            except (asyncio.CancelledError, Exception):
                 pass
+            self._reader = None
+        self._release()
+
+    def _release(self):
+        """Return the channel slot to the pool, once."""
+        if self.conn:
+            # Connection stays pooled for other tabs until idle timeout
+            self.pool.release(self.conn)
             self.conn = None
 
     @property
@@ -0,0 +1,564 @@
+"""Session hosting in worker processes connected over a Unix-domain socket.
+
+The front process (web server and Socket.IO) keeps a WorkerPool. Each
+session it creates is a WorkerSession, a proxy that forwards connect,
+input, resize and disconnect to one worker process and receives raw PTY
+output back. Workers run the real SSH or local PTY sessions, so SSH crypto
+and PTY reads for different sessions are spread over several cores.
+
+Messages are framed as a 9-byte header (payload length, type, session id)
+followed by the payload. Output is credit-based: a worker stops reading a
+session once window bytes are unacknowledged, and the front acknowledges
+each frame after its output callback (the tab's OutputPipeline) accepts
+it. A slow tab therefore pauses only its own session, not the others on
+the same worker.
+
+Run a worker by hand with: python -m ssh.worker --socket PATH --id N
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import signal
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Coroutine, Dict, List, Optional, Set, Tuple, Union
+
+from server.defaults import BACKENDS
+from ssh.backend import SessionBackend, get_backend
+
+DEFAULT_WINDOW = 256 * 1024  # unacknowledged output bytes per session
+RESTART_DELAY = 1.0  # seconds before a crashed worker is restarted
+START_TIMEOUT = 10.0  # seconds for a worker to connect back
+
+HEADER = struct.Struct("!IBI")  # payload length, message type, session id
+SIZE = struct.Struct("!HH")  # cols, rows
+MAX_SIZE = 0xFFFF  # largest cols or rows SIZE can carry
+COUNT = struct.Struct("!I")  # acknowledged bytes
+
+# Front -> worker
+MSG_CONNECT = 1  # JSON: workspace, password, cols, rows
+MSG_INPUT = 2  # UTF-8 input
+MSG_RESIZE = 3  # SIZE
+MSG_DISCONNECT = 4
+MSG_ACK = 5  # COUNT
+# Worker -> front
+MSG_HELLO = 10  # session id field carries the worker id
+MSG_CONNECTED = 11  # JSON: ok
+MSG_OUTPUT = 12  # raw PTY bytes
+MSG_CLOSED = 13
+
+
+async def read_message(reader: asyncio.StreamReader) -> Tuple[int, int, bytes]:
+    """Read one framed message.
+
+    Returns:
+        (message type, session id, payload)
+    """
+    length, kind, session_id = HEADER.unpack(await reader.readexactly(HEADER.size))
+    payload = await reader.readexactly(length) if length else b""
+    return kind, session_id, payload
+
+
+def write_message(writer: asyncio.StreamWriter, kind: int, session_id: int, payload: bytes = b""):
+    """Queue one framed message on a stream."""
+    writer.writelines((HEADER.pack(len(payload), kind, session_id), payload))
+
+
+# --- Front process ---
+
+class WorkerSession(SessionBackend):
+    """Session proxy whose PTY runs in a worker process."""
+
+    def __init__(
+        self,
+        on_output: Callable[[Union[str, bytes]], Union[None, Awaitable[None]]],
+        on_close: Optional[Callable[[], None]] = None,
+        binary: bool = False,
+        pool: Optional["WorkerPool"] = None,
+    ):
+        """Initialize worker session.
+
+        Args:
+            on_output: Callback function to handle terminal output; if it
+                returns an awaitable, acknowledging waits for it (backpressure)
+            on_close: Callback function when session closes
+            binary: Pass raw PTY bytes to on_output instead of decoded text
+            pool: Worker pool hosting the session
+        """
+        super().__init__(on_output, on_close, binary)
+        self.pool = pool
+        self.worker: Optional[_Worker] = None
+        self.session_id = 0
+        self._running = False
+        self._connected: Optional[asyncio.Future] = None
+        self._frames: asyncio.Queue = asyncio.Queue()
+        self._delivery: Optional[asyncio.Task] = None
+        # Call on_close once output is delivered (set when the worker ends it)
+        self._notify_close = False
+
+    async def connect(
+        self,
+        workspace: str,
+        password: Optional[str] = None,
+        cols: int = 120,
+        rows: int = 40,
+        **kwargs,
+    ) -> bool:
+        """Start the session on the least loaded worker.
+
+        Args:
+            workspace: Working directory to start in
+            password: Optional SSH password
+            cols: Terminal columns
+            rows: Terminal rows
+
+        Returns:
+            True if the worker started the session
+        """
+        try:
+            self.worker = await self.pool.assign()
+        except Exception as e:
+            await self._emit(f"\r\n[Worker Error] {e}\r\n")
+            return False
+        self.session_id = self.worker.add(self)
+        self._connected = asyncio.get_running_loop().create_future()
+        self._running = True
+        self._delivery = asyncio.create_task(self._deliver_frames())
+        options = {"workspace": workspace, "password": password, "cols": cols, "rows": rows}
+        self.worker.send(MSG_CONNECT, self.session_id, json.dumps(options).encode("utf-8"))
+        ok = await self._connected
+        if not ok:
+            self._running = False
+            self.worker.remove(self.session_id)
+            self._frames.put_nowait(None)
+        return ok
+
+    async def send_input(self, data: str):
+        """Forward input to the worker.
+
+        Args:
+            data: Input string to send
+        """
+        if self._running:
+            self.worker.send(MSG_INPUT, self.session_id, data.encode("utf-8"))
+            self.input_written_at = time.perf_counter()
+
+    async def resize(self, cols: int, rows: int):
+        """Forward a resize to the worker.
+
+        Args:
+            cols: New column count
+            rows: New row count
+        """
+        if self._running:
+            # Sizes come from the client; clamp so packing cannot fail
+            cols, rows = (max(0, min(int(value), MAX_SIZE)) for value in (cols, rows))
+            self.worker.send(MSG_RESIZE, self.session_id, SIZE.pack(cols, rows))
+
+    async def disconnect(self):
+        """Stop the session in the worker."""
+        if not self._running:
+            return
+        self._running = False
+        self.worker.send(MSG_DISCONNECT, self.session_id)
+        self.worker.remove(self.session_id)
+        self._frames.put_nowait(None)
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if the session is active."""
+        return self._running
+
+    def _on_message(self, kind: int, payload: bytes):
+        """Handle a message from the worker (front reader task)."""
+        if kind == MSG_OUTPUT:
+            self._frames.put_nowait(payload)
+        elif kind == MSG_CONNECTED:
+            if self._connected and not self._connected.done():
+                self._connected.set_result(bool(json.loads(payload).get("ok")))
+        elif kind == MSG_CLOSED:
+            self._closed()
+
+    def _closed(self):
+        """The worker ended the session or exited."""
+        if self._connected and not self._connected.done():
+            # connect() reports the failure
+            self._connected.set_result(False)
+            return
+        if self._running:
+            self._running = False
+            # on_close runs after queued output has been delivered
+            self._notify_close = True
+            self._frames.put_nowait(None)
+
+    async def _deliver_frames(self):
+        """Deliver output in order and acknowledge it to the worker."""
+        while True:
+            data = await self._frames.get()
+            if data is None:
+                break
+            await self._deliver(data)
+            if self._running:
+                self.worker.send(MSG_ACK, self.session_id, COUNT.pack(len(data)))
+        self.worker.remove(self.session_id)
+        if self._notify_close and self.on_close:
+            self.on_close()
+
+
+class _Worker:
+    """Front-side state of one worker process."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.ready: Optional[asyncio.Future] = None
+        self.sessions: Dict[int, WorkerSession] = {}
+        self.restarts = 0
+        self._next_id = 0
+
+    def add(self, session: WorkerSession) -> int:
+        """Register a session and return its id on this worker."""
+        self._next_id += 1
+        self.sessions[self._next_id] = session
+        return self._next_id
+
+    def remove(self, session_id: int):
+        """Forget a session."""
+        self.sessions.pop(session_id, None)
+
+    def send(self, kind: int, session_id: int, payload: bytes = b""):
+        """Send a message if the worker is connected."""
+        if self.writer and not self.writer.is_closing():
+            write_message(self.writer, kind, session_id, payload)
+
+    def drop_sessions(self):
+        """Close every session after the worker went away."""
+        sessions, self.sessions = self.sessions, {}
+        for session in sessions.values():
+            session._closed()
+
+
+class WorkerPool:
+    """Worker processes hosting sessions for the front process.
+
+    Workers are started on first use. Each session goes to the worker with
+    the fewest sessions. A worker that exits is restarted after a short
+    delay; its sessions are closed, as if their processes had exited.
+    """
+
+    def __init__(self, workers: int, backend: str = "ssh", window: int = DEFAULT_WINDOW, loop: str = "asyncio"):
+        """Initialize worker pool.
+
+        Args:
+            workers: Number of worker processes
+            backend: Session backend run by the workers, "ssh" or "local"
+            window: Unacknowledged output bytes per session
+            loop: Event loop the workers run, "asyncio" or "uvloop"
+        """
+        self.size = workers
+        self.backend = backend
+        self.window = window
+        self.loop = loop
+        self.workers = [_Worker(index) for index in range(workers)]
+        self._socket_dir: Optional[str] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._started: Optional[asyncio.Task] = None
+        self._tasks: List[asyncio.Task] = []
+        self._closing = False
+
+    def create_session(self, on_output, on_close, binary: bool) -> WorkerSession:
+        """Create a session hosted by a worker.
+
+        Args:
+            on_output: Output callback
+            on_close: Close callback
+            binary: Pass raw PTY bytes to on_output
+        """
+        return WorkerSession(on_output=on_output, on_close=on_close, binary=binary, pool=self)
+
+    async def assign(self) -> _Worker:
+        """Start the pool if needed and pick the least loaded ready worker."""
+        if self._started is None:
+            self._started = asyncio.create_task(self._start())
+        await self._started
+        ready = [w for w in self.workers if w.ready and w.ready.done() and w.writer]
+        if not ready:
+            # Every worker is restarting; wait for the first one back
+            pending = [w.ready for w in self.workers if w.ready]
+            await asyncio.wait_for(
+                asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED), START_TIMEOUT
+            )
+            ready = [w for w in self.workers if w.ready and w.ready.done() and w.writer]
+            if not ready:
+                raise RuntimeError("no worker available")
+        return min(ready, key=lambda w: len(w.sessions))
+
+    def stats(self) -> List[dict]:
+        """Return per-worker session counts and restarts."""
+        return [
+            {
+                "worker": w.index,
+                "pid": w.process.pid if w.process else None,
+                "sessions": len(w.sessions),
+                "restarts": w.restarts,
+            }
+            for w in self.workers
+        ]
+
+    def terminate(self):
+        """Stop all workers without waiting (e.g. from a signal handler).
+
+        Also removes the directory holding the Unix socket.
+        """
+        self._closing = True
+        for worker in self.workers:
+            if worker.process and worker.process.returncode is None:
+                worker.process.terminate()
+        if self._socket_dir:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+            self._socket_dir = None
+
+    async def _start(self):
+        """Listen for workers and start all of them."""
+        self._socket_dir = tempfile.mkdtemp(prefix="claude-web-workers-")
+        path = os.path.join(self._socket_dir, "front.sock")
+        self._server = await asyncio.start_unix_server(self._on_worker, path=path)
+        os.chmod(path, 0o600)
+        for worker in self.workers:
+            self._tasks.append(asyncio.create_task(self._supervise(worker, path)))
+        await asyncio.gather(*(w.ready for w in self.workers if w.ready), return_exceptions=True)
+        print(f"[Workers] {self.size} workers started ({self.backend} backend)")
+
+    async def _supervise(self, worker: _Worker, path: str):
+        """Run a worker process and restart it whenever it exits."""
+        while not self._closing:
+            worker.ready = asyncio.get_running_loop().create_future()
+            worker.process = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "ssh.worker",
+                "--socket", path, "--id", str(worker.index), "--backend", self.backend,
+                "--window", str(self.window), "--loop", self.loop,
+                cwd=str(Path(__file__).parent.parent),
+            )
+            try:
+                await asyncio.wait_for(asyncio.shield(worker.ready), START_TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f"[Workers] Worker {worker.index} did not connect; restarting")
+                worker.process.kill()
+            code = await worker.process.wait()
+            worker.writer = None
+            worker.drop_sessions()
+            if self._closing:
+                break
+            worker.restarts += 1
+            print(f"[Workers] Worker {worker.index} exited with code {code}; restarting")
+            await asyncio.sleep(RESTART_DELAY)
+
+    async def _on_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Identify a connecting worker and relay its messages to sessions."""
+        try:
+            kind, index, _ = await read_message(reader)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        if kind != MSG_HELLO or not 0 <= index < len(self.workers):
+            writer.close()
+            return
+        worker = self.workers[index]
+        worker.writer = writer
+        if worker.ready and not worker.ready.done():
+            worker.ready.set_result(True)
+        try:
+            while True:
+                kind, session_id, payload = await read_message(reader)
+                session = worker.sessions.get(session_id)
+                if session:
+                    session._on_message(kind, payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if worker.writer is writer:
+                worker.writer = None
+                worker.drop_sessions()
+            writer.close()
+
+
+# --- Worker process ---
+
+class _HostedSession:
+    """Worker-side state of one session."""
+
+    def __init__(self):
+        self.session: Optional[SessionBackend] = None
+        self.unacked = 0
+        self.resume = asyncio.Event()
+        self.resume.set()
+        # Input is written by its own task, so a full PTY never blocks the read loop
+        self.input: asyncio.Queue = asyncio.Queue()
+        self.input_task: Optional[asyncio.Task] = None
+
+    def stop_input(self):
+        """Drop pending input and stop the input task."""
+        if self.input_task:
+            self.input_task.cancel()
+            self.input_task = None
+
+
+class WorkerServer:
+    """Runs sessions in a worker process for one front connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, backend: str, window: int):
+        """Initialize worker server.
+
+        Args:
+            reader: Stream from the front process
+            writer: Stream to the front process
+            backend: Session backend to run, "ssh" or "local"
+            window: Unacknowledged output bytes per session
+        """
+        self.reader = reader
+        self.writer = writer
+        self.backend = backend
+        self.session_class = get_backend(backend)
+        self.window = window
+        self.sessions: Dict[int, _HostedSession] = {}
+        # Strong references to background tasks until they finish
+        self._tasks: Set[asyncio.Task] = set()
+        self.pool = None
+        if backend == "ssh":
+            from ssh.pool import SSHConnectionPool
+
+            self.pool = SSHConnectionPool()
+
+    async def run(self):
+        """Handle messages until the front process goes away."""
+        try:
+            while True:
+                kind, session_id, payload = await read_message(self.reader)
+                if kind == MSG_CONNECT:
+                    self._spawn(self._connect(session_id, json.loads(payload)))
+                    continue
+                hosted = self.sessions.get(session_id)
+                if hosted is None or hosted.session is None:
+                    continue
+                if kind == MSG_INPUT:
+                    hosted.input.put_nowait(payload.decode("utf-8", errors="replace"))
+                elif kind == MSG_RESIZE:
+                    await hosted.session.resize(*SIZE.unpack(payload))
+                elif kind == MSG_ACK:
+                    hosted.unacked -= COUNT.unpack(payload)[0]
+                    if hosted.unacked <= self.window:
+                        hosted.resume.set()
+                elif kind == MSG_DISCONNECT:
+                    self.sessions.pop(session_id, None)
+                    hosted.session.on_close = None
+                    hosted.resume.set()
+                    hosted.stop_input()
+                    self._spawn(hosted.session.disconnect())
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            # Front process is gone; nobody can use these sessions any more
+            for hosted in list(self.sessions.values()):
+                hosted.stop_input()
+                if hosted.session:
+                    hosted.session.on_close = None
+                    await hosted.session.disconnect()
+
+    def _spawn(self, coro: Coroutine):
+        """Run a coroutine in a task that is kept referenced until done.
+
+        Args:
+            coro: Coroutine to run
+        """
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _connect(self, session_id: int, options: dict):
+        """Start a session and report the result."""
+        hosted = self.sessions[session_id] = _HostedSession()
+
+        async def on_output(data: bytes):
+            write_message(self.writer, MSG_OUTPUT, session_id, data)
+            hosted.unacked += len(data)
+            if hosted.unacked > self.window:
+                hosted.resume.clear()
+                await hosted.resume.wait()
+            await self.writer.drain()
+
+        def on_close():
+            hosted.stop_input()
+            if self.sessions.pop(session_id, None) is not None:
+                write_message(self.writer, MSG_CLOSED, session_id)
+
+        kwargs = {"on_output": on_output, "on_close": on_close, "binary": True}
+        if self.pool:
+            kwargs["pool"] = self.pool
+        hosted.session = self.session_class(**kwargs)
+        hosted.input_task = asyncio.create_task(self._write_input(hosted))
+        ok = await hosted.session.connect(
+            workspace=options["workspace"],
+            password=options.get("password"),
+            cols=options.get("cols", 120),
+            rows=options.get("rows", 40),
+        )
+        if not ok:
+            hosted.stop_input()
+            self.sessions.pop(session_id, None)
+        write_message(self.writer, MSG_CONNECTED, session_id, json.dumps({"ok": ok}).encode("utf-8"))
+
+
+    @staticmethod
+    async def _write_input(hosted: _HostedSession):
+        """Write a session's input in order until the session stops.
+
+        send_input can wait for the PTY to drain, which needs output acks
+        that only the read loop receives, so it must not run there.
+        """
+        while True:
+            data = await hosted.input.get()
+            await hosted.session.send_input(data)
+
+
+async def serve(socket_path: str, worker_id: int, backend: str, window: int):
+    """Connect to the front process and host sessions until it disconnects.
+
+    Args:
+        socket_path: Unix socket the front process listens on
+        worker_id: Index of this worker in the pool
+        backend: Session backend to run
+        window: Unacknowledged output bytes per session
+    """
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    write_message(writer, MSG_HELLO, worker_id)
+    await writer.drain()
+    await WorkerServer(reader, writer, backend, window).run()
+
+
+def main():
+    """Worker process entry point."""
+    parser = argparse.ArgumentParser(description="Claude Web Terminal session worker")
+    parser.add_argument("--socket", required=True, help="Unix socket of the front process")
+    parser.add_argument("--id", type=int, required=True, help="Worker index")
+    parser.add_argument("--backend", choices=BACKENDS, default="ssh")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW)
+    parser.add_argument("--loop", choices=("asyncio", "uvloop"), default="asyncio")
+    args = parser.parse_args()
+    if args.loop == "uvloop":
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    # Ctrl+C reaches the whole process group; workers exit when the front does
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(serve(args.socket, args.id, args.backend, args.window))
+
+
+if __name__ == "__main__":
+    main()
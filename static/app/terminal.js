@@ -0,0 +1,1336 @@
+(function() {
+    const CT = window.claudeTerminal = window.CT = {
+        config: Object.assign({ socketUrl: '', renderers: {} }, window.CT_CONFIG),
+        socket: null,
+        tabs: {},
+        panes: {},
+        activeTab: null,
+        focusedPaneId: null,
+        idCounter: 0,
+        dragData: null,
+        focusMode: false,
+        workspaces: [],
+        filteredWorkspaces: [],
+        selectedWorkspaceIndex: -1,
+        hintTimer: null,
+        searchTimer: null,
+        searchSeq: 0,
+        searchFallback: false,
+        WORKSPACE_ROW_HEIGHT: 42,
+        lastHint: null,
+        latency: { enabled: false, seq: 0, pending: {}, samples: {}, rtt: null, timer: null },
+        LATENCY_WINDOW: 200,
+        manuallyResized: new Set(),
+        settings: { renderer: 'dom', batchOutput: true, perfOverlay: false },
+        outputDirty: new Set(),
+        outputFrame: null,
+        scripts: {},
+        perf: { frame: null, timer: null, observer: null, frames: 0, writes: 0, bytes: 0, longTasks: 0, maxGap: 0, last: 0, since: 0 },
+
+        init: function() {
+            // Issued by the server and kept per browser tab across reloads, so running sessions can be reattached
+            const clientId = sessionStorage.getItem('ct-client-id');
+            this.loadSettings();
+            this.socket = io(this.config.socketUrl, { transports: ['websocket', 'polling'], auth: { client_id: clientId } });
+            this.setupSocketEvents();
+            this.setupKeyboardShortcuts();
+            if (new URLSearchParams(location.search).has('latency') || localStorage.getItem('ct-latency') === '1') {
+                this.setLatencyProbes(true);
+            }
+            this.setupBellSound();
+            this.loadWorkspaces();
+            window.addEventListener('resize', () => this.fitAll());
+            // Initial fit after DOM is ready
+            setTimeout(() => this.fitAll(), 100);
+            setTimeout(() => this.fitAll(), 500);
+        },
+
+        setupBellSound: function() {
+            // Create audio context for bell sound
+            this.bellEnabled = true;
+            this.audioContext = null;
+
+            // Initialize audio context on first user interaction
+            const initAudio = () => {
+                if (!this.audioContext) {
+                    this.audioContext = new (window.AudioContext || window.webkitAudioContext)();
+                }
+                document.removeEventListener('click', initAudio);
+                document.removeEventListener('keydown', initAudio);
+            };
+            document.addEventListener('click', initAudio);
+            document.addEventListener('keydown', initAudio);
+        },
+
+        playBell: function() {
+            if (!this.bellEnabled || !this.audioContext) return;
+
+            try {
+                const oscillator = this.audioContext.createOscillator();
+                const gainNode = this.audioContext.createGain();
+
+                oscillator.connect(gainNode);
+                gainNode.connect(this.audioContext.destination);
+
+                oscillator.frequency.value = 800;
+                oscillator.type = 'sine';
+
+                gainNode.gain.setValueAtTime(0.3, this.audioContext.currentTime);
+                gainNode.gain.exponentialRampToValueAtTime(0.01, this.audioContext.currentTime + 0.1);
+
+                oscillator.start(this.audioContext.currentTime);
+                oscillator.stop(this.audioContext.currentTime + 0.1);
+            } catch (e) {
+                console.log('Bell sound error:', e);
+            }
+        },
+
+        loadWorkspaces: function() {
+            // Results come from the server-side search; the full list is
+            // only fetched if the search API is unavailable
+            this.renderWorkspaceSelect();
+        },
+
+        renderWorkspaceSelect: function() {
+            // Initial render of dropdown
+            this.filterWorkspaces('');
+        },
+
+        showWorkspaceDropdown: function() {
+            const dropdown = document.getElementById('workspace-dropdown');
+            dropdown.classList.add('show');
+            this.selectedWorkspaceIndex = -1;
+            this.lastHint = null;
+            this.filterWorkspaces(document.getElementById('workspace-input').value);
+
+            // Close on outside click
+            const closeHandler = (e) => {
+                if (!e.target.closest('.workspace-select')) {
+                    dropdown.classList.remove('show');
+                    document.removeEventListener('click', closeHandler);
+                }
+            };
+            setTimeout(() => document.addEventListener('click', closeHandler), 0);
+        },
+
+        filterWorkspaces: function(query) {
+            // Debounce keystrokes; the server ranks and returns the top matches
+            clearTimeout(this.searchTimer);
+            this.searchTimer = setTimeout(() => this.searchWorkspaces(query), query ? 60 : 0);
+        },
+
+        searchWorkspaces: function(query) {
+            const seq = ++this.searchSeq;
+            if (this.searchFallback) {
+                this.showWorkspaceResults(this.localFilter(query));
+                return;
+            }
+            const limit = query ? 100 : 500;
+            fetch('/api/workspaces/search?q=' + encodeURIComponent(query) + '&limit=' + limit)
+                .then(r => {
+                    if (!r.ok) throw new Error('search failed: ' + r.status);
+                    return r.json();
+                })
+                .then(data => {
+                    // Drop responses to superseded queries
+                    if (seq === this.searchSeq) this.showWorkspaceResults(data.results);
+                })
+                .catch(() => {
+                    // No search API: fetch the full list once and filter locally
+                    this.searchFallback = true;
+                    fetch('/api/workspaces').then(r => r.json()).then(data => {
+                        this.workspaces = data;
+                        if (seq === this.searchSeq) this.showWorkspaceResults(this.localFilter(query));
+                    }).catch(() => {});
+                });
+        },
+
+        localFilter: function(query) {
+            const q = query.toLowerCase().trim();
+            return this.workspaces.filter(ws =>
+                ws.name.toLowerCase().includes(q) ||
+                ws.path.toLowerCase().includes(q)
+            );
+        },
+
+        showWorkspaceResults: function(results) {
+            const dropdown = document.getElementById('workspace-dropdown');
+            this.filteredWorkspaces = results;
+            this.selectedWorkspaceIndex = results.length > 0 ? 0 : -1;
+            dropdown.innerHTML = '<div class="workspace-rows"></div>';
+            dropdown.firstChild.style.height = (results.length * this.WORKSPACE_ROW_HEIGHT) + 'px';
+            dropdown.scrollTop = 0;
+            dropdown.onscroll = () => this.renderWorkspaceRows();
+            this.updateWorkspaceSelection();
+        },
+
+        renderWorkspaceRows: function() {
+            // Only rows in view (plus a margin) are in the DOM
+            const dropdown = document.getElementById('workspace-dropdown');
+            const rows = dropdown.firstChild;
+            if (!rows) return;
+            const h = this.WORKSPACE_ROW_HEIGHT;
+            const first = Math.max(0, Math.floor(dropdown.scrollTop / h) - 5);
+            const last = Math.min(
+                this.filteredWorkspaces.length,
+                Math.ceil((dropdown.scrollTop + (dropdown.clientHeight || 300)) / h) + 5
+            );
+            if (rows.dataset.range === first + ':' + last) return;
+            rows.dataset.range = first + ':' + last;
+            rows.innerHTML = this.filteredWorkspaces.slice(first, last).map((ws, i) => {
+                const idx = first + i;
+                const path = ws.path.replace(/'/g, "\'");
+                const selected = idx === this.selectedWorkspaceIndex ? ' selected' : '';
+                return `
+                    <div class="workspace-item${selected}" style="top: ${idx * h}px" data-index="${idx}"
+                         onmouseenter="CT.hintWorkspace('${path}')"
+                         onclick="CT.selectWorkspace('${path}')">
+                        ${ws.name}${ws.is_git ? '<span class="git-badge">git</span>' : ''}
+                    </div>`;
+            }).join('');
+        },
+
+        handleWorkspaceKeydown: function(e) {
+            const dropdown = document.getElementById('workspace-dropdown');
+            if (!dropdown.classList.contains('show')) {
+                if (e.key === 'ArrowDown' || e.key === 'Enter') {
+                    this.showWorkspaceDropdown();
+                    e.preventDefault();
+                }
+                return;
+            }
+
+            if (e.key === 'ArrowDown') {
+                e.preventDefault();
+                if (this.selectedWorkspaceIndex < this.filteredWorkspaces.length - 1) {
+                    this.selectedWorkspaceIndex++;
+                    this.updateWorkspaceSelection();
+                }
+            } else if (e.key === 'ArrowUp') {
+                e.preventDefault();
+                if (this.selectedWorkspaceIndex > 0) {
+                    this.selectedWorkspaceIndex--;
+                    this.updateWorkspaceSelection();
+                }
+            } else if (e.key === 'Enter') {
+                e.preventDefault();
+                if (this.selectedWorkspaceIndex >= 0 && this.filteredWorkspaces[this.selectedWorkspaceIndex]) {
+                    this.selectWorkspace(this.filteredWorkspaces[this.selectedWorkspaceIndex].path);
+                }
+            } else if (e.key === 'Escape') {
+                dropdown.classList.remove('show');
+            }
+        },
+
+        updateWorkspaceSelection: function() {
+            const dropdown = document.getElementById('workspace-dropdown');
+            const idx = this.selectedWorkspaceIndex;
+            const h = this.WORKSPACE_ROW_HEIGHT;
+            // Scroll into view; rows are positioned, so compute from the index
+            if (idx >= 0) {
+                if (idx * h < dropdown.scrollTop) {
+                    dropdown.scrollTop = idx * h;
+                } else if ((idx + 1) * h > dropdown.scrollTop + dropdown.clientHeight) {
+                    dropdown.scrollTop = (idx + 1) * h - dropdown.clientHeight;
+                }
+            }
+            this.renderWorkspaceRows();
+            dropdown.querySelectorAll('.workspace-item').forEach(item => {
+                item.classList.toggle('selected', Number(item.dataset.index) === idx);
+            });
+            const ws = this.filteredWorkspaces[this.selectedWorkspaceIndex];
+            if (ws && document.getElementById('workspace-dropdown').classList.contains('show')) {
+                this.hintWorkspace(ws.path);
+            }
+        },
+
+        hintWorkspace: function(path) {
+            // Let the server start warming a session before the click
+            clearTimeout(this.hintTimer);
+            if (path === this.lastHint) return;
+            this.hintTimer = setTimeout(() => {
+                this.lastHint = path;
+                this.socket.emit('warm_hint', { workspace: path });
+            }, 150);
+        },
+
+        selectWorkspace: function(path) {
+            const dropdown = document.getElementById('workspace-dropdown');
+            const input = document.getElementById('workspace-input');
+            dropdown.classList.remove('show');
+            input.value = '';
+            input.blur();
+            this.createSession(path);
+        },
+
+        toggleSidebar: function() {
+            const sidebar = document.getElementById('sidebar');
+            const btn = sidebar.querySelector('.toggle-btn:not(.settings-btn)');
+            sidebar.classList.toggle('collapsed');
+            btn.textContent = sidebar.classList.contains('collapsed') ? '▶' : '◀';
+            setTimeout(() => this.fitAll(), 250);
+        },
+
+        setupSocketEvents: function() {
+            this.socket.on('connect', () => {
+                console.log('Socket connected');
+                // Sessions survive reloads and reconnects; ask which are still running
+                this.socket.emit('list_sessions');
+            });
+
+            this.socket.on('disconnect', () => {
+                Object.values(this.tabs).forEach(tab => tab.connected = false);
+            });
+
+            this.socket.on('session_list', (data) => {
+                if (data.client_id) {
+                    // Unknown ids are replaced on connect; present the current one next time
+                    sessionStorage.setItem('ct-client-id', data.client_id);
+                    this.socket.auth.client_id = data.client_id;
+                }
+                const running = new Set(data.sessions.map(s => s.tab_id));
+                // Tabs whose session ended while we were away
+                Object.entries(this.tabs).forEach(([tabId, tab]) => {
+                    if (tab.ready && !running.has(tabId)) this.closeTab(tabId);
+                });
+                data.sessions.forEach(s => {
+                    if (this.tabs[s.tab_id]) {
+                        if (!this.tabs[s.tab_id].connected) this.attachSession(s.tab_id);
+                    } else {
+                        this.restoreSession(s.tab_id, s.workspace);
+                    }
+                });
+            });
+
+            this.socket.on('session_started', (data) => this.onSessionReady(data.tab_id));
+
+            this.socket.on('session_attached', (data) => {
+                const tab = this.tabs[data.tab_id];
+                if (!tab) return;
+                // Scrollback replay follows; show it verbatim on a clean screen
+                this.flushTab(data.tab_id);
+                tab.term.reset();
+                tab.started = true;
+                tab.buffer = '';
+                this.onSessionReady(data.tab_id);
+            });
+
+            this.socket.on('session_detached', (data) => {
+                // Another browser tab took over this session; keep it running
+                const tab = this.tabs[data.tab_id];
+                if (tab) {
+                    tab.connected = false;
+                    this.closeTab(data.tab_id);
+                }
+            });
+
+            this.socket.on('terminal_output', (data) => {
+                const tab = this.tabs[data.tab_id];
+                if (!tab) return;
+                if (data.probe) this.closeProbe(data.tab_id, data.probe);
+                // Binary frames arrive as ArrayBuffer and go to xterm as raw bytes
+                const output = data.data instanceof ArrayBuffer ? new Uint8Array(data.data) : data.data;
+                if (!tab.started) {
+                    // Decode only while looking for the Claude banner
+                    tab.buffer += typeof output === 'string' ? output : tab.decoder.decode(output, { stream: true });
+                    // Buffered output is consumed here, so acknowledge it now
+                    this.ackOutput(data.tab_id, output.length);
+                    if (tab.buffer.includes('Claude Code') || tab.buffer.includes('claude>')) {
+                        tab.started = true;
+                        tab.term.clear();
+                        const idx = tab.buffer.indexOf('Claude Code');
+                        tab.term.write(idx >= 0 ? tab.buffer.substring(idx) : tab.buffer);
+                        tab.buffer = '';
+                    }
+                } else if (this.settings.batchOutput) {
+                    this.queueOutput(data.tab_id, output);
+                } else {
+                    this.writeOutput(data.tab_id, output);
+                }
+            });
+
+            this.socket.on('terminal_error', (data) => {
+                const tab = this.tabs[data.tab_id];
+                if (!tab) return;
+                this.flushTab(data.tab_id);
+                tab.term.write('\r\n[Error] ' + data.message + '\r\n');
+            });
+
+            this.socket.on('session_closed', (data) => {
+                const tab = this.tabs[data.tab_id];
+                // Only close if tab exists and not already closing
+                if (tab && !tab.closing) {
+                    this.closeTab(data.tab_id);
+                }
+            });
+        },
+
+        onSessionReady: function(tabId) {
+            const tab = this.tabs[tabId];
+            if (!tab) return;
+            tab.connected = true;
+            tab.ready = true;
+            tab.term.focus();
+
+            // Multiple resize attempts to ensure correct dimensions
+            const doResize = () => {
+                if (!this.tabs[tabId]) return;
+                tab.fitAddon.fit();
+                this.socket.emit('terminal_resize', {
+                    tab_id: tabId,
+                    cols: tab.term.cols,
+                    rows: tab.term.rows
+                });
+            };
+
+            doResize();
+            setTimeout(doResize, 100);
+            setTimeout(doResize, 300);
+            setTimeout(doResize, 500);
+        },
+
+        attachSession: function(tabId) {
+            const tab = this.tabs[tabId];
+            if (!tab) return;
+            tab.ackPending = 0;
+            this.socket.emit('attach_session', { tab_id: tabId, flow_control: true });
+        },
+
+        restoreSession: function(tabId, workspace) {
+            document.getElementById('empty-state')?.remove();
+            if (Object.keys(this.panes).length === 0) {
+                const main = document.getElementById('terminal-main');
+                this.createPane(main, 'root');
+                this.focusedPaneId = 'root';
+            }
+            const paneId = this.focusedPaneId || Object.keys(this.panes)[0];
+            this.createTab(workspace, paneId, tabId);
+        },
+
+        queueOutput: function(tabId, output) {
+            // Frames arriving within one animation frame become one write per tab
+            this.tabs[tabId].outputQueue.push(output);
+            this.outputDirty.add(tabId);
+            if (!this.outputFrame) this.outputFrame = requestAnimationFrame(() => this.flushOutput());
+        },
+
+        flushOutput: function() {
+            this.outputFrame = null;
+            this.outputDirty.forEach(tabId => this.flushTab(tabId));
+            this.outputDirty.clear();
+        },
+
+        flushTab: function(tabId) {
+            const tab = this.tabs[tabId];
+            if (!tab || !tab.outputQueue.length) return;
+            // Merge runs of text and of raw bytes; a session normally sends only one kind
+            const runs = [];
+            tab.outputQueue.forEach(chunk => {
+                const run = runs[runs.length - 1];
+                if (run && typeof run[0] === typeof chunk) run.push(chunk);
+                else runs.push([chunk]);
+            });
+            tab.outputQueue = [];
+            runs.forEach(run => this.writeOutput(tabId, typeof run[0] === 'string' ? run.join('') : this.concatBytes(run)));
+        },
+
+        concatBytes: function(chunks) {
+            if (chunks.length === 1) return chunks[0];
+            const joined = new Uint8Array(chunks.reduce((size, chunk) => size + chunk.length, 0));
+            let offset = 0;
+            chunks.forEach(chunk => {
+                joined.set(chunk, offset);
+                offset += chunk.length;
+            });
+            return joined;
+        },
+
+        writeOutput: function(tabId, output) {
+            this.perf.writes++;
+            this.perf.bytes += output.length;
+            // Acknowledge once xterm has parsed the frame (server flow control)
+            this.tabs[tabId].term.write(output, () => this.ackOutput(tabId, output.length));
+        },
+
+        ackOutput: function(tabId, size) {
+            const tab = this.tabs[tabId];
+            if (!tab) return;
+            // Batch acks: send after 32 KB or 50 ms, well below the low watermark
+            tab.ackPending += size;
+            const flush = () => {
+                clearTimeout(tab.ackTimer);
+                tab.ackTimer = null;
+                if (tab.ackPending > 0 && this.tabs[tabId]) {
+                    this.socket.emit('terminal_ack', { tab_id: tabId, bytes: tab.ackPending });
+                    tab.ackPending = 0;
+                }
+            };
+            if (tab.ackPending >= 32768) flush();
+            else if (!tab.ackTimer) tab.ackTimer = setTimeout(flush, 50);
+        },
+
+        setupKeyboardShortcuts: function() {
+            document.addEventListener('keydown', (e) => {
+                const mod = navigator.platform.includes('Mac') ? e.metaKey : e.ctrlKey;
+                if (!mod) return;
+
+                if (e.key === 'd' && !e.shiftKey && !e.altKey) {
+                    e.preventDefault();
+                    this.splitCurrentPane('vertical');
+                } else if (e.key === 'D' || (e.key === 'd' && e.shiftKey)) {
+                    e.preventDefault();
+                    this.splitCurrentPane('horizontal');
+                } else if (e.key === 'w' && !e.shiftKey) {
+                    e.preventDefault();
+                    if (this.activeTab) this.closeTab(this.activeTab);
+                } else if (e.altKey && ['ArrowLeft','ArrowRight','ArrowUp','ArrowDown'].includes(e.key)) {
+                    e.preventDefault();
+                    this.navigatePane(e.key.replace('Arrow','').toLowerCase());
+                }
+            });
+        },
+
+        createSession: function(workspace) {
+            document.getElementById('empty-state')?.remove();
+
+            // Create pane if none exists
+            if (Object.keys(this.panes).length === 0) {
+                const main = document.getElementById('terminal-main');
+                this.createPane(main, 'root');
+                this.focusedPaneId = 'root';
+            }
+
+            const paneId = this.focusedPaneId || Object.keys(this.panes)[0];
+            this.createTab(workspace, paneId);
+        },
+
+        createPane: function(container, id) {
+            const paneId = id || 'pane_' + (++this.idCounter);
+
+            const pane = document.createElement('div');
+            pane.className = 'terminal-pane';
+            pane.id = paneId;
+
+            const header = document.createElement('div');
+            header.className = 'pane-header';
+
+            const content = document.createElement('div');
+            content.className = 'pane-content';
+
+            // Click on content to focus pane
+            content.addEventListener('mousedown', () => this.focusPane(paneId));
+
+            const dropIndicator = document.createElement('div');
+            dropIndicator.className = 'drop-indicator';
+            content.appendChild(dropIndicator);
+
+            pane.appendChild(header);
+            pane.appendChild(content);
+            container.appendChild(pane);
+
+            this.setupPaneDragDrop(pane, content, dropIndicator);
+
+            this.panes[paneId] = {
+                element: pane,
+                header: header,
+                content: content,
+                tabIds: [],
+                dropIndicator: dropIndicator
+            };
+
+            return paneId;
+        },
+
+        focusPane: function(paneId) {
+            const pane = this.panes[paneId];
+            if (!pane) return;
+
+            // Update visual focus
+            Object.values(this.panes).forEach(p => p.element.classList.remove('focused'));
+            pane.element.classList.add('focused');
+
+            this.focusedPaneId = paneId;
+
+            // Switch to active tab in this pane if any
+            if (pane.tabIds.length > 0) {
+                const currentActiveInPane = pane.tabIds.find(tid => {
+                    const tabEl = document.getElementById('tab-btn-' + tid);
+                    return tabEl && tabEl.classList.contains('active');
+                });
+                const tabToFocus = currentActiveInPane || pane.tabIds[0];
+                this.switchTab(tabToFocus);
+            }
+        },
+
+        setupPaneDragDrop: function(pane, content, indicator) {
+            content.addEventListener('dragover', (e) => {
+                if (!this.dragData) return;
+                e.preventDefault();
+                const rect = content.getBoundingClientRect();
+                const x = (e.clientX - rect.left) / rect.width;
+                const y = (e.clientY - rect.top) / rect.height;
+                let zone = 'center';
+                if (x < 0.25) zone = 'left';
+                else if (x > 0.75) zone = 'right';
+                else if (y < 0.25) zone = 'top';
+                else if (y > 0.75) zone = 'bottom';
+
+                const styles = {
+                    left: 'left:0;top:0;width:50%;height:100%',
+                    right: 'right:0;top:0;width:50%;height:100%',
+                    top: 'left:0;top:0;width:100%;height:50%',
+                    bottom: 'left:0;bottom:0;width:100%;height:50%',
+                    center: 'left:10%;top:10%;width:80%;height:80%'
+                };
+                indicator.style.cssText = 'display:block;' + styles[zone];
+                this.dragData.dropZone = zone;
+                this.dragData.targetPane = pane.id;
+            });
+
+            content.addEventListener('dragleave', (e) => {
+                if (!content.contains(e.relatedTarget)) indicator.style.display = 'none';
+            });
+
+            content.addEventListener('drop', (e) => {
+                e.preventDefault();
+                indicator.style.display = 'none';
+                if (!this.dragData) return;
+                const { tabId, dropZone, targetPane } = this.dragData;
+                this.handleTabDrop(tabId, targetPane, dropZone);
+                this.dragData = null;
+            });
+        },
+
+        handleTabDrop: function(tabId, targetPaneId, zone) {
+            const tab = this.tabs[tabId];
+            if (!tab) return;
+            if (zone === 'center') {
+                if (tab.paneId !== targetPaneId) this.moveTabToPane(tabId, targetPaneId);
+            } else {
+                const direction = (zone === 'left' || zone === 'right') ? 'vertical' : 'horizontal';
+                const newPaneId = this.splitPaneAt(targetPaneId, direction, zone === 'right' || zone === 'bottom');
+                this.moveTabToPane(tabId, newPaneId);
+            }
+        },
+
+        moveTabToPane: function(tabId, newPaneId) {
+            const tab = this.tabs[tabId];
+            if (!tab || tab.paneId === newPaneId) return;
+
+            const oldPane = this.panes[tab.paneId];
+            const newPane = this.panes[newPaneId];
+
+            oldPane.tabIds = oldPane.tabIds.filter(id => id !== tabId);
+
+            const tabBtn = document.getElementById('tab-btn-' + tabId);
+            newPane.header.appendChild(tabBtn);
+            newPane.content.appendChild(tab.termContainer);
+            newPane.tabIds.push(tabId);
+            tab.paneId = newPaneId;
+
+            this.cleanupEmptyPane(oldPane.element.id);
+            this.switchTab(tabId);
+            setTimeout(() => this.fitAll(), 50);
+        },
+
+        createTab: function(workspace, paneId, attachTabId) {
+            // Unique across reloads so new tabs never collide with detached sessions
+            const tabId = attachTabId || 'tab_' + Date.now().toString(36) + '_' + (++this.idCounter);
+            const pane = this.panes[paneId];
+            if (!pane) return null;
+
+            const workspaceName = workspace.split('/').pop();
+
+            // Tab button
+            const tabBtn = document.createElement('div');
+            tabBtn.className = 'pane-tab';
+            tabBtn.id = 'tab-btn-' + tabId;
+            tabBtn.draggable = true;
+            tabBtn.innerHTML = `<span class="name">${workspaceName}</span><span class="close">×</span>`;
+            tabBtn.querySelector('.name').onclick = () => this.switchTab(tabId);
+            tabBtn.querySelector('.close').onclick = (e) => { e.stopPropagation(); this.closeTab(tabId); };
+            tabBtn.addEventListener('dragstart', () => { this.dragData = { tabId }; tabBtn.style.opacity = '0.5'; });
+            tabBtn.addEventListener('dragend', () => {
+                tabBtn.style.opacity = '1';
+                this.dragData = null;
+                document.querySelectorAll('.drop-indicator').forEach(el => el.style.display = 'none');
+            });
+            pane.header.appendChild(tabBtn);
+
+            // Terminal container
+            const termContainer = document.createElement('div');
+            termContainer.className = 'term-container';
+            termContainer.id = 'term-' + tabId;
+            pane.content.appendChild(termContainer);
+
+            // xterm
+            const term = new Terminal({
+                cursorBlink: true,
+                fontSize: 12,
+                fontFamily: '"Cascadia Code", Menlo, Monaco, monospace',
+                theme: { background: '#1e1e1e', foreground: '#d4d4d4', cursor: '#d4d4d4', selectionBackground: '#264f78' },
+                scrollback: 10000,
+                bellStyle: 'sound'
+            });
+
+            // Bell sound handler
+            term.onBell(() => this.playBell());
+
+            const fitAddon = new FitAddon.FitAddon();
+            term.loadAddon(fitAddon);
+            term.open(termContainer);
+
+            // Key handling
+            term.attachCustomKeyEventHandler((e) => {
+                if (e.type !== 'keydown') return true;
+                const send = (data) => this.sendInput(tabId, data);
+
+                // Toggle latency probes: Ctrl+Shift+L
+                if (e.key === 'L' && e.ctrlKey && e.shiftKey) {
+                    this.setLatencyProbes(!this.latency.enabled);
+                    this.notify(this.latency.enabled ? '⏱ Latency probes ON' : '⏱ Latency probes OFF');
+                    return false;
+                }
+
+                // Toggle focus mode: Ctrl+Shift+F
+                if (e.key === 'F' && e.ctrlKey && e.shiftKey) {
+                    this.focusMode = !this.focusMode;
+                    this.notify(this.focusMode ? '🔒 Focus Mode ON' : '🔓 Focus Mode OFF');
+                    return false;
+                }
+
+                if (this.focusMode) {
+                    e.preventDefault();
+                    e.stopPropagation();
+                    if (e.key === 'Tab') send(e.shiftKey ? '\x1b[Z' : '\t');
+                    else if (e.key === 'Enter') send(e.shiftKey ? '\x1b[13;2u' : e.altKey ? '\x1b[13;3u' : '\r');
+                    else if (e.key === 'Escape') send('\x1b');
+                    else if (e.key === 'Backspace') send('\x7f');
+                    else if (e.key.startsWith('Arrow')) send({ArrowUp:'\x1b[A',ArrowDown:'\x1b[B',ArrowRight:'\x1b[C',ArrowLeft:'\x1b[D'}[e.key]);
+                    else if (e.ctrlKey && e.key.length === 1) { const c = e.key.toUpperCase().charCodeAt(0) - 64; if (c > 0 && c < 32) send(String.fromCharCode(c)); }
+                    else if (e.altKey && e.key.length === 1) send('\x1b' + e.key);
+                    else if (e.key.length === 1 && !e.ctrlKey && !e.metaKey) send(e.key);
+                    return false;
+                }
+
+                // Normal mode: Shift+Enter only
+                if (e.key === 'Enter' && e.shiftKey && !e.ctrlKey && !e.metaKey && !e.altKey) {
+                    e.preventDefault();
+                    send('\x1b[13;2u');
+                    return false;
+                }
+                return true;
+            });
+
+            // Auto-copy on selection
+            term.onSelectionChange(() => {
+                const sel = term.getSelection();
+                if (sel) navigator.clipboard.writeText(sel).catch(() => {});
+            });
+
+            term.onData((data) => this.sendInput(tabId, data));
+
+            // Store tab data first
+            const tabData = {
+                term, fitAddon, workspace, paneId,
+                termContainer, connected: false, ready: false, started: false, buffer: '',
+                decoder: new TextDecoder('utf-8'), ackPending: 0, ackTimer: null,
+                outputQueue: [], renderer: 'dom', rendererAddon: null, rendererSeq: 0,
+                resizeObserver: null
+            };
+            this.tabs[tabId] = tabData;
+            this.applyRenderer(tabId);
+            pane.tabIds.push(tabId);
+
+            // Use ResizeObserver for reliable fit
+            const resizeObserver = new ResizeObserver(() => {
+                const t = this.tabs[tabId];
+                if (!t) return;
+                t.fitAddon.fit();
+                if (t.connected) {
+                    this.socket.emit('terminal_resize', {
+                        tab_id: tabId,
+                        cols: t.term.cols,
+                        rows: t.term.rows
+                    });
+                }
+            });
+            resizeObserver.observe(termContainer);
+            tabData.resizeObserver = resizeObserver;
+
+            this.switchTab(tabId);
+            this.focusPane(paneId);
+            this.updateSessionList();
+
+            // Fit first, then start session with correct dimensions
+            fitAddon.fit();
+
+            // Delay session start to ensure container is fully rendered
+            setTimeout(() => {
+                fitAddon.fit();
+                if (attachTabId) {
+                    this.attachSession(tabId);
+                    return;
+                }
+                this.socket.emit('start_session', {
+                    tab_id: tabId,
+                    workspace: workspace,
+                    cols: term.cols,
+                    rows: term.rows,
+                    binary: true,
+                    flow_control: true
+                });
+            }, 100);
+
+            return tabId;
+        },
+
+        switchTab: function(tabId) {
+            const tab = this.tabs[tabId];
+            if (!tab) return;
+
+            const pane = this.panes[tab.paneId];
+            pane.tabIds.forEach(tid => {
+                const t = this.tabs[tid];
+                if (t) {
+                    t.termContainer.classList.remove('active');
+                    document.getElementById('tab-btn-' + tid)?.classList.remove('active');
+                }
+            });
+
+            tab.termContainer.classList.add('active');
+            document.getElementById('tab-btn-' + tabId)?.classList.add('active');
+
+            this.activeTab = tabId;
+            this.focusedPaneId = tab.paneId;
+
+            Object.values(this.panes).forEach(p => p.element.classList.remove('focused'));
+            pane.element.classList.add('focused');
+
+            tab.fitAddon.fit();
+            tab.term.focus();
+            this.updateSessionList();
+        },
+
+        closeTab: function(tabId) {
+            const tab = this.tabs[tabId];
+            if (!tab || tab.closing) return;
+
+            // Mark as closing to prevent double-close
+            tab.closing = true;
+
+            // Notify server if still connected
+            if (tab.connected) {
+                tab.connected = false;
+                this.socket.emit('stop_session', { tab_id: tabId });
+            }
+
+            clearTimeout(tab.ackTimer);
+
+            // Clean up ResizeObserver
+            if (tab.resizeObserver) {
+                tab.resizeObserver.disconnect();
+            }
+
+            const paneId = tab.paneId;
+            const pane = this.panes[paneId];
+            if (pane) {
+                pane.tabIds = pane.tabIds.filter(id => id !== tabId);
+            }
+
+            document.getElementById('tab-btn-' + tabId)?.remove();
+            tab.termContainer?.remove();
+            try { tab.term.dispose(); } catch(e) {}
+            delete this.tabs[tabId];
+
+            if (this.activeTab === tabId) {
+                if (pane.tabIds.length > 0) {
+                    this.switchTab(pane.tabIds[pane.tabIds.length - 1]);
+                } else {
+                    const otherPane = Object.values(this.panes).find(p => p.tabIds.length > 0);
+                    if (otherPane) this.switchTab(otherPane.tabIds[0]);
+                    else this.activeTab = null;
+                }
+            }
+
+            this.cleanupEmptyPane(paneId);
+            this.updateSessionList();
+        },
+
+        cleanupEmptyPane: function(paneId) {
+            const pane = this.panes[paneId];
+            if (!pane || pane.tabIds.length > 0) return;
+
+            // If this is the last pane, show empty state instead of removing
+            if (Object.keys(this.panes).length <= 1) {
+                // Remove the pane and show empty state
+                delete this.panes[paneId];
+                pane.element.remove();
+                this.focusedPaneId = null;
+                this.activeTab = null;
+
+                // Show empty state
+                const main = document.getElementById('terminal-main');
+                if (main && !document.getElementById('empty-state')) {
+                    const emptyState = document.createElement('div');
+                    emptyState.className = 'empty-state';
+                    emptyState.id = 'empty-state';
+                    emptyState.innerHTML = '<div class="icon">📺</div><div>Select a workspace to start</div>';
+                    main.appendChild(emptyState);
+                }
+                return;
+            }
+
+            const paneEl = pane.element;
+            const parent = paneEl.parentElement;
+
+            if (parent.classList.contains('split-container')) {
+                const children = Array.from(parent.children).filter(el =>
+                    el.classList.contains('terminal-pane') || el.classList.contains('split-container')
+                );
+                const sibling = children.find(el => el !== paneEl);
+
+                if (sibling && parent.parentElement) {
+                    const grandparent = parent.parentElement;
+                    grandparent.insertBefore(sibling, parent);
+                    parent.remove();
+                    sibling.style.flex = '1';
+                    sibling.style.width = '';
+                    sibling.style.height = '';
+                    // Clear manual resize flag for this container
+                    this.manuallyResized.delete(parent.id);
+                }
+            }
+
+            delete this.panes[paneId];
+            paneEl.remove();
+
+            // Update focused pane
+            if (this.focusedPaneId === paneId) {
+                this.focusedPaneId = Object.keys(this.panes)[0] || null;
+            }
+
+            setTimeout(() => this.fitAll(), 50);
+        },
+
+        splitCurrentPane: function(direction) {
+            if (!this.focusedPaneId || !this.panes[this.focusedPaneId]) return;
+            const currentTab = this.activeTab ? this.tabs[this.activeTab] : null;
+            const workspace = currentTab?.workspace;
+            if (!workspace) return;
+
+            const newPaneId = this.splitPaneAt(this.focusedPaneId, direction, true);
+            this.createTab(workspace, newPaneId);
+        },
+
+        splitPaneAt: function(paneId, direction, insertAfter) {
+            const pane = this.panes[paneId];
+            if (!pane) return paneId;
+
+            const paneEl = pane.element;
+            const parent = paneEl.parentElement;
+
+            // Check if parent is already a split-container with same direction
+            if (parent.classList.contains('split-container') && parent.classList.contains(direction)) {
+                // Add to existing container instead of nesting
+                const handle = document.createElement('div');
+                handle.className = 'split-handle';
+                handle.addEventListener('mousedown', (e) => this.startResize(e, parent, handle));
+
+                const newPaneId = this.createPane(parent);
+                const newPaneEl = this.panes[newPaneId].element;
+
+                if (insertAfter) {
+                    // Insert after current pane
+                    paneEl.after(handle);
+                    handle.after(newPaneEl);
+                } else {
+                    // Insert before current pane
+                    paneEl.before(newPaneEl);
+                    newPaneEl.after(handle);
+                }
+
+                // Redistribute all children equally
+                this.redistributeSizes(parent);
+                setTimeout(() => this.fitAll(), 50);
+                return newPaneId;
+            }
+
+            // Create new split container
+            const splitContainer = document.createElement('div');
+            splitContainer.className = 'split-container ' + direction;
+            splitContainer.id = 'split_' + (++this.idCounter);
+
+            const handle = document.createElement('div');
+            handle.className = 'split-handle';
+            handle.addEventListener('mousedown', (e) => this.startResize(e, splitContainer, handle));
+
+            const newPaneId = this.createPane(splitContainer);
+            const newPaneEl = this.panes[newPaneId].element;
+
+            parent.insertBefore(splitContainer, paneEl);
+
+            if (insertAfter) {
+                splitContainer.appendChild(paneEl);
+                splitContainer.appendChild(handle);
+                splitContainer.appendChild(newPaneEl);
+            } else {
+                splitContainer.appendChild(newPaneEl);
+                splitContainer.appendChild(handle);
+                splitContainer.appendChild(paneEl);
+            }
+
+            // Equal distribution if not manually resized
+            this.redistributeSizes(splitContainer);
+
+            setTimeout(() => this.fitAll(), 50);
+            return newPaneId;
+        },
+
+        redistributeSizes: function(container) {
+            if (this.manuallyResized.has(container.id)) return;
+
+            const isVertical = container.classList.contains('vertical');
+            const children = Array.from(container.children).filter(el =>
+                el.classList.contains('terminal-pane') || el.classList.contains('split-container')
+            );
+
+            children.forEach(child => {
+                child.style.flex = '1';
+                child.style.width = '';
+                child.style.height = '';
+            });
+        },
+
+        startResize: function(e, container, handle) {
+            e.preventDefault();
+            handle.classList.add('dragging');
+
+            // Mark as manually resized
+            this.manuallyResized.add(container.id);
+
+            const isVertical = container.classList.contains('vertical');
+            const children = Array.from(container.children).filter(el =>
+                el.classList.contains('terminal-pane') || el.classList.contains('split-container')
+            );
+            if (children.length < 2) return;
+
+            const first = children[0], second = children[1];
+            const startPos = isVertical ? e.clientX : e.clientY;
+            const containerSize = isVertical ? container.offsetWidth : container.offsetHeight;
+            const handleSize = isVertical ? handle.offsetWidth : handle.offsetHeight;
+            const startFirst = isVertical ? first.offsetWidth : first.offsetHeight;
+
+            const onMove = (e) => {
+                const delta = (isVertical ? e.clientX : e.clientY) - startPos;
+                const newFirst = Math.max(100, Math.min(containerSize - 100 - handleSize, startFirst + delta));
+                const newSecond = containerSize - newFirst - handleSize;
+
+                first.style.flex = 'none';
+                second.style.flex = 'none';
+                if (isVertical) {
+                    first.style.width = newFirst + 'px';
+                    second.style.width = newSecond + 'px';
+                } else {
+                    first.style.height = newFirst + 'px';
+                    second.style.height = newSecond + 'px';
+                }
+                this.fitAll();
+            };
+
+            const onUp = () => {
+                handle.classList.remove('dragging');
+                document.removeEventListener('mousemove', onMove);
+                document.removeEventListener('mouseup', onUp);
+            };
+
+            document.addEventListener('mousemove', onMove);
+            document.addEventListener('mouseup', onUp);
+        },
+
+        navigatePane: function(direction) {
+            if (!this.focusedPaneId) return;
+            const currentPane = this.panes[this.focusedPaneId];
+            if (!currentPane) return;
+
+            const currentRect = currentPane.element.getBoundingClientRect();
+            const cx = currentRect.left + currentRect.width / 2;
+            const cy = currentRect.top + currentRect.height / 2;
+
+            let bestPane = null, bestDist = Infinity;
+
+            Object.entries(this.panes).forEach(([id, pane]) => {
+                if (id === this.focusedPaneId || pane.tabIds.length === 0) return;
+                const rect = pane.element.getBoundingClientRect();
+                const px = rect.left + rect.width / 2;
+                const py = rect.top + rect.height / 2;
+
+                let inDir = false;
+                if (direction === 'left' && px < cx) inDir = true;
+                if (direction === 'right' && px > cx) inDir = true;
+                if (direction === 'up' && py < cy) inDir = true;
+                if (direction === 'down' && py > cy) inDir = true;
+
+                if (inDir) {
+                    const dist = Math.sqrt(Math.pow(px - cx, 2) + Math.pow(py - cy, 2));
+                    if (dist < bestDist) { bestDist = dist; bestPane = pane; }
+                }
+            });
+
+            if (bestPane && bestPane.tabIds.length > 0) {
+                this.focusPane(bestPane.element.id);
+            }
+        },
+
+        updateSessionList: function() {
+            const list = document.getElementById('session-list');
+            list.innerHTML = '';
+
+            Object.entries(this.tabs).forEach(([tabId, tab]) => {
+                const item = document.createElement('div');
+                item.className = 'session-item' + (tabId === this.activeTab ? ' active' : '');
+                item.innerHTML = `
+                    <span class="icon">▸</span>
+                    <span class="name">${tab.workspace.split('/').pop()}</span>
+                    <span class="close" onclick="event.stopPropagation(); CT.closeTab('${tabId}')">×</span>
+                `;
+                item.onclick = () => this.switchTab(tabId);
+                list.appendChild(item);
+            });
+        },
+
+        fitAll: function() {
+            Object.entries(this.tabs).forEach(([tabId, tab]) => {
+                try {
+                    tab.fitAddon.fit();
+                    if (tab.connected) {
+                        this.socket.emit('terminal_resize', {
+                            tab_id: tabId,
+                            cols: tab.term.cols,
+                            rows: tab.term.rows
+                        });
+                    }
+                } catch(e) {}
+            });
+        },
+
+        sendInput: function(tabId, data) {
+            if (!this.tabs[tabId]?.connected) return;
+            const message = { tab_id: tabId, data };
+            // One probe in flight per tab, answered by the next output frame;
+            // input that produced no output is given up on after 2 s
+            const pending = this.latency.pending[tabId];
+            const now = performance.now();
+            if (this.latency.enabled && (!pending || now - pending.sent > 2000)) {
+                message.probe = ++this.latency.seq;
+                this.latency.pending[tabId] = { seq: message.probe, sent: now };
+            }
+            this.socket.emit('terminal_input', message);
+        },
+
+        setLatencyProbes: function(enabled) {
+            const lat = this.latency;
+            lat.enabled = enabled;
+            lat.pending = {};
+            localStorage.setItem('ct-latency', enabled ? '1' : '0');
+            clearInterval(lat.timer);
+            document.getElementById('latency-overlay')?.remove();
+            if (!enabled) return;
+            const overlay = document.createElement('div');
+            overlay.className = 'latency-overlay';
+            overlay.id = 'latency-overlay';
+            document.body.appendChild(overlay);
+            this.renderLatency();
+            // Estimate RTT from acknowledged pings; each ping reports the previous RTT
+            const ping = () => {
+                const sent = performance.now();
+                this.socket.emit('latency_ping', { rtt_ms: lat.rtt }, () => {
+                    lat.rtt = performance.now() - sent;
+                    this.recordLatency('rtt', lat.rtt);
+                });
+            };
+            ping();
+            lat.timer = setInterval(ping, 2000);
+        },
+
+        closeProbe: function(tabId, probe) {
+            const pending = this.latency.pending[tabId];
+            if (!pending || pending.seq !== probe.seq) return;
+            delete this.latency.pending[tabId];
+            const total = performance.now() - pending.sent;
+            const network = Math.max(0, total - probe.server_ms - probe.pty_ms);
+            this.recordLatency('total', total);
+            this.recordLatency('network', network);
+            this.recordLatency('server', probe.server_ms);
+            this.recordLatency('pty', probe.pty_ms);
+            this.socket.emit('latency_report', { network_ms: network });
+        },
+
+        recordLatency: function(segment, ms) {
+            const samples = this.latency.samples[segment] || (this.latency.samples[segment] = []);
+            samples.push(ms);
+            if (samples.length > this.LATENCY_WINDOW) samples.shift();
+            this.renderLatency();
+        },
+
+        renderLatency: function() {
+            const overlay = document.getElementById('latency-overlay');
+            if (!overlay) return;
+            const pct = (sorted, p) => sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))];
+            const rows = ['network', 'server', 'pty', 'total', 'rtt'].map(segment => {
+                const sorted = (this.latency.samples[segment] || []).slice().sort((a, b) => a - b);
+                const cell = (p) => sorted.length ? pct(sorted, p).toFixed(1) : '-';
+                return `<tr><td>${segment}</td><td>${cell(0.5)}</td><td>${cell(0.95)}</td></tr>`;
+            }).join('');
+            overlay.innerHTML = `<table><tr><th>ms</th><th>p50</th><th>p95</th></tr>${rows}</table>`;
+        },
+
+        loadSettings: function() {
+            try {
+                Object.assign(this.settings, JSON.parse(localStorage.getItem('ct-settings') || '{}'));
+            } catch (e) {}
+            const controls = { 'setting-renderer': ['value', 'renderer'], 'setting-batch': ['checked', 'batchOutput'], 'setting-perf': ['checked', 'perfOverlay'] };
+            Object.entries(controls).forEach(([id, [prop, key]]) => {
+                const el = document.getElementById(id);
+                if (el) el[prop] = this.settings[key];
+            });
+            if (this.settings.perfOverlay) this.setPerfOverlay(true);
+        },
+
+        toggleSettings: function() {
+            document.getElementById('settings-panel').classList.toggle('open');
+        },
+
+        updateSetting: function(key, value) {
+            this.settings[key] = value;
+            localStorage.setItem('ct-settings', JSON.stringify(this.settings));
+            if (key === 'renderer') Object.keys(this.tabs).forEach(tabId => this.applyRenderer(tabId));
+            else if (key === 'batchOutput' && !value) this.flushOutput();
+            else if (key === 'perfOverlay') this.setPerfOverlay(value);
+        },
+
+        loadScript: function(url) {
+            if (!this.scripts[url]) {
+                this.scripts[url] = new Promise((resolve, reject) => {
+                    const script = document.createElement('script');
+                    script.src = url;
+                    script.onload = resolve;
+                    script.onerror = () => {
+                        delete this.scripts[url];
+                        reject(new Error('Failed to load ' + url));
+                    };
+                    document.head.appendChild(script);
+                });
+            }
+            return this.scripts[url];
+        },
+
+        applyRenderer: function(tabId) {
+            const tab = this.tabs[tabId];
+            if (!tab) return;
+            const seq = ++tab.rendererSeq;
+            if (tab.rendererAddon) {
+                // Disposing a renderer addon switches xterm back to its DOM renderer
+                try { tab.rendererAddon.dispose(); } catch (e) {}
+                tab.rendererAddon = null;
+                tab.renderer = 'dom';
+            }
+            const wanted = this.settings.renderer;
+            this.loadRenderer(tabId, seq, wanted === 'webgl' ? ['webgl', 'canvas'] : wanted === 'canvas' ? ['canvas'] : []);
+        },
+
+        loadRenderer: function(tabId, seq, candidates) {
+            // Try each renderer in turn, keeping the DOM renderer if none works
+            if (!candidates.length) return;
+            const [name, ...fallbacks] = candidates;
+            const next = (e) => {
+                console.warn('[Render] ' + name + ' renderer unavailable:', e);
+                this.loadRenderer(tabId, seq, fallbacks);
+            };
+            this.loadScript(this.config.renderers[name]).then(() => {
+                const tab = this.tabs[tabId];
+                if (!tab || tab.rendererSeq !== seq) return;
+                const addon = name === 'webgl' ? new WebglAddon.WebglAddon() : new CanvasAddon.CanvasAddon();
+                tab.term.loadAddon(addon);
+                tab.rendererAddon = addon;
+                tab.renderer = name;
+                if (name === 'webgl') {
+                    addon.onContextLoss(() => {
+                        if (tab.rendererAddon !== addon) return;
+                        addon.dispose();
+                        tab.rendererAddon = null;
+                        tab.renderer = 'dom';
+                        next(new Error('WebGL context lost'));
+                    });
+                }
+            }).catch(next);
+        },
+
+        setPerfOverlay: function(enabled) {
+            const perf = this.perf;
+            cancelAnimationFrame(perf.frame);
+            clearInterval(perf.timer);
+            perf.observer?.disconnect();
+            perf.observer = null;
+            document.getElementById('perf-overlay')?.remove();
+            if (!enabled) return;
+            const overlay = document.createElement('div');
+            overlay.className = 'perf-overlay';
+            overlay.id = 'perf-overlay';
+            document.body.appendChild(overlay);
+            Object.assign(perf, { frames: 0, writes: 0, bytes: 0, longTasks: 0, maxGap: 0, last: performance.now(), since: performance.now() });
+            const tick = (now) => {
+                perf.frames++;
+                perf.maxGap = Math.max(perf.maxGap, now - perf.last);
+                perf.last = now;
+                perf.frame = requestAnimationFrame(tick);
+            };
+            perf.frame = requestAnimationFrame(tick);
+            // Long tasks (over 50 ms) are main-thread time that blocks input and rendering
+            if (PerformanceObserver.supportedEntryTypes?.includes('longtask')) {
+                perf.observer = new PerformanceObserver((list) => {
+                    list.getEntries().forEach(entry => perf.longTasks += entry.duration);
+                });
+                perf.observer.observe({ type: 'longtask' });
+            }
+            this.renderPerf();
+            perf.timer = setInterval(() => this.renderPerf(), 1000);
+        },
+
+        renderPerf: function() {
+            const overlay = document.getElementById('perf-overlay');
+            if (!overlay) return;
+            const perf = this.perf;
+            const now = performance.now();
+            const seconds = Math.max(0.001, (now - perf.since) / 1000);
+            const renderers = {};
+            Object.values(this.tabs).forEach(tab => renderers[tab.renderer] = (renderers[tab.renderer] || 0) + 1);
+            const rows = [
+                ['fps', (perf.frames / seconds).toFixed(0)],
+                ['max frame ms', perf.maxGap.toFixed(0)],
+                ['long tasks ms/s', perf.observer ? (perf.longTasks / seconds).toFixed(0) : 'n/a'],
+                ['writes/s', (perf.writes / seconds).toFixed(0)],
+                ['output KB/s', (perf.bytes / seconds / 1024).toFixed(1)],
+                ['batching', this.settings.batchOutput ? 'on' : 'off'],
+                ['renderer', Object.entries(renderers).map(([name, count]) => name + ' ' + count).join(', ') || '-'],
+            ];
+            overlay.innerHTML = '<table>' + rows.map(([label, value]) => `<tr><td>${label}</td><td>${value}</td></tr>`).join('') + '</table>';
+            Object.assign(perf, { frames: 0, writes: 0, bytes: 0, longTasks: 0, maxGap: 0, since: now });
+        },
+
+        notify: function(msg) {
+            document.querySelector('.notification')?.remove();
+            const n = document.createElement('div');
+            n.className = 'notification';
+            n.textContent = msg;
+            document.body.appendChild(n);
+            setTimeout(() => n.remove(), 2000);
+        }
+    };
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', () => CT.init());
+    } else {
+        setTimeout(() => CT.init(), 100);
+    }
+})();
@@ -0,0 +1,81 @@
+"""Shared fixtures: in-memory stand-ins for asyncssh connections."""
+
+import asyncio
+
+import pytest
+
+from ssh import pool as pool_module
+
+
+class FakeStream:
+    """Process stdout/stdin fed from a queue; None ends the stream."""
+
+    def __init__(self):
+        self.chunks: asyncio.Queue = asyncio.Queue()
+        self.written = []
+
+    async def read(self, n: int) -> bytes:
+        chunk = await self.chunks.get()
+        return chunk or b""
+
+    def write(self, data: bytes):
+        self.written.append(data)
+
+
+class FakeProcess:
+    """Stand-in for an asyncssh process; exit() ends its output."""
+
+    def __init__(self):
+        self.stdout = FakeStream()
+        self.stdin = FakeStream()
+        self.closed = False
+
+    def exit(self):
+        self.stdout.chunks.put_nowait(None)
+
+    def close(self):
+        self.closed = True
+        self.exit()
+
+    async def wait_closed(self):
+        pass
+
+    def change_terminal_size(self, cols: int, rows: int):
+        pass
+
+
+class FakeConnection:
+    """Stand-in for an asyncssh connection that records its credentials."""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.closed = False
+        self.processes = []
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+    async def create_process(self, **kwargs) -> FakeProcess:
+        process = FakeProcess()
+        self.processes.append(process)
+        return process
+
+
+@pytest.fixture
+def connects(monkeypatch):
+    """Replace asyncssh.connect, returning the list of opened connections."""
+    opened = []
+
+    async def connect(**kwargs):
+        conn = FakeConnection(**kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(pool_module.asyncssh, "connect", connect)
+    return opened
@@ -0,0 +1,121 @@
+"""Tests for the Socket.IO terminal handlers."""
+
+import asyncio
+
+import socketio
+
+from events.socketio_handlers import TerminalHandler
+
+
+def make_handler():
+    sio = socketio.AsyncServer(async_mode="asgi")
+    handler = TerminalHandler(sio)
+    emitted = []
+
+    async def emit(event, data=None, to=None, **kwargs):
+        emitted.append((event, data, to))
+
+    sio.emit = emit
+    return handler, sio.handlers["/"], emitted
+
+
+async def issued_id(handlers, emitted, sid: str, auth=None) -> str:
+    await handlers["connect"](sid, {}, auth)
+    await handlers["list_sessions"](sid)
+    event, data, to = emitted[-1]
+    assert (event, to) == ("session_list", sid)
+    return data["client_id"]
+
+
+def test_server_issues_client_ids():
+    async def run():
+        handler, handlers, emitted = make_handler()
+        first = await issued_id(handlers, emitted, "sid-1")
+        second = await issued_id(handlers, emitted, "sid-2")
+        assert first != second
+        assert len(first) >= 32
+        assert handler.client_ids == {first, second}
+
+    asyncio.run(run())
+
+
+def test_unissued_client_id_is_replaced():
+    async def run():
+        handler, handlers, emitted = make_handler()
+        owner = await issued_id(handlers, emitted, "sid-1")
+        forged = await issued_id(handlers, emitted, "sid-2", {"client_id": "lq3v8x0k2abc"})
+        assert forged not in (owner, "lq3v8x0k2abc")
+        assert handler.clients["sid-2"] != owner
+
+    asyncio.run(run())
+
+
+def test_issued_client_id_is_kept_on_reconnect():
+    async def run():
+        handler, handlers, emitted = make_handler()
+        client_id = await issued_id(handlers, emitted, "sid-1")
+        # Reconnect before the old connection is noticed as gone
+        assert await issued_id(handlers, emitted, "sid-2", {"client_id": client_id}) == client_id
+        await handlers["disconnect"]("sid-1")
+        await handlers["disconnect"]("sid-2")
+        # Nothing uses the id any more, so it is revoked
+        assert client_id not in handler.client_ids
+        assert await issued_id(handlers, emitted, "sid-3", {"client_id": client_id}) != client_id
+
+    asyncio.run(run())
+
+
+class IdleSession:
+    """Session stand-in that connects at once and records disconnects."""
+
+    def __init__(self, on_output, on_close):
+        self.on_output = on_output
+        self.on_close = on_close
+        self.is_connected = False
+
+    async def connect(self, **kwargs) -> bool:
+        self.is_connected = True
+        return True
+
+    async def disconnect(self):
+        self.is_connected = False
+
+
+def test_shutdown_stops_warm_sessions():
+    async def run():
+        handler = TerminalHandler(socketio.AsyncServer(async_mode="asgi"), warm_sessions=1)
+        started = []
+
+        def create_session(on_output, on_close, binary):
+            started.append(IdleSession(on_output, on_close))
+            return started[-1]
+
+        handler._create_session = create_session
+        handler.warm_pool.hint("/tmp")
+        await asyncio.gather(*handler.warm_pool._tasks)
+        assert handler.warm_pool.stats()["ready"] == 1
+
+        await handler.shutdown()
+        assert handler.warm_pool.stats()["ready"] == 0
+        return started
+
+    started = asyncio.run(run())
+    assert [session.is_connected for session in started] == [False]
+
+
+def test_invalid_latency_reports_are_ignored():
+    async def run():
+        handler, handlers, emitted = make_handler()
+        for data in (None, "12", [], {"rtt_ms": None}, {"rtt_ms": "12"}, {"rtt_ms": True}, {"rtt_ms": float("nan")}):
+            assert await handlers["latency_ping"]("sid", data) is True
+        for data in (None, 5, {"network_ms": "5"}, {"network_ms": float("inf")}, {"network_ms": {}}):
+            await handlers["latency_report"]("sid", data)
+        assert handler.metrics.latency_rtt_seconds.count == 0
+        assert handler.metrics.latency_network_seconds.count == 0
+
+        assert await handlers["latency_ping"]("sid", {"rtt_ms": 20}) is True
+        await handlers["latency_report"]("sid", {"network_ms": -3.5})
+        assert handler.metrics.latency_rtt_seconds.sum == 0.02
+        assert handler.metrics.latency_network_seconds.sum == 0.0
+
+    asyncio.run(run())
@@ -0,0 +1,19 @@
+"""Tests for local PTY sessions."""
+
+import fcntl
+import os
+import struct
+import termios
+
+from ssh.local import LocalPTYSession
+
+
+def test_set_size_clamps_out_of_range_sizes():
+    master, slave = os.openpty()
+    try:
+        LocalPTYSession._set_size(master, -1, 70000)
+        rows, cols, _, _ = struct.unpack("HHHH", fcntl.ioctl(master, termios.TIOCGWINSZ, bytes(8)))
+    finally:
+        os.close(master)
+        os.close(slave)
+    assert (cols, rows) == (1, 0xFFFF)
@@ -0,0 +1,35 @@
+"""Tests for the Prometheus metrics."""
+
+import asyncio
+
+import socketio
+
+from events.metrics import Metrics
+from events.scrollback import ScrollbackBuffer
+from events.session_registry import TerminalSession
+from events.socketio_handlers import TerminalHandler
+
+
+def test_sessions_are_reported_without_ids():
+    handler = TerminalHandler(socketio.AsyncServer(async_mode="asgi"))
+    for tab in range(3):
+        handler.registry.add(TerminalSession("issued-client-id", f"tab-{tab}", "/tmp", ScrollbackBuffer(0)))
+
+    text = Metrics().render(handler)
+    assert "claude_web_sessions 3" in text
+    assert "issued-client-id" not in text
+    assert "tab-" not in text
+    assert "client_id" not in text
+
+
+def test_first_frame_time_is_observed_once():
+    async def run():
+        handler = TerminalHandler(socketio.AsyncServer(async_mode="asgi"))
+        entry = TerminalSession("client", "tab", "/tmp", ScrollbackBuffer(1024))
+        await handler._send_output(entry, b"first")
+        await handler._send_output(entry, b"second")
+        return handler
+
+    handler = asyncio.run(run())
+    assert handler.metrics.first_frame_seconds.count == 1
+    assert "claude_web_session_first_frame_seconds_count 1" in handler.metrics.render(handler)
@@ -0,0 +1,143 @@
+"""Tests for the coalescing output pipeline."""
+
+import asyncio
+
+from events.output_queue import OutputPipeline
+
+
+class Client:
+    """Records emitted frames."""
+
+    def __init__(self):
+        self.frames = []
+
+    async def emit(self, frame):
+        self.frames.append(frame)
+
+
+def test_chunks_within_flush_interval_are_merged():
+    async def run():
+        client = Client()
+        pipeline = OutputPipeline(client.emit, flush_interval=0.05)
+        pipeline.start()
+        for chunk in (b"a", b"b", b"c"):
+            await pipeline.put(chunk)
+        await asyncio.sleep(0.2)
+        await pipeline.put(b"d")
+        await pipeline.close()
+        return client, pipeline
+
+    client, pipeline = asyncio.run(run())
+    assert client.frames == [b"abc", b"d"]
+    assert pipeline.frames_emitted == 2
+    assert pipeline.chunks_merged == 2
+
+
+def test_merging_stops_at_max_frame_size():
+    async def run():
+        client = Client()
+        pipeline = OutputPipeline(client.emit, flush_interval=1.0, max_frame_size=4)
+        for chunk in ("ab", "cd", "ef", "gh", "i"):
+            await pipeline.put(chunk)
+        pipeline.start()
+        await pipeline.close()
+        return client
+
+    client = asyncio.run(run())
+    assert client.frames == ["abcd", "efgh", "i"]
+
+
+def test_close_flushes_pending_output():
+    async def run():
+        client = Client()
+        pipeline = OutputPipeline(client.emit, flush_interval=10.0)
+        pipeline.start()
+        await pipeline.put(b"tail")
+        await asyncio.sleep(0)
+        await asyncio.wait_for(pipeline.close(flush=True), 1.0)
+        return client
+
+    assert asyncio.run(run()).frames == [b"tail"]
+
+
+def test_close_without_flush_drops_pending_output():
+    async def run():
+        client = Client()
+        pipeline = OutputPipeline(client.emit, flush_interval=10.0)
+        pipeline.start()
+        await pipeline.put(b"dropped")
+        await asyncio.sleep(0)
+        await pipeline.close(flush=False)
+        return client
+
+    assert asyncio.run(run()).frames == []
+
+
+def test_emitting_pauses_at_high_watermark_until_acked_to_low():
+    async def run():
+        client = Client()
+        pipeline = OutputPipeline(client.emit, flush_interval=0, high_watermark=8, low_watermark=2)
+        pipeline.start()
+        for chunk in (b"12345678", b"abcd", b"efgh"):
+            await pipeline.put(chunk)
+            await asyncio.sleep(0.01)
+        paused = list(client.frames), pipeline.pauses
+
+        pipeline.ack(4)  # 4 unacked, still above the low watermark
+        await asyncio.sleep(0.01)
+        still_paused = list(client.frames)
+
+        pipeline.ack(2)  # 2 unacked resumes
+        await asyncio.sleep(0.01)
+        resumed = list(client.frames)
+        await pipeline.close()
+        return paused, still_paused, resumed
+
+    paused, still_paused, resumed = asyncio.run(run())
+    assert paused == ([b"12345678"], 1)
+    assert still_paused == [b"12345678"]
+    assert resumed[:2] == [b"12345678", b"abcd"]
+
+
+def test_ack_is_clamped_at_zero():
+    async def run():
+        client = Client()
+        pipeline = OutputPipeline(client.emit, flush_interval=0, high_watermark=4, low_watermark=0)
+        pipeline.start()
+        await pipeline.put("abcd")
+        await asyncio.sleep(0.01)
+        pipeline.ack(10)
+        unacked = pipeline.unacked
+        await pipeline.put("efgh")
+        await asyncio.sleep(0.01)
+        await pipeline.close(flush=False)
+        return client, unacked, pipeline
+
+    client, unacked, pipeline = asyncio.run(run())
+    assert unacked == 0
+    assert client.frames == ["abcd", "efgh"]
+    assert pipeline.pauses == 0
+
+
+def test_reset_flow_resumes_a_paused_pipeline():
+    async def run():
+        client = Client()
+        pipeline = OutputPipeline(client.emit, flush_interval=0, high_watermark=4, low_watermark=0)
+        pipeline.start()
+        await pipeline.put(b"abcd")
+        await asyncio.sleep(0.01)
+        await pipeline.put(b"efgh")
+        await asyncio.sleep(0.01)
+        paused = list(client.frames)
+
+        # A reattached client never saw the old frames, so it can't ack them
+        pipeline.reset_flow(high_watermark=16)
+        await asyncio.sleep(0.01)
+        await pipeline.close(flush=False)
+        return paused, client, pipeline
+
+    paused, client, pipeline = asyncio.run(run())
+    assert paused == [b"abcd"]
+    assert client.frames == [b"abcd", b"efgh"]
+    assert pipeline.high_watermark == 16
+    assert pipeline.unacked == 4
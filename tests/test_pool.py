@@ -0,0 +1,47 @@
+"""Tests for the pooled SSH connections."""
+
+import asyncio
+
+import pytest
+
+from ssh.pool import SSHConnectionPool
+
+
+def kwargs(**extra) -> dict:
+    return {"host": "localhost", "username": "alice", "known_hosts": None, **extra}
+
+
+def test_same_password_shares_connection(connects):
+    async def run():
+        pool = SSHConnectionPool()
+        first = await pool.acquire(kwargs(password="secret"))
+        second = await pool.acquire(kwargs(password="secret"))
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first is second
+    assert first.channels == 2
+    assert len(connects) == 1
+
+
+@pytest.mark.parametrize("other", [kwargs(password="wrong"), kwargs(), kwargs(client_keys=["/home/alice/.ssh/id_ed25519"])])
+def test_other_credential_does_not_reuse_password_connection(connects, other):
+    async def run():
+        pool = SSHConnectionPool()
+        first = await pool.acquire(kwargs(password="secret"))
+        second = await pool.acquire(other)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first is not second
+    assert len(connects) == 2
+    assert connects[1].kwargs.get("password") == other.get("password")
+
+
+def test_pool_key_does_not_contain_password(connects):
+    async def run():
+        pool = SSHConnectionPool()
+        return await pool.acquire(kwargs(password="secret"))
+
+    pooled = asyncio.run(run())
+    assert "secret" not in repr(pooled.key)
@@ -0,0 +1,27 @@
+"""Tests for session recordings."""
+
+import asyncio
+
+from events.recorder import Recorder
+
+
+def test_recording_names_do_not_reveal_owner(tmp_path):
+    async def run():
+        recorder = Recorder(tmp_path, flush_interval=0)
+        first = recorder.start("issued-client-id", "tab-1", "/tmp", 80, 24)
+        second = recorder.start("issued-client-id", "tab-1", "/tmp", 80, 24)
+        first.output(b"hello")
+        first.close()
+        second.close()
+        recorder.close()
+        return recorder, first, second
+
+    recorder, first, second = asyncio.run(run())
+    assert first.name != second.name
+    listed = [entry["name"] for entry in recorder.list()]
+    assert listed == [f"{first.name}.cast"]
+    assert "issued-client-id" not in listed[0]
+    assert "tab-1" not in listed[0]
+    assert recorder.path(listed[0]) is not None
+    assert recorder.owner(listed[0]) == ("issued-client-id", "tab-1")
+    assert recorder.owner("20240101-000000-unknown.cast") is None
@@ -0,0 +1,65 @@
+"""Tests for SSH sessions on pooled connections."""
+
+import asyncio
+
+from ssh.pool import SSHConnectionPool
+from ssh.session import SSHSession
+
+
+async def start(pool: SSHConnectionPool, closed: list) -> SSHSession:
+    session = SSHSession(on_output=lambda data: None, on_close=lambda: closed.append(True), pool=pool, binary=True)
+    assert await session.connect("/tmp", password="secret")
+    return session
+
+
+def test_natural_exit_returns_channel_slot(connects):
+    async def run():
+        pool = SSHConnectionPool(idle_timeout=0)
+        closed = []
+        first = await start(pool, closed)
+        second = await start(pool, closed)
+        pooled = first.conn
+        assert pooled.channels == 2
+
+        # The remote program exits on its own
+        first.process.exit()
+        await first._reader
+        assert closed == [True]
+        assert pooled.channels == 1
+
+        # A later disconnect does not release the slot again
+        await first.disconnect()
+        assert pooled.channels == 1
+
+        await second.disconnect()
+        assert pooled.channels == 0
+        await asyncio.sleep(0)
+        return pooled
+
+    pooled = asyncio.run(run())
+    assert pooled.conn.closed
+
+
+def test_disconnect_stops_a_reader_blocked_on_output(connects):
+    async def run():
+        pool = SSHConnectionPool(idle_timeout=0)
+        closed = []
+        stalled = asyncio.Event()
+
+        async def on_output(data):
+            # A full output pipeline whose client stopped acknowledging
+            stalled.set()
+            await asyncio.Event().wait()
+
+        session = SSHSession(on_output=on_output, on_close=lambda: closed.append(True), pool=pool, binary=True)
+        assert await session.connect("/tmp", password="secret")
+        pooled, reader = session.conn, session._reader
+        session.process.stdout.chunks.put_nowait(b"output")
+        await stalled.wait()
+
+        await asyncio.wait_for(session.disconnect(), 1.0)
+        assert reader.done()
+        assert closed == [True]
+        assert pooled.channels == 0
+
+    asyncio.run(run())
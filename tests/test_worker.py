@@ -0,0 +1,117 @@
+"""Tests for worker processes hosting sessions."""
+
+import asyncio
+import json
+import os
+
+from ssh.worker import (
+    COUNT, HEADER, MAX_SIZE, MSG_ACK, MSG_CONNECT, MSG_INPUT, MSG_RESIZE, SIZE, WorkerPool, WorkerServer, WorkerSession,
+)
+
+
+def test_terminate_removes_socket_directory():
+    async def run():
+        pool = WorkerPool(1, backend="local")
+        await pool.assign()
+        socket_dir = pool._socket_dir
+        assert os.path.isdir(socket_dir)
+        pool.terminate()
+        await asyncio.gather(*pool._tasks)
+        return socket_dir
+
+    assert not os.path.exists(asyncio.run(run()))
+
+
+class RecordingWorker:
+    """Front-side worker stand-in that records sent messages."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, kind, session_id, payload=b""):
+        self.sent.append((kind, session_id, payload))
+
+
+def test_resize_clamps_out_of_range_sizes():
+    async def run():
+        session = WorkerSession(on_output=lambda data: None)
+        session.worker = RecordingWorker()
+        session.session_id = 7
+        session._running = True
+        await session.resize(70000, -3)
+        await session.resize(120.0, 40)
+        return session.worker.sent
+
+    sent = asyncio.run(run())
+    assert [SIZE.unpack(payload) for kind, _, payload in sent if kind == MSG_RESIZE] == [(MAX_SIZE, 0), (120, 40)]
+
+
+class StalledSession:
+    """Session whose input blocks until released, like a full PTY."""
+
+    def __init__(self, on_output, on_close, binary):
+        self.on_output = on_output
+        self.on_close = on_close
+        self.received = []
+        self.release = asyncio.Event()
+
+    async def connect(self, **kwargs) -> bool:
+        return True
+
+    async def send_input(self, data: str):
+        await self.release.wait()
+        self.received.append(data)
+
+    async def disconnect(self):
+        pass
+
+
+class FrontWriter:
+    """Stream writer stand-in for the worker's connection to the front."""
+
+    def __init__(self):
+        self.messages = []
+
+    def writelines(self, parts):
+        self.messages.append(b"".join(parts))
+
+    def is_closing(self) -> bool:
+        return False
+
+    async def drain(self):
+        pass
+
+
+def frame(kind: int, session_id: int, payload: bytes = b"") -> bytes:
+    return HEADER.pack(len(payload), kind, session_id) + payload
+
+
+def test_blocked_input_does_not_stop_acks():
+    async def run():
+        reader = asyncio.StreamReader()
+        server = WorkerServer(reader, FrontWriter(), "local", window=100)
+        server.session_class = StalledSession
+        task = asyncio.create_task(server.run())
+        options = json.dumps({"workspace": "/tmp"}).encode()
+        reader.feed_data(frame(MSG_CONNECT, 1, options) + frame(MSG_CONNECT, 2, options))
+        await asyncio.sleep(0.01)
+        first, second = server.sessions[1], server.sessions[2]
+        second.unacked = 150
+        second.resume.clear()
+
+        # Session 1's input blocks; session 2's ack and input still get through
+        reader.feed_data(frame(MSG_INPUT, 1, b"paste") + frame(MSG_ACK, 2, COUNT.pack(100)) + frame(MSG_INPUT, 2, b"ls"))
+        second.session.release.set()
+        await asyncio.sleep(0.01)
+        assert second.resume.is_set()
+        assert second.unacked == 50
+        assert second.session.received == ["ls"]
+        assert first.session.received == []
+
+        first.session.release.set()
+        await asyncio.sleep(0.01)
+        assert first.session.received == ["paste"]
+        reader.feed_eof()
+        await task
+
+    asyncio.run(run())
@@ -0,0 +1,23 @@
+"""Tests for the cached workspace index."""
+
+import json
+import threading
+
+from server.workspace_index import INDEX_VERSION, WorkspaceIndex
+
+
+def test_concurrent_saves_leave_a_valid_index(tmp_path):
+    index_file = tmp_path / "index.json"
+    index = WorkspaceIndex(dirs=[], index_file=index_file)
+    index._records = {f"/dir/{i}": {"mtime": i} for i in range(2000)}
+
+    threads = [threading.Thread(target=index._save) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    data = json.loads(index_file.read_text())
+    assert data["version"] == INDEX_VERSION
+    assert len(data["records"]) == 2000
+    assert [path.name for path in tmp_path.iterdir()] == ["index.json"]
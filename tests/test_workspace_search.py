@@ -0,0 +1,86 @@
+"""Tests for fuzzy workspace search."""
+
+import asyncio
+import json
+
+from starlette.requests import Request
+
+from server.workspace_index import IndexSnapshot
+from server.workspace_search import DEFAULT_LIMIT, MAX_LIMIT, WorkspaceSearch, fuzzy_score, search_response
+
+
+def snapshot(*names):
+    return IndexSnapshot([{"name": name, "path": f"/home/me/{name}", "is_git": True} for name in names])
+
+
+def ranked(result):
+    return [ws["name"] for ws in result["results"]]
+
+
+def test_fuzzy_score_ranking():
+    assert fuzzy_score("api", "x/bar") is None
+    assert fuzzy_score("", "anything") == 0
+    # Consecutive beats scattered, word starts beat mid-word
+    assert fuzzy_score("api", "x/api") > fuzzy_score("api", "x/xaxpxi")
+    assert fuzzy_score("api", "x/my-api") > fuzzy_score("api", "x/rapid")
+    # A match in the last path segment beats one in a parent directory
+    assert fuzzy_score("api", "tools/api", 6) > fuzzy_score("api", "api/tool", 4)
+    # Shorter candidates win among otherwise equal matches
+    assert fuzzy_score("api", "api") > fuzzy_score("api", "api" + "z" * 16)
+
+
+def test_search_ranks_best_match_first():
+    search = WorkspaceSearch(None)
+    result = search.search(snapshot("code/rapid", "code/xaxpxi", "code/api", "code/web"), "API")
+    assert result["query"] == "api"
+    assert result["total"] == 3
+    assert ranked(result) == ["code/api", "code/rapid", "code/xaxpxi"]
+
+
+def test_trigram_candidates_skip_the_fallback_scan():
+    search = WorkspaceSearch(None)
+    names = snapshot("code/server", "code/s-e-r-v-e-r", "dev/server-tools")
+
+    # Enough substring matches: subsequence-only matches are not considered
+    result = search.search(names, "server", limit=2)
+    assert result["total"] == 2
+    assert set(ranked(result)) == {"code/server", "dev/server-tools"}
+
+    # Too few: every workspace is scanned for a subsequence match
+    result = search.search(names, "server", limit=10)
+    assert result["total"] == 3
+    assert "code/s-e-r-v-e-r" in ranked(result)
+
+
+def test_recently_used_workspaces_rank_higher():
+    search = WorkspaceSearch(None)
+    names = snapshot("a/proj", "b/proj", "c/proj")
+    assert ranked(search.search(names, "proj")) == ["a/proj", "b/proj", "c/proj"]
+
+    search.record_use("/home/me/c/proj")
+    search.record_use("/home/me/b/proj")
+    assert ranked(search.search(names, "proj")) == ["b/proj", "c/proj", "a/proj"]
+
+
+def test_limit_truncates_but_total_counts_all_matches():
+    search = WorkspaceSearch(None)
+    result = search.search(snapshot(*(f"code/app{i}" for i in range(10))), "app", limit=3)
+    assert result["total"] == 10
+    assert len(result["results"]) == 3
+
+
+def test_response_clamps_limit():
+    class Search:
+        async def search_async(self, query, limit):
+            return {"query": query, "limit": limit}
+
+    def limit_for(query_string):
+        request = Request({"type": "http", "method": "GET", "query_string": query_string, "headers": []})
+        response = asyncio.run(search_response(request, Search()))
+        return json.loads(response.body)["limit"]
+
+    assert limit_for(b"q=x&limit=0") == 1
+    assert limit_for(b"q=x&limit=-5") == 1
+    assert limit_for(b"q=x&limit=100000") == MAX_LIMIT
+    assert limit_for(b"q=x&limit=abc") == DEFAULT_LIMIT
+    assert limit_for(b"q=x&limit=20") == 20
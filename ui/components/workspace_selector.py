@@ -1,78 +1,36 @@
 """Workspace selector component for Nicegui."""
 
-import os
-from pathlib import Path
 from typing import Callable, List, Optional
 
 from nicegui import ui
 
+from server.workspace_index import WorkspaceIndex
 
-def get_workspaces() -> List[dict]:
+
+def get_workspaces(index: WorkspaceIndex) -> List[dict]:
     """Get list of available workspaces sorted alphabetically.
 
+    Args:
+        index: Workspace index configured by the server
+
     Returns:
         List of workspace info dicts sorted by name (no duplicates)
     """
-    home = Path.home()
-    seen_paths = set()  # Track paths to avoid duplicates (macOS case-insensitive)
-    workspaces = []
-
-    # Common workspace directories - check only one case
-    common_dirs = ["Workspace", "Projects", "dev", "code"]
-
-    for dir_name in common_dirs:
-        dir_path = home / dir_name
-        if dir_path.is_dir():
-            # Resolve to real path to handle case-insensitivity
-            real_dir = dir_path.resolve()
-            if str(real_dir) in seen_paths:
-                continue
-            seen_paths.add(str(real_dir))
-
-            # Add subdirectories
-            try:
-                for sub in dir_path.iterdir():
-                    if sub.is_dir() and not sub.name.startswith("."):
-                        real_sub = sub.resolve()
-                        if str(real_sub) in seen_paths:
-                            continue
-                        seen_paths.add(str(real_sub))
-
-                        display_name = f"{dir_name}/{sub.name}"
-                        if (sub / ".git").exists():
-                            display_name += " (git)"
-                        workspaces.append({
-                            "name": display_name,
-                            "path": str(sub),
-                            "is_git": (sub / ".git").exists(),
-                        })
-            except PermissionError:
-                pass
-
-    # Sort alphabetically by name
-    workspaces.sort(key=lambda x: x["name"].lower())
-
-    # Add home directory at the end
-    workspaces.append({
-        "name": "~ (Home)",
-        "path": str(home),
-        "is_git": (home / ".git").exists(),
-    })
-
-    return workspaces
+    return list(index.get().workspaces)
 
 
 class WorkspaceSelector:
     """Workspace selector with optional password input."""
 
-    def __init__(self, on_connect: Callable[[str, Optional[str]], None]):
+    def __init__(self, on_connect: Callable[[str, Optional[str]], None], index: WorkspaceIndex):
         """Initialize workspace selector.
 
         Args:
             on_connect: Callback when connect is clicked (workspace, password)
+            index: Workspace index configured by the server
         """
         self.on_connect = on_connect
-        self.workspaces = get_workspaces()
+        self.workspaces = get_workspaces(index)
         self.selected_workspace: Optional[str] = None
         self.password_input: Optional[ui.input] = None
         self.show_password = False